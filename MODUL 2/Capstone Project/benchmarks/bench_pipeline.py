@@ -0,0 +1,243 @@
+"""Benchmark: tiap langkah pipeline pada file Green Taxi sintetis, dengan riwayat per commit.
+
+    python benchmarks/bench_pipeline.py --rows 1e5 1e6
+    python benchmarks/bench_pipeline.py --rows 1e8 --mode stream --repeat 1
+    python benchmarks/bench_pipeline.py --rows 1e6 --baseline <rev> --threshold 0.15 --check
+
+- File sintetis (benchmarks/synth.py) dibuat sekali per (rows, seed) di benchmarks/data/.
+- Mode "memory": ingest, fit imputer (pengganti choose_imputer), isi NaN, mask cleaning,
+  clean_frame, fitur, kubus agregat, tiap section tabel (demand/revenue/...) dan plotting
+  diukur terpisah (best of --repeat). Plotting dilewati kalau matplotlib tidak terpasang.
+- Mode "stream" (default untuk > 1e7 baris): satu pass stream_fit_imputer + stream_aggregate
+  dengan RunReport; waktu per langkah = jumlah semua chunk.
+- Tiap langkah ditambahkan sebagai satu baris JSON ke benchmarks/results/history.jsonl
+  (commit, host, versi, rows, mode, step, seconds). Dengan --baseline (atau otomatis: run
+  terakhir dari commit lain dengan rows/mode/host sama) langkah yang lebih lambat dari
+  threshold ditandai REGRESSION; --check membuat exit code 1 kalau ada.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, SCRIPT_DIR)
+
+from synth import synthetic_file  # noqa: E402
+from taxi_pipeline.aggregate import TripAggregates  # noqa: E402
+from taxi_pipeline.cleaning import clean_frame, evaluate_rules  # noqa: E402
+from taxi_pipeline.cli import stage_figures, stage_tables  # noqa: E402
+from taxi_pipeline.features import add_analysis_features  # noqa: E402
+from taxi_pipeline.impute import BatchImputer  # noqa: E402
+from taxi_pipeline.ingest import fill_missing, read_trips  # noqa: E402
+from taxi_pipeline.instrument import RunReport  # noqa: E402
+from taxi_pipeline.schema import impute_columns  # noqa: E402
+from taxi_pipeline.stream import stream_aggregate, stream_fit_imputer  # noqa: E402
+
+DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+HISTORY = os.path.join(SCRIPT_DIR, "results", "history.jsonl")
+SECTIONS = ("demand", "revenue", "od", "operations", "payment", "ratecode")
+STREAM_THRESHOLD = 10_000_000
+# langkah stream: (pass, nama stage daun yang dijumlah; None = seluruh pass)
+STREAM_STEPS = {"impute_fit": ("impute_pass", None), "ingest": ("aggregate_pass", ("read_csv", "prepare")),
+                "impute_apply": ("aggregate_pass", ("fill_missing",)), "clean": ("aggregate_pass", ("clean",)),
+                "features": ("aggregate_pass", ("features",)), "aggregate": ("aggregate_pass", ("aggregate",))}
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def git_commit():
+    """(short commit hash, dirty flag) of the checkout, or ('unknown', False) outside git."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=SCRIPT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    try:
+        return git("rev-parse", "--short", "HEAD"), bool(git("status", "--porcelain", "--untracked-files=no"))
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def _have_matplotlib():
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def bench_memory(path, repeat, plots=True):
+    """{step: seconds} for each in-memory pipeline step on one file."""
+    steps = {}
+    steps["ingest"], (df, schema) = timed(lambda: read_trips(path), repeat)
+    columns = impute_columns(schema)
+    steps["impute_fit"], imputer = timed(lambda: BatchImputer().fit(df, columns), repeat)
+    fill_values = imputer.fill_values_
+
+    # langkah yang memodifikasi frame mendapat salinan baru tiap ulangan (salinan tidak diukur)
+    def on_copy(fn, frame):
+        best = np.inf
+        for _ in range(repeat):
+            work = frame.copy()
+            t, out = timed(lambda: fn(work), 1)
+            best = min(best, t)
+        return best, out
+
+    steps["impute_apply"], df = on_copy(lambda d: fill_missing(d, schema, fill_values), df)
+    steps["clean_masks"], _ = timed(lambda: evaluate_rules(df, schema), repeat)
+    steps["clean"], (df_clean, drop_stats) = timed(lambda: clean_frame(df, schema), repeat)
+    steps["features"], df_clean = on_copy(lambda d: add_analysis_features(d, schema), df_clean)
+    steps["aggregate"], aggs = timed(
+        lambda: TripAggregates().update(df_clean, schema, rows_in=drop_stats["rows_in"],
+                                        rule_bins=drop_stats["rules"].bins), repeat)
+
+    run = SimpleNamespace(aggregates=aggs)
+    tables = {}
+    for section in SECTIONS:
+        steps[f"tables:{section}"], tables[section] = timed(lambda: stage_tables(section, run), repeat)
+    if plots and _have_matplotlib():
+        from taxi_pipeline import plots as plotting
+
+        def render(section):
+            for fig in stage_figures(section, tables[section], aggs.plots).values():
+                fig.savefig(io.BytesIO(), format="png", dpi=100)
+                plotting.pyplot().close(fig)
+        for section in SECTIONS:
+            steps[f"plot:{section}"], _ = timed(lambda: render(section), repeat)
+    return steps
+
+
+def bench_stream(path, repeat, chunksize):
+    """{step: seconds} summed over chunks for the two-pass streaming pipeline."""
+    best = {}
+    for _ in range(repeat):
+        with RunReport(name="bench") as report:
+            with report.stage("impute_pass"):
+                imputer = stream_fit_imputer(path, chunksize=chunksize)
+            with report.stage("aggregate_pass"):
+                aggs = stream_aggregate(path, chunksize=chunksize, fill_values=imputer.fill_values_)
+            for section in SECTIONS:
+                with report.stage(f"tables:{section}"):
+                    stage_tables(section, SimpleNamespace(aggregates=aggs))
+        wall = report.table()["wall_s"]
+        leaf = wall.index.str.rsplit(";", n=1).str[-1]
+        steps = {}
+        for step, (pass_, names) in STREAM_STEPS.items():
+            if names is None:
+                steps[step] = float(wall[pass_])
+            else:
+                steps[step] = float(wall[wall.index.str.startswith(pass_ + ";") & leaf.isin(names)].sum())
+        for section in SECTIONS:
+            steps[f"tables:{section}"] = float(wall[f"tables:{section}"])
+        best = {k: min(v, best.get(k, np.inf)) for k, v in steps.items()}
+    return best
+
+
+def run_records(rows, mode, seconds, seed, commit, dirty):
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    base = {"commit": commit, "dirty": dirty, "timestamp": stamp, "host": platform.node(),
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "rows": rows, "mode": mode, "seed": seed}
+    return [{**base, "step": step, "seconds": round(s, 6), "rows_per_s": round(rows / s) if s > 0 else None}
+            for step, s in seconds.items()]
+
+
+def append_history(records, path=HISTORY):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def load_history(path=HISTORY):
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True, dtype={"commit": str})
+
+
+def compare(history, current, baseline=None, threshold=0.10, min_delta=0.02):
+    """Per-step baseline vs current seconds with a REGRESSION flag.
+
+    The baseline is the latest run of commit `baseline` (prefix match) or, without one, the
+    latest run from another commit; both are restricted to the same rows/mode/host.
+    """
+    key = current.iloc[0]
+    same = history[(history["rows"] == key["rows"]) & (history["mode"] == key["mode"])
+                   & (history["host"] == key["host"]) & (history["timestamp"] < key["timestamp"])]
+    if baseline is not None:
+        same = same[same["commit"].str.startswith(baseline)]
+    else:
+        same = same[same["commit"] != key["commit"]]
+    if same.empty:
+        return None
+    last = same[same["timestamp"] == same["timestamp"].max()]
+    table = pd.DataFrame({"baseline_s": last.set_index("step")["seconds"],
+                          "current_s": current.set_index("step")["seconds"]})
+    table["ratio"] = (table["current_s"] / table["baseline_s"]).round(2)
+    slower = (table["ratio"] > 1 + threshold) & (table["current_s"] - table["baseline_s"] > min_delta)
+    table["flag"] = np.where(slower, "REGRESSION", "")
+    table.attrs["baseline_commit"] = last["commit"].iloc[0]
+    return table
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=float, nargs="+", default=[1e5], help="row counts, e.g. 1e5 1e6 … 1e8")
+    ap.add_argument("--mode", choices=("auto", "memory", "stream"), default="auto")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--chunksize", type=int, default=1_000_000, help="stream mode chunk size")
+    ap.add_argument("--no-plots", action="store_true")
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--history", default=HISTORY, help="JSON-lines results file")
+    ap.add_argument("--baseline", help="commit (prefix) to compare against (default: latest other commit)")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as regression")
+    ap.add_argument("--check", action="store_true", help="exit 1 when a regression is flagged")
+    args = ap.parse_args(argv)
+
+    commit, dirty = git_commit()
+    regressions = 0
+    for rows in (int(r) for r in args.rows):
+        path = synthetic_file(rows, args.data_dir, seed=args.seed)
+        mode = args.mode if args.mode != "auto" else ("stream" if rows > STREAM_THRESHOLD else "memory")
+        if mode == "memory":
+            seconds = bench_memory(path, args.repeat, plots=not args.no_plots)
+        else:
+            seconds = bench_stream(path, args.repeat, args.chunksize)
+        records = run_records(rows, mode, seconds, args.seed, commit, dirty)
+        history = load_history(args.history)
+        append_history(records, args.history)
+
+        current = pd.DataFrame(records)
+        print(f"\nrows={rows:,} mode={mode} commit={commit}{'+dirty' if dirty else ''}")
+        table = compare(history, current, args.baseline, args.threshold) if not history.empty else None
+        if table is None:
+            print(current[["step", "seconds", "rows_per_s"]].to_string(index=False))
+        else:
+            print(f"baseline {table.attrs['baseline_commit']}")
+            print(table.to_string())
+            regressions += int((table["flag"] == "REGRESSION").sum())
+    if regressions:
+        print(f"\n{regressions} step(s) regressed", file=sys.stderr)
+    return 1 if regressions and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
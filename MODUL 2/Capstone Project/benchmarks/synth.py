@@ -0,0 +1,166 @@
+"""Generator file trip Green Taxi (LPEP) sintetis dengan skema & distribusi realistis.
+
+    python benchmarks/synth.py --rows 10000000 --out benchmarks/data/synth_1e7.csv
+
+- Skema = header LPEP 2019+ (VendorID, lpep_pickup_datetime, ..., congestion_surcharge).
+- Permintaan per jam mengikuti profil weekday (puncak sore) vs weekend (lebih datar).
+- Zona pickup/dropoff miring (beberapa zona ramai), durasi lognormal, kecepatan ~11 mph,
+  tarif dari jarak+durasi, tip hanya untuk kartu, rate code JFK/Newark dengan tarif tetap.
+- Baris kotor (default 3%) dibagi rata ke aturan cleaning: durasi ≤0 / >8 jam, jarak 0 /
+  >1000 mi, kecepatan >120 mph, biaya negatif, pickup kosong; plus NaN di kolom imputasi.
+- Ditulis per blok (chunk_rows) sehingga 1e8 baris tidak perlu muat di memori.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["VendorID", "lpep_pickup_datetime", "lpep_dropoff_datetime", "store_and_fwd_flag",
+           "RatecodeID", "PULocationID", "DOLocationID", "passenger_count", "trip_distance",
+           "fare_amount", "extra", "mta_tax", "tip_amount", "tolls_amount", "ehail_fee",
+           "improvement_surcharge", "total_amount", "payment_type", "trip_type", "congestion_surcharge"]
+
+# bobot relatif trip per jam (0–23)
+WEEKDAY_PROFILE = np.array([12, 8, 5, 4, 4, 7, 16, 30, 38, 36, 33, 34, 36, 38, 42, 48, 55, 60, 58, 50, 42, 36, 28, 18], float)
+WEEKEND_PROFILE = np.array([26, 22, 16, 11, 7, 5, 6, 9, 13, 18, 22, 25, 27, 28, 28, 28, 28, 27, 26, 24, 22, 21, 20, 18], float)
+WEEKEND_SHARE = 0.24
+
+RATECODES = np.array([1, 2, 3, 4, 5, 6])          # standard, JFK, Newark, Nassau, negotiated, group
+RATECODE_P = np.array([0.968, 0.004, 0.001, 0.002, 0.024, 0.001])
+PAYMENTS = np.array([1, 2, 3, 4])                 # credit card, cash, no charge, dispute
+PAYMENT_P = np.array([0.62, 0.355, 0.015, 0.01])
+N_ZONES = 263
+DIRTY_KINDS = ("negative_duration", "long_duration", "zero_distance", "huge_distance",
+               "fast", "negative_amount", "missing_pickup")
+
+
+def _zone_weights(rng):
+    # sebaran zona miring: bobot Zipf pada urutan zona acak (seeded)
+    w = 1.0 / np.arange(1, N_ZONES + 1) ** 0.9
+    return rng.permutation(w / w.sum())
+
+
+def _pickup_times(rng, n, start, days):
+    day = rng.integers(0, days, n)
+    weekend = ((start + day.astype("timedelta64[D]")).astype("datetime64[D]").view("int64") - 4) % 7 >= 5
+    # pilih jam dari profil sesuai jenis hari, lalu detik acak di dalam jam itu
+    hour = np.where(weekend,
+                    rng.choice(24, n, p=WEEKEND_PROFILE / WEEKEND_PROFILE.sum()),
+                    rng.choice(24, n, p=WEEKDAY_PROFILE / WEEKDAY_PROFILE.sum()))
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, n)
+    return start.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+
+
+def generate_block(rng, n, zone_p, start=np.datetime64("2023-01-01"), days=31, dirty_ratio=0.03,
+                   missing_ratio=0.02):
+    """One block of n synthetic trips as a DataFrame with the LPEP columns."""
+    ratecode = rng.choice(RATECODES, n, p=RATECODE_P)
+    payment = rng.choice(PAYMENTS, n, p=PAYMENT_P)
+    pickup = _pickup_times(rng, n, start, days)
+
+    minutes = np.clip(rng.lognormal(np.log(11), 0.6, n), 1, 180)
+    speed = np.clip(rng.lognormal(np.log(11), 0.35, n), 2, 45)
+    airport = (ratecode == 2) | (ratecode == 3)
+    minutes = np.where(airport, rng.normal(45, 12, n).clip(20, 120), minutes)
+    distance = np.round(minutes / 60 * speed, 2)
+    distance = np.where(airport, np.round(rng.normal(17, 3, n).clip(8, 30), 2), distance)
+    dropoff = pickup + np.round(minutes * 60).astype("int64").astype("timedelta64[s]")
+
+    fare = np.round(3.0 + 1.75 * distance + 0.35 * minutes, 2)
+    fare = np.where(ratecode == 2, 70.0, fare)
+    fare = np.where(ratecode == 3, np.round(fare + 20, 2), fare)
+    extra = rng.choice([0.0, 0.5, 1.0, 2.5], n, p=[0.45, 0.25, 0.25, 0.05])
+    mta = np.full(n, 0.5)
+    impr = np.full(n, 1.0)
+    tolls = np.where(airport | (rng.random(n) < 0.02), 6.55, 0.0)
+    congestion = np.where(rng.random(n) < 0.3, 2.75, 0.0)
+    tip = np.where(payment == 1, np.round(fare * rng.choice([0, 0.15, 0.2, 0.25], n, p=[0.2, 0.3, 0.35, 0.15]), 2), 0.0)
+    total = np.round(fare + extra + mta + impr + tolls + tip + congestion, 2)
+
+    df = pd.DataFrame({
+        "VendorID": rng.choice([1, 2], n, p=[0.2, 0.8]),
+        "lpep_pickup_datetime": pickup,
+        "lpep_dropoff_datetime": dropoff,
+        "store_and_fwd_flag": np.where(rng.random(n) < 0.005, "Y", "N"),
+        "RatecodeID": ratecode.astype(float),
+        "PULocationID": rng.choice(N_ZONES, n, p=zone_p) + 1,
+        "DOLocationID": rng.choice(N_ZONES, n, p=zone_p) + 1,
+        "passenger_count": rng.choice([1, 2, 3, 4, 5, 6], n, p=[0.82, 0.09, 0.03, 0.01, 0.03, 0.02]).astype(float),
+        "trip_distance": distance,
+        "fare_amount": fare, "extra": extra, "mta_tax": mta, "tip_amount": tip, "tolls_amount": tolls,
+        "ehail_fee": np.nan, "improvement_surcharge": impr, "total_amount": total,
+        "payment_type": payment.astype(float),
+        "trip_type": np.where(rng.random(n) < 0.02, 2.0, 1.0),
+        "congestion_surcharge": congestion,
+    }, columns=COLUMNS)
+    _add_dirty_rows(df, rng, dirty_ratio, missing_ratio)
+    return df
+
+
+def _add_dirty_rows(df, rng, dirty_ratio, missing_ratio):
+    n = len(df)
+    dirty = np.flatnonzero(rng.random(n) < dirty_ratio)
+    kind = rng.integers(0, len(DIRTY_KINDS), len(dirty))
+    pu = df["lpep_pickup_datetime"].to_numpy()
+    for k, name in enumerate(DIRTY_KINDS):
+        rows = dirty[kind == k]
+        if name == "negative_duration":
+            df.loc[rows, "lpep_dropoff_datetime"] = pu[rows] - np.timedelta64(300, "s")
+        elif name == "long_duration":
+            df.loc[rows, "lpep_dropoff_datetime"] = pu[rows] + np.timedelta64(10 * 3600, "s")
+        elif name == "zero_distance":
+            df.loc[rows, "trip_distance"] = 0.0
+        elif name == "huge_distance":
+            df.loc[rows, "trip_distance"] = rng.uniform(1000, 5000, len(rows)).round(2)
+        elif name == "fast":
+            df.loc[rows, "trip_distance"] = (df.loc[rows, "trip_distance"] * 20).round(2) + 40
+        elif name == "negative_amount":
+            df.loc[rows, "fare_amount"] = -df.loc[rows, "fare_amount"]
+            df.loc[rows, "total_amount"] = -df.loc[rows, "total_amount"]
+        elif name == "missing_pickup":
+            df.loc[rows, "lpep_pickup_datetime"] = pd.NaT
+    # NaN di kolom yang diimputasi/dilabeli (seperti file TLC asli: satu blok kolom kosong)
+    missing = rng.random(n) < missing_ratio
+    df.loc[missing, ["passenger_count", "RatecodeID", "payment_type", "trip_type", "store_and_fwd_flag",
+                     "congestion_surcharge"]] = np.nan
+
+
+def write_trips(path, rows, seed=42, chunk_rows=1_000_000, dirty_ratio=0.03, **kwargs):
+    """Write `rows` synthetic trips to CSV in blocks; returns the path."""
+    rng = np.random.default_rng(seed)
+    zone_p = _zone_weights(rng)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    written = 0
+    with open(tmp, "w", newline="") as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            block = generate_block(rng, n, zone_p, dirty_ratio=dirty_ratio, **kwargs)
+            block.to_csv(f, index=False, header=(written == 0), date_format="%Y-%m-%d %H:%M:%S")
+            written += n
+    os.replace(tmp, path)
+    return path
+
+
+def synthetic_file(rows, data_dir, seed=42, **kwargs):
+    """Path of a cached synthetic file with `rows` rows, generating it on first use."""
+    path = os.path.join(data_dir, f"synth_{rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        write_trips(path, rows, seed=seed, **kwargs)
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=float, default=1e5, help="row count, e.g. 1e5 … 1e8")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--dirty-ratio", type=float, default=0.03)
+    args = ap.parse_args(argv)
+    print(write_trips(args.out, int(args.rows), seed=args.seed, dirty_ratio=args.dirty_ratio))
+
+
+if __name__ == "__main__":
+    main()
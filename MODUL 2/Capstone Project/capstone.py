@@ -25,7 +25,7 @@
 # - Unit analisis: per perjalanan (row = satu trip).
 # - Fitur inti: waktu pickup/dropoff, jarak, jumlah penumpang, komponen tarif (fare, mta_tax, improvement_surcharge, tolls, tip), total_amount, lokasi pickup/dropoff (Taxi Zone), rate code, payment type.
 # 
-# Data pada notebook ini diambil dari file CSV yang telah diunggah ke Google Drive dan diunduh via gdown. Setelah pemuatan, nama kolom dinormalisasi ke snake_case agar konsisten lintas skema TLC.
+# Data pada notebook ini adalah file CSV yang diunggah ke Google Drive. File dibaca dari store dataset lokal ber-alamat isi (`.cache/store`, lihat taxi_pipeline/datasets.py) dan hanya diunduh via gdown kalau belum ada di store. Setelah pemuatan, nama kolom dinormalisasi ke snake_case agar konsisten lintas skema TLC.
 # 
 # ## Metodologi Singkat
 # 1) Normalisasi skema: deteksi nama kolom lintas variasi TLC (lpep/tpep) secara dinamis.  
@@ -35,18 +35,15 @@
 # 5) Validasi tarif: flag inkonsistensi penjumlahan komponen terhadap total_amount (tidak di-drop).  
 # 6) Feature engineering: ekstraksi jam/hari, label rate code dan payment type.  
 # 7) Analisis deskriptif: Demand, Revenue, Operations, Payment Behavior, dan Rate/Airport dengan visualisasi.
+# 
+# Untuk batch job (tanpa notebook, tanpa unduhan Google Drive, tanpa grafik kecuali diminta):
+# `python -m taxi_pipeline data.csv -o out --stages demand,revenue --format parquet [--plots]`
 
 
-!pip install gdown
-
-import gdown
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
-from scipy.stats import normaltest, ttest_ind, mannwhitneyu, pearsonr
-from datetime import datetime
+from scipy.stats import ttest_ind, mannwhitneyu, pearsonr
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -54,88 +51,114 @@ warnings.filterwarnings('ignore')
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
-# Load dataset dari Google Drive
-file_id = "1NYZJYi8n6Vc2Hso2_g_9Fut9M1QrkGjP"
-url = f"https://drive.google.com/uc?id={file_id}"
-output = "data.csv"
-gdown.download(url, output, quiet=False)
-
-df = pd.read_csv(output)
-
-def normalize_columns(cols):
-    return [c.strip().lower().replace(" ", "_") for c in cols]
-
-df.columns = normalize_columns(df.columns.tolist())
+# Load dataset dari store lokal (sha256 → file, integritas diverifikasi); gdown hanya dipanggil
+# kalau file belum ada. Tanpa jaringan: DatasetStore().add("data.csv", name="green_tripdata_capstone")
+# sekali, lalu resolve_dataset(..., fetcher=None).
+from taxi_pipeline.datasets import dataset_digest, resolve_dataset
+output = resolve_dataset("green_tripdata_capstone")
+
+# Helper skema/pipeline dipakai bersama dengan mode streaming (folder taxi_pipeline/)
+# Skema di-resolve dari header saja (kandidat nama → kolom fisik, di-cache per layout file);
+# pembacaan hanya mengambil kolom ber-peran dengan dtype eksplisit (lihat ingest.plan_read)
+from taxi_pipeline.ingest import plan_read, read_header
+header_schema, _, _ = plan_read(read_header(output))
+
+# File TLC lama hanya punya koordinat pickup/dropoff → zona ditentukan dari poligon Data/rows.rdf
+zone_assigner = None
+if header_schema["pu"] is None and header_schema["pu_lon"] is not None:
+    from taxi_pipeline.spatial import ZoneAssigner
+    from taxi_pipeline.zones import load_zones
+    zone_assigner = ZoneAssigner(load_zones())
+
+# Cache kolumnar: run berikutnya membaca Parquet (sudah dinormalisasi & di-cast), bukan parsing CSV
+USE_CACHE = True
+
+if USE_CACHE:
+    from taxi_pipeline.cache import load_prepared
+    df, load_schema = load_prepared(output, digest=dataset_digest(output), zones=zone_assigner)
+else:
+    # dtype ringkas langsung saat baca (float32/UInt8/category), lihat taxi_pipeline/dtypes.py
+    from taxi_pipeline.ingest import read_trips
+    df, load_schema = read_trips(output, zones=zone_assigner)
 df.head()
 
+# Ringkasan memori per kolom vs layout default float64/int64/object
+from taxi_pipeline.dtypes import memory_report
+mem = memory_report(df)
+print(f"{mem['bytes'].sum()/1e6:.1f} MB vs {mem['baseline_bytes'].sum()/1e6:.1f} MB default")
+mem
+
+# ## Mode streaming (opsional, untuk file besar / multi-bulan)
+# CSV dibaca per chunk; tiap chunk melewati normalisasi kolom, resolusi skema, casting tipe,
+# fitur durasi/kecepatan, aturan cleaning, dan fitur analisis, lalu agregat (demand, revenue,
+# payment, rate code) digabung bertahap → memori datar berapa pun jumlah baris.
+# Lintasan pertama mem-fit imputer per chunk (median dari quantile sketch), lintasan kedua
+# mengisi NaN dengan nilai itu dan mengagregasi.
+
+
+STREAMING = False
+
+if STREAMING:
+    from taxi_pipeline.stream import stream_aggregate, stream_fit_imputer
+    stream_imputer = stream_fit_imputer(output, chunksize=250_000)
+    aggs = stream_aggregate(output, chunksize=250_000, fill_values=stream_imputer.fill_values_)
+    print(aggs.drop_stats())
+    print(aggs.demand_pivot().head(10))
+    print(aggs.revenue_by_pickup(top=10))
+    print(aggs.payment_analysis())
+    print(aggs.rate_analysis())
+    print(aggs.airport_comparison())
+    print(aggs.operations_metrics())
+
+# ## Mode multi-bulan (opsional, 12–36 file LPEP bulanan)
+# Tiap file bulanan diproses satu worker (muat → imputasi → cleaning → agregat parsial); hasil
+# digabung sesuai urutan file sehingga tabel akhir sama berapa pun jumlah worker.
+
+
+MULTI_MONTH = False
+
+if MULTI_MONTH:
+    from taxi_pipeline.driver import run_months
+    run = run_months("data/green_tripdata_*.csv", n_jobs=4)
+    aggs = run.aggregates
+    display(run.drop_counts())
+    display(run.impute_report())
+    print(aggs.demand_pivot().head(10))
+    print(aggs.revenue_by_pickup(top=10))
+
 # # Data Understanding & Cleaning
 
 
 # ## Deteksi nama kolom (tahan variasi skema TLC)
 
 
-def find_col(df, candidates):
-    for c in candidates:
-        if c in df.columns:
-            return c
-    return None
-
-col_pickup  = find_col(df, ["lpep_pickup_datetime","tpep_pickup_datetime","pickup_datetime"])
-col_dropoff = find_col(df, ["lpep_dropoff_datetime","tpep_dropoff_datetime","dropoff_datetime"])
-col_dist    = find_col(df, ["trip_distance","distance"])
-col_pass    = find_col(df, ["passenger_count","passenger_cnt"])
-col_fare    = find_col(df, ["fare_amount","fare"])
-col_mta     = find_col(df, ["mta_tax","mta"])
-col_impr    = find_col(df, ["improvement_surcharge","improvement_surch"])
-col_tolls   = find_col(df, ["tolls_amount","tolls"])
-col_tip     = find_col(df, ["tip_amount","tip"])
-col_total   = find_col(df, ["total_amount","total"])
+# Sudah di-resolve dari header saat load (tanpa memindai df penuh)
+col_pickup  = load_schema["pickup"]
+col_dropoff = load_schema["dropoff"]
+col_dist    = load_schema["dist"]
+col_pass    = load_schema["pass"]
+col_fare    = load_schema["fare"]
+col_mta     = load_schema["mta"]
+col_impr    = load_schema["impr"]
+col_tolls   = load_schema["tolls"]
+col_tip     = load_schema["tip"]
+col_total   = load_schema["total"]
 
 # ## Casting tipe data & fitur turunan dasar
 
 
-# Datetime
-for c in [col_pickup, col_dropoff]:
-    if c is not None:
-        df[c] = pd.to_datetime(df[c], errors="coerce")
-
-# Numerik
-for c in [col_dist, col_pass, col_fare, col_mta, col_impr, col_tolls, col_tip, col_total]:
-    if c is not None and c in df.columns:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-
-# Fitur durasi & kecepatan rata-rata
-if (col_pickup is not None) and (col_dropoff is not None):
-    df["trip_duration_minutes"] = (df[col_dropoff] - df[col_pickup]).dt.total_seconds()/60.0
-    df["trip_duration_hours"]   = df["trip_duration_minutes"]/60.0
-else:
-    df["trip_duration_minutes"] = np.nan
-    df["trip_duration_hours"]   = np.nan
-
-if col_dist is not None:
-    df["avg_speed_mph"] = np.where(df["trip_duration_hours"]>0,
-                                   df[col_dist]/df["trip_duration_hours"], np.nan)
-else:
-    df["avg_speed_mph"] = np.nan
+# Sudah dilakukan loader (ingest.prepare_frame): datetime di-parse dengan format tetap,
+# kolom numerik di-cast, lalu trip_duration_minutes/hours dan avg_speed_mph ditambahkan.
+df[["trip_duration_minutes", "trip_duration_hours", "avg_speed_mph"]].describe()
 
 
 # ## Uji normalitas → pilih MEAN atau MEDIAN (p-value dari normaltest)
 
 
-def choose_imputer(series, alpha=0.05, sample_cap=100_000):
-    """Return dict: {'method': 'mean'/'median', 'p_value': float, 'stat': float}"""
-    x = series.dropna().values
-    if x.size == 0:
-        return {"method":"median", "p_value": np.nan, "stat": np.nan}  # default aman
-    # sampling bila terlalu besar
-    if x.size > sample_cap:
-        rng = np.random.default_rng(42)
-        x = rng.choice(x, size=sample_cap, replace=False)
-    # kalau data terlalu kecil/variasi nol → median
-    if len(x) < 8 or np.nanstd(x) == 0:
-        return {"method":"median", "p_value": np.nan, "stat": np.nan}
-    stat, p = stats.normaltest(x)  # D’Agostino–Pearson
-    return {"method": ("mean" if p >= alpha else "median"), "p_value": float(p), "stat": float(stat)}
+# Satu sampel baris (maks 100k) dipakai bersama untuk semua kolom target; normaltest dihitung
+# sekaligus pada array 2-D, statistik pengisi (mean/median) dihitung sekali per kolom.
+# Imputer yang sudah di-fit bisa dipakai ulang untuk chunk/bulan lain (mode streaming).
+from taxi_pipeline.impute import BatchImputer
 
 
 # ## Daftar kolom yang akan diimputasi + aturan nilai 0 by domain
@@ -162,12 +185,9 @@ for c in always_zero_if_nan:
         df[c] = df[c].fillna(0.0)
 
 # Imputasi statistik
-impute_report = {}
-for c in impute_targets:
-    info = choose_imputer(df[c], alpha=0.05)
-    impute_report[c] = info
-    fill_value = df[c].mean() if info["method"] == "mean" else df[c].median()
-    df[c] = df[c].fillna(fill_value)
+imputer = BatchImputer(alpha=0.05, sample_cap=100_000).fit(df, impute_targets)
+imputer.transform(df)
+impute_report = imputer.impute_report
 
 # Tampilkan ringkas keputusan imputasi (kolom : metode, p-value)
 pd.DataFrame.from_dict(impute_report, orient="index")
@@ -176,45 +196,34 @@ pd.DataFrame.from_dict(impute_report, orient="index")
 # 
 
 
-rows_before = len(df)
+# Aturan (ambang 8 jam, 1000 mi, 120 mph, biaya negatif) dideklarasikan sebagai data di
+# taxi_pipeline/cleaning.py (CLEANING_RULES) dan dievaluasi sekali jalan dengan bitmask per aturan:
+# - time_bad : pickup/dropoff kosong, durasi <= 0 atau > 8 jam (out-of-scope intra-kota)
+# - dist_bad : jarak <= 0 atau > 1000 mil
+# - speed_bad: kecepatan > 120 mph (mustahil)
+# - neg_bad  : komponen biaya / total negatif
+from taxi_pipeline.cleaning import clean_frame, rule_combinations
 
-# Waktu/durasi tidak logis
-time_bad = pd.Series(False, index=df.index)
-if (col_pickup is not None) and (col_dropoff is not None):
-    time_bad = df[col_pickup].isna() | df[col_dropoff].isna() \
-               | (df["trip_duration_minutes"] <= 0) \
-               | (df["trip_duration_minutes"] > 8*60)  # >8 jam: out-of-scope intra-kota
-
-# Jarak tidak valid
-dist_bad = pd.Series(False, index=df.index)
-if col_dist is not None:
-    dist_bad = (df[col_dist] <= 0) | (df[col_dist] > 1000)
-
-# Kecepatan mustahil
-speed_bad = pd.Series(False, index=df.index)
-if "avg_speed_mph" in df.columns:
-    speed_bad = df["avg_speed_mph"] > 120
-
-# Komponen biaya negatif / total negatif
-neg_bad = pd.Series(False, index=df.index)
-for c in [col_fare, col_mta, col_impr, col_tolls, col_tip, col_total]:
-    if c is not None and c in df.columns:
-        neg_bad = neg_bad | (df[c] < 0)
-
-drop_mask = time_bad | dist_bad | speed_bad | neg_bad
-df_clean = df.loc[~drop_mask].copy()
-rows_after = len(df_clean)
+schema = load_schema  # peran → nama kolom dari loader (termasuk kolom zona hasil ZoneAssigner)
+df_clean, drop_stats = clean_frame(df, schema)
+rows_before, rows_after = drop_stats["rows_in"], drop_stats["rows_out"]
 
 print({"rows_in": rows_before, "rows_out": rows_after, "dropped": rows_before-rows_after})
 
+# Jumlah baris per aturan (tumpang tindih vs hanya aturan itu) + kombinasi aturan
+rules = drop_stats["rules"]
+display(rules.report())
+rule_combinations(rules.names, rules.bins)
+
 
 # ## Cek konsistensi tarif sebagai flag saja
 
 
-if all(c is not None for c in [col_fare, col_mta, col_impr, col_tolls, col_tip, col_total]):
-    df_clean["fare_components_sum"]  = df_clean[[col_fare,col_mta,col_impr,col_tolls,col_tip]].sum(axis=1, skipna=True)
-    df_clean["total_components_diff"] = df_clean["fare_components_sum"] - df_clean[col_total]
-    df_clean["fare_mismatch_flag"]    = df_clean["total_components_diff"].abs() > 0.75  # tidak drop, hanya flag
+# Semua komponen yang ada di file (termasuk extra, ehail_fee, congestion_surcharge) dijumlah
+# vektor per kolom; toleransi per rate code (profil "ratecode", lihat taxi_pipeline/fares.py)
+from taxi_pipeline.fares import FareMismatchStats, add_fare_check
+add_fare_check(df_clean, schema)  # tidak drop, hanya flag
+display(FareMismatchStats().update(df_clean, schema).report())
 
 df_clean
 
@@ -224,39 +233,44 @@ df_clean
 # ## Preprocessing untuk analisis
 
 
-if col_pickup is not None:
-    df_clean['pickup_hour'] = df_clean[col_pickup].dt.hour
-    df_clean['pickup_date'] = df_clean[col_pickup].dt.date
-    df_clean['pickup_day_of_week'] = df_clean[col_pickup].dt.dayofweek  # 0=Monday, 6=Sunday
-    df_clean['is_weekend'] = df_clean['pickup_day_of_week'].isin([5, 6])  # Saturday, Sunday
+# Jam, tanggal, hari (0=Monday), weekend, hari libur & bulan dari hari-epoch + tabel kalender
+from taxi_pipeline.timefeatures import add_time_features
 
-# Payment type labels
-payment_labels = {1: 'Credit Card', 2: 'Cash', 3: 'No Charge', 4: 'Dispute', 5: 'Unknown', 6: 'Voided'}
-if 'payment_type' in df_clean.columns:
-    df_clean['payment_type_label'] = df_clean['payment_type'].map(payment_labels)
+add_time_features(df_clean, schema)
 
-# Rate code labels  
-rate_labels = {1: 'Standard', 2: 'JFK', 3: 'Newark', 4: 'Nassau/Westchester', 5: 'Negotiated', 6: 'Group'}
-if 'ratecodeid' in df_clean.columns:
-    df_clean['rate_code_label'] = df_clean['ratecodeid'].map(rate_labels)
+# Label disimpan sebagai category (bukan string object) → hemat memori & groupby lebih cepat.
+# Helper yang sama dengan mode streaming: payment_type_label, rate_code_label, dan
+# is_airport (rate code JFK/Newark) dipakai sampel uji statistik di bawah
+from taxi_pipeline.features import add_labels
+
+add_labels(df_clean, schema)
 
 df_clean
 
 # ### Penjelasan:
 # - Ekstraksi fitur waktu
 # - Labeling metode pembayaran
-# - Labeling kode tarif
+# - Labeling kode tarif + flag bandara (is_airport)
+
+
+# ## Kubus agregat (OLAP)
+# df_clean diringkas sekali menjadi kubus date × hour × pickup zone × payment × rate code
+# (count/sum/sum-of-squares/min/max per ukuran). Tabel Demand, Revenue, Payment, Rate & Airport
+# di bawah adalah roll-up kecil dari kubus ini, bukan groupby ulang atas jutaan baris; kubus
+# dari chunk/bulan lain (mode streaming) bisa digabung dengan `aggs.merge(...)`.
+
+
+from taxi_pipeline.aggregate import TripAggregates
+
+aggs = TripAggregates().update(df_clean, schema, rows_in=rows_before, rule_bins=rules.bins)
+print(f"{len(aggs.cube.cells):,} sel kubus dari {len(df_clean):,} baris")
 
 
 # ## Demand
 # hitung trip per jam/hari, weekday vs weekend.
 
 
-demand_hourly = df_clean.groupby(['pickup_hour', 'is_weekend']).size().reset_index(name='trip_count')
-demand_pivot = demand_hourly.pivot(index='pickup_hour', columns='is_weekend', values='trip_count').fillna(0)
-demand_pivot.columns = ['Weekday', 'Weekend']
-demand_pivot['Total'] = demand_pivot['Weekday'] + demand_pivot['Weekend']
-demand_pivot['Weekend_Ratio'] = (demand_pivot['Weekend'] / demand_pivot['Total'] * 100).round(2)
+demand_pivot = aggs.demand_pivot()
 
 print("\n📊 TABEL: Trip Count per Hour (Weekday vs Weekend)")
 print(demand_pivot.head(10))
@@ -272,9 +286,7 @@ ax1.legend()
 ax1.tick_params(axis='x', rotation=45)
 
 # Daily demand
-daily_demand = df_clean.groupby(['pickup_date', 'is_weekend']).size().reset_index(name='daily_trips')
-daily_summary = daily_demand.groupby('is_weekend')['daily_trips'].agg(['mean', 'std']).round(0)
-daily_summary.index = ['Weekday', 'Weekend']
+daily_summary = aggs.daily_summary()
 
 daily_summary['mean'].plot(kind='bar', ax=ax2, color=['#3498db', '#e74c3c'])
 ax2.set_title('Average Daily Trip Volume', fontsize=14, fontweight='bold')
@@ -289,6 +301,12 @@ for i, v in enumerate(daily_summary['mean']):
 plt.tight_layout()
 plt.show()
 
+# Deret waktu per jam (lihat taxi_pipeline/timeseries.py): profil rata-rata per hari dan
+# tren harian (rolling 7 hari, YoY bila data tahun sebelumnya ada) tanpa menyentuh data trip
+print("\n📊 TABEL: Rata-rata Trip per Jam per Hari (Weekday / Weekend / Holiday)")
+display(aggs.demand_profile())
+display(aggs.demand_trend(window_days=7).head(14))
+
 # ### Kesimpulan Temuan
 # 1. Permintaan jauh lebih tinggi di hari kerja (Weekday)
 # - Bar chart kanan menunjukkan Average Daily Trip Volume: ±2.020 trip/hari di weekday vs ±1.765 trip/hari di weekend.
@@ -307,33 +325,32 @@ plt.show()
 # Rata-rata total_amount per pulocationid/dolocationid, lihat kontribusi tolls_amount & tip_amount (tip tunai tak tercatat).
 
 
+# Nama zona & borough dari Data/rows.rdf (di-parse sekali, lalu dibaca dari cache .npz)
+from taxi_pipeline.zones import load_zones
+zones = load_zones()
+
 # Tabel: Revenue by Location
 if col_total is not None:
-    revenue_by_pickup = df_clean.groupby('pulocationid').agg({
-        col_total: ['mean', 'sum', 'count'],
-        col_tolls: 'mean',
-        col_tip: 'mean'
-    }).round(2)
-    
-    revenue_by_pickup.columns = ['Avg_Total', 'Sum_Total', 'Trip_Count', 'Avg_Tolls', 'Avg_Tip']
-    revenue_by_pickup = revenue_by_pickup.sort_values('Sum_Total', ascending=False).head(10)
+    revenue_by_pickup = aggs.revenue_by_pickup(top=10, zones=zones)
     
     print("\n💰 TABEL: Top 10 Pickup Locations by Total Revenue")
     print(revenue_by_pickup)
 
 # Chart 1: Revenue distribution
+from taxi_pipeline.plots import draw_density, draw_histogram
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
 # Revenue components
-revenue_components = df_clean[[col_fare, col_tolls, col_tip]].mean()
+revenue_components = aggs.revenue_components()
 revenue_components.plot(kind='pie', ax=ax1, autopct='%1.1f%%', startangle=90)
 ax1.set_title('Revenue Components Breakdown', fontsize=14, fontweight='bold')
 ax1.set_ylabel('')
 
-# Total amount distribution
-df_clean[col_total].hist(bins=50, ax=ax2, alpha=0.7, color='green')
-ax2.axvline(df_clean[col_total].mean(), color='red', linestyle='--', label=f'Mean: ${df_clean[col_total].mean():.2f}')
-ax2.axvline(df_clean[col_total].median(), color='orange', linestyle='--', label=f'Median: ${df_clean[col_total].median():.2f}')
+# Total amount distribution (histogram bin-tetap dari aggs.plots, bukan kolom penuh)
+total_hist = aggs.plots.hists['total']
+draw_histogram(ax2, total_hist, alpha=0.7, color='green')
+ax2.axvline(total_hist.mean(), color='red', linestyle='--', label=f'Mean: ${total_hist.mean():.2f}')
+ax2.axvline(total_hist.median(), color='orange', linestyle='--', label=f'Median: ${total_hist.median():.2f}')
 ax2.set_title('Total Amount Distribution', fontsize=14, fontweight='bold')
 ax2.set_xlabel('Total Amount ($)')
 ax2.set_ylabel('Frequency')
@@ -342,6 +359,15 @@ ax2.legend()
 plt.tight_layout()
 plt.show()
 
+# Koridor OD (pickup → dropoff): matriks sparse per jam-dalam-minggu (taxi_pipeline/od.py), dasar
+# penempatan armada — koridor teramai sepanjang minggu vs jam sibuk komuter hari kerja
+top_corridors = aggs.top_corridors(k=10, zones=zones)
+peak_corridors = aggs.top_corridors(k=10, days=range(5), hours=(7, 8, 17, 18), zones=zones)
+print("\n🚕 TABEL: Top 10 Koridor Pickup → Dropoff (trip)")
+display(top_corridors)
+print("\n⏰ TABEL: Top 10 Koridor Jam Sibuk Hari Kerja (07–09 & 17–19)")
+display(peak_corridors)
+
 # ### Kesimpulan Temuan
 # 1. Zona pickup penyumbang revenue terbesar
 # - PULocationID 74 dan 75 memimpin total pendapatan (Sum_Total tertinggi) sekaligus volume perjalanan (Trip_Count besar).
@@ -370,24 +396,9 @@ plt.show()
 
 
 # Tabel: Operations metrics
-operations_metrics = pd.DataFrame({
-    'Metric': ['Trip Duration (min)', 'Average Speed (mph)', 'Passenger Count'],
-    'Mean': [df_clean['trip_duration_minutes'].mean(), 
-             df_clean['avg_speed_mph'].mean(), 
-             df_clean[col_pass].mean()],
-    'Median': [df_clean['trip_duration_minutes'].median(),
-               df_clean['avg_speed_mph'].median(),
-               df_clean[col_pass].median()],
-    'Std': [df_clean['trip_duration_minutes'].std(),
-            df_clean['avg_speed_mph'].std(),
-            df_clean[col_pass].std()],
-    'Q25': [df_clean['trip_duration_minutes'].quantile(0.25),
-            df_clean['avg_speed_mph'].quantile(0.25),
-            df_clean[col_pass].quantile(0.25)],
-    'Q75': [df_clean['trip_duration_minutes'].quantile(0.75),
-            df_clean['avg_speed_mph'].quantile(0.75),
-            df_clean[col_pass].quantile(0.75)]
-}).round(2)
+# Mean/Std persis; Median/Q25/Q75 dari quantile sketch (galat peringkat ≤ ~0.5%), tanpa
+# mengurutkan kolom penuh → sama untuk mode streaming/paralel
+operations_metrics = aggs.operations_metrics()
 
 print("\n⚙️ TABEL: Operations Metrics Summary")
 print(operations_metrics)
@@ -395,31 +406,33 @@ print(operations_metrics)
 # Chart 1: Trip duration and speed distribution
 fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
 
+# Histogram & grid densitas dari aggs.plots: biaya plot tidak bergantung jumlah baris
 # Trip duration
-df_clean['trip_duration_minutes'].hist(bins=50, ax=ax1, alpha=0.7, color='blue')
+duration_hist = aggs.plots.hists['duration']
+draw_histogram(ax1, duration_hist, alpha=0.7, color='blue')
 ax1.set_title('Trip Duration Distribution', fontsize=12, fontweight='bold')
 ax1.set_xlabel('Duration (minutes)')
 ax1.set_ylabel('Frequency')
-ax1.axvline(df_clean['trip_duration_minutes'].mean(), color='red', linestyle='--', alpha=0.8)
+ax1.axvline(duration_hist.mean(), color='red', linestyle='--', alpha=0.8)
 
 # Speed distribution
-df_clean['avg_speed_mph'].hist(bins=50, ax=ax2, alpha=0.7, color='orange')
+speed_hist = aggs.plots.hists['speed']
+draw_histogram(ax2, speed_hist, alpha=0.7, color='orange')
 ax2.set_title('Average Speed Distribution', fontsize=12, fontweight='bold')
 ax2.set_xlabel('Speed (mph)')
 ax2.set_ylabel('Frequency')
-ax2.axvline(df_clean['avg_speed_mph'].mean(), color='red', linestyle='--', alpha=0.8)
+ax2.axvline(speed_hist.mean(), color='red', linestyle='--', alpha=0.8)
 
 # Passenger count
-passenger_counts = df_clean[col_pass].value_counts().sort_index()
+passenger_counts = pd.Series(aggs.plots.value_counts('pass'))
 passenger_counts.plot(kind='bar', ax=ax3, color='green')
 ax3.set_title('Passenger Count Distribution', fontsize=12, fontweight='bold')
 ax3.set_xlabel('Number of Passengers')
 ax3.set_ylabel('Trip Count')
 ax3.tick_params(axis='x', rotation=0)
 
-# Speed vs Duration scatter
-sample_data = df_clean.sample(n=min(5000, len(df_clean)), random_state=42)
-ax4.scatter(sample_data['trip_duration_minutes'], sample_data['avg_speed_mph'], alpha=0.5, s=1)
+# Speed vs Duration: grid densitas 2-D dari semua trip (bukan sample 5000 baris)
+draw_density(ax4, aggs.plots.grids['speed_vs_duration'])
 ax4.set_title('Speed vs Duration Relationship', fontsize=12, fontweight='bold')
 ax4.set_xlabel('Trip Duration (minutes)')
 ax4.set_ylabel('Average Speed (mph)')
@@ -453,15 +466,7 @@ plt.show()
 
 # Tabel: Payment behavior
 if 'payment_type_label' in df_clean.columns:
-    payment_analysis = df_clean.groupby('payment_type_label').agg({
-        col_tip: ['mean', 'median', 'std'],
-        col_total: 'mean',
-        'vendorid': 'count'
-    }).round(2)
-    
-    payment_analysis.columns = ['Avg_Tip', 'Median_Tip', 'Std_Tip', 'Avg_Total', 'Trip_Count']
-    payment_analysis['Tip_Rate_%'] = ((payment_analysis['Avg_Tip'] / payment_analysis['Avg_Total']) * 100).round(2)
-    payment_analysis = payment_analysis.sort_values('Trip_Count', ascending=False)
+    payment_analysis = aggs.payment_analysis()
     
     print("\n💳 TABEL: Payment Behavior Analysis")
     display(payment_analysis)
@@ -470,7 +475,7 @@ if 'payment_type_label' in df_clean.columns:
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
 # Payment type proportion
-payment_props = df_clean['payment_type_label'].value_counts()
+payment_props = aggs.payment_props()  # hanya kategori yang punya trip
 payment_props.plot(kind='pie', ax=ax1, autopct='%1.1f%%', startangle=90)
 ax1.set_title('Payment Type Distribution', fontsize=14, fontweight='bold')
 ax1.set_ylabel('')
@@ -502,16 +507,7 @@ plt.show()
 
 # Tabel: Rate code analysis
 if 'rate_code_label' in df_clean.columns:
-    rate_analysis = df_clean.groupby('rate_code_label').agg({
-        'vendorid': 'count',
-        col_total: 'mean',
-        'trip_duration_minutes': 'mean',
-        col_dist: 'mean'
-    }).round(2)
-    
-    rate_analysis.columns = ['Trip_Count', 'Avg_Total', 'Avg_Duration_min', 'Avg_Distance_mi']
-    rate_analysis['Proportion_%'] = ((rate_analysis['Trip_Count'] / rate_analysis['Trip_Count'].sum()) * 100).round(2)
-    rate_analysis = rate_analysis.sort_values('Trip_Count', ascending=False)
+    rate_analysis = aggs.rate_analysis()
     
     print("\n✈️ TABEL: Rate Code Analysis (Airport Routes)")
     display(rate_analysis)
@@ -520,7 +516,7 @@ if 'rate_code_label' in df_clean.columns:
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
 # Rate code proportion
-rate_props = df_clean['rate_code_label'].value_counts()
+rate_props = aggs.rate_props()
 rate_props.plot(kind='bar', ax=ax1, color='skyblue')
 ax1.set_title('Rate Code Distribution', fontsize=14, fontweight='bold')
 ax1.set_xlabel('Rate Code Type')
@@ -528,15 +524,7 @@ ax1.set_ylabel('Trip Count')
 ax1.tick_params(axis='x', rotation=45)
 
 # Airport vs non-airport comparison
-airport_codes = ['JFK', 'Newark']
-df_clean['is_airport'] = df_clean['rate_code_label'].isin(airport_codes)
-airport_comparison = df_clean.groupby('is_airport').agg({
-    col_total: 'mean',
-    'trip_duration_minutes': 'mean',
-    col_dist: 'mean'
-}).round(2)
-
-airport_comparison.index = ['Non-Airport', 'Airport']
+airport_comparison = aggs.airport_comparison()
 airport_comparison.plot(kind='bar', ax=ax2)
 ax2.set_title('Airport vs Non-Airport Trips Comparison', fontsize=14, fontweight='bold')
 ax2.set_xlabel('Trip Type')
@@ -573,6 +561,52 @@ plt.show()
 # - Audit konsistensi rate code dan komponen tarif (tol, surcharge) pada rute bandara.
 
 
+# ## Uji statistik (sampel berstrata)
+# Uji signifikansi dijalankan pada sampel berukuran tetap per strata (reservoir satu pass, seed
+# tetap), bukan pada seluruh df_clean: strata kecil (Dispute, JFK/Newark) tetap terwakili penuh
+# dan cara yang sama jalan per chunk/bulan tanpa memuat seluruh data.
+
+
+from taxi_pipeline.sampling import StratifiedReservoir
+
+test_columns = ("tip", "total", "dist", "trip_duration_minutes", "avg_speed_mph")
+by_payment = StratifiedReservoir(size=5000, strata="payment_type_label", columns=test_columns, seed=42)
+by_airport = StratifiedReservoir(size=5000, strata="is_airport", columns=test_columns, seed=42)
+for start in range(0, len(df_clean), 500_000):  # per chunk, seperti mode streaming
+    chunk = df_clean.iloc[start:start + 500_000]
+    by_payment.update(chunk, schema)
+    by_airport.update(chunk, schema)
+
+print("\n🎲 Sampel per strata (seen = populasi, weight = seen/sampled)")
+print(by_payment.summary())
+print(by_airport.summary())
+
+card, cash = by_payment.sample("Credit Card"), by_payment.sample("Cash")
+u_stat, u_p = mannwhitneyu(card[col_total], cash[col_total], alternative="two-sided")
+print(f"\nTotal amount Credit Card vs Cash  — Mann-Whitney U={u_stat:,.0f}, p={u_p:.3g}")
+
+airport, non_airport = by_airport.sample(True), by_airport.sample(False)
+if len(airport) > 1:
+    t_stat, t_p = ttest_ind(airport[col_total], non_airport[col_total], equal_var=False)
+    print(f"Total amount Airport vs Non-Airport — Welch t={t_stat:.2f}, p={t_p:.3g}")
+
+r, r_p = pearsonr(non_airport['trip_duration_minutes'], non_airport['avg_speed_mph'])
+print(f"Durasi vs kecepatan (Non-Airport) — Pearson r={r:.3f}, p={r_p:.3g}")
+
+# Bootstrap CI (persentil) & p-value permutasi untuk grup tabel payment_analysis dan
+# airport_comparison: tanpa asumsi normal, replikat di-batch dengan NumPy dan dibagi ke
+# process pool (hasil sama berapa pun n_jobs)
+from taxi_pipeline.resample import airport_inference, payment_inference
+
+payment_ci = payment_inference(by_payment.sample(), schema, n_resamples=5000, seed=42)
+print(f"\n🔁 Bootstrap CI 95% & uji permutasi vs {payment_ci.attrs['reference']}")
+display(payment_ci.round(3))
+
+airport_ci = airport_inference(by_airport.sample(), schema, n_resamples=5000, seed=42)
+print(f"\n🔁 Bootstrap CI 95% & uji permutasi vs {airport_ci.attrs['reference']}")
+display(airport_ci.round(3))
+
+
 # ## Ruang Lingkup & Asumsi
 # - Tip tunai tidak tercatat; tip terutama muncul pada pembayaran kartu.
 # - Ambang pembersihan (mis. durasi > 8 jam, kecepatan > 120 mph) digunakan sebagai aturan praktis intra-kota.
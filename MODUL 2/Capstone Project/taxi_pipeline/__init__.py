@@ -0,0 +1,9 @@
+"""Pipeline analisis NYC Green Taxi (LPEP) yang dipakai oleh capstone.py."""
+
+from .aggregate import TripAggregates
+from .driver import run_months
+from .incremental import append_months
+from .partition import HashPartitionedGroupBy, spill_revenue
+from .sampling import StratifiedReservoir
+from .schema import COLUMN_CANDIDATES, find_col, normalize_columns, resolve_schema
+from .stream import process_chunk, stream_aggregate, stream_sample
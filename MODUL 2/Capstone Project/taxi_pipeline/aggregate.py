@@ -0,0 +1,298 @@
+"""Tabel laporan notebook (demand, revenue, payment, rate code) dari agregat yang bisa digabung.
+
+Semua tabel dijawab dari satu TripCube (lihat cube.py); median tip per payment type dihitung
+persis dari histogram nilai tip yang juga bisa digabung per chunk. Median/kuartil metrik
+operasional (durasi, kecepatan, penumpang) memakai QuantileSketch (lihat sketch.py), dan data
+grafik distribusi dikumpulkan sebagai histogram/grid bin-tetap (lihat plotdata.py), dan arus
+pickup → dropoff per jam-dalam-minggu sebagai matriks OD sparse (lihat od.py). Statistik
+mismatch tarif per vendor × bulan ikut dikumpulkan (lihat fares.py), begitu pula deret
+trips/revenue per jam × zona pickup untuk rolling mean, profil jam dan YoY (lihat timeseries.py).
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import CLEANING_RULES, rule_report
+from .cube import TripCube
+from .fares import FareMismatchStats
+from .features import PAYMENT_LABELS, label_series
+from .od import DEFAULT_ZONES, ODMatrix, hour_of_week_buckets
+from .plotdata import PlotData
+from .sketch import DEFAULT_EPS, QuantileSketch
+from .timeseries import DemandSeries
+
+# Naikkan setiap kali isi file save()/load() berubah
+STATE_VERSION = "6"
+
+# baris tabel operations_metrics → kolom sumber (peran skema atau kolom turunan)
+OPERATIONS_METRICS = {"Trip Duration (min)": "trip_duration_minutes",
+                      "Average Speed (mph)": "avg_speed_mph",
+                      "Passenger Count": "pass"}
+
+
+def hist_quantile(values, counts, q):
+    """Exact quantile (linear interpolation, like pandas) from a value → count histogram."""
+    order = np.argsort(values)
+    values, counts = np.asarray(values, dtype=float)[order], np.asarray(counts)[order]
+    n = counts.sum()
+    if n == 0:
+        return np.nan
+    pos = q * (n - 1)
+    cum = np.cumsum(counts)
+    lo = values[np.searchsorted(cum, np.floor(pos), side="right")]
+    hi = values[np.searchsorted(cum, np.ceil(pos), side="right")]
+    return lo + (hi - lo) * (pos - np.floor(pos))
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a.add(b, fill_value=0)
+
+
+def revenue_table(r, index_name, top=10, zones=None):
+    """Top-`top` revenue table from per-location `<m>__sum`/`<m>__count` columns."""
+    revenue_by_pickup = pd.DataFrame({
+        'Avg_Total': TripCube.mean(r, "total"),
+        'Sum_Total': r["total__sum"],
+        'Trip_Count': r["total__count"].astype(int),
+        'Avg_Tolls': TripCube.mean(r, "tolls"),
+        'Avg_Tip': TripCube.mean(r, "tip"),
+    }).round(2)
+    revenue_by_pickup.index = revenue_by_pickup.index.astype(int).rename(index_name)
+    revenue_by_pickup = revenue_by_pickup.sort_values('Sum_Total', ascending=False).head(top)
+    if zones is not None:
+        names = zones.lookup(revenue_by_pickup.index.to_series())
+        revenue_by_pickup['Zone'] = names['zone'].values
+        revenue_by_pickup['Borough'] = names['borough'].values
+    return revenue_by_pickup
+
+
+class TripAggregates:
+    """Mergeable aggregates behind the notebook's report tables.
+
+    Call `update()` with each cleaned chunk (or `merge()` another instance), then read the
+    tables with the same shape as the in-memory notebook.
+    """
+
+    def __init__(self, sketch_eps=DEFAULT_EPS, seed=42):
+        self.schema = None
+        self.rows_in = 0
+        self.rows_out = 0
+        self.rule_bins = None
+        self.cube = TripCube()
+        self.tip_hist = None
+        self.sketches = {label: QuantileSketch(eps=sketch_eps, seed=seed) for label in OPERATIONS_METRICS}
+        self.plots = PlotData()
+        self.od = ODMatrix()
+        self.fares = FareMismatchStats()
+        self.demand = DemandSeries(DEFAULT_ZONES)
+
+    def update(self, df_clean, schema, rows_in=None, rule_bins=None):
+        """Fold in one cleaned chunk; `rule_bins` is the chunk's RuleResult.bins (drop counts)."""
+        self.schema = self.schema or schema
+        self.rows_in += len(df_clean) if rows_in is None else rows_in
+        self.rows_out += len(df_clean)
+        if rule_bins is not None:
+            self.rule_bins = rule_bins.copy() if self.rule_bins is None else self.rule_bins + rule_bins
+        self.cube.add(df_clean, schema)
+        for label, ref in OPERATIONS_METRICS.items():
+            col = schema[ref] if ref in schema else ref
+            if col is not None and col in df_clean.columns:
+                self.sketches[label].update(df_clean[col].to_numpy(dtype="float64", na_value=np.nan))
+        self.plots.update(df_clean, schema)
+        self.od.update(df_clean, schema)
+        self.fares.update(df_clean, schema)
+        self.demand.update(df_clean, schema)
+
+        col_pay, col_tip = schema["payment"], schema["tip"]
+        if col_pay is not None and col_tip is not None:
+            tips = pd.DataFrame({"payment": df_clean[col_pay].to_numpy(dtype="float64", na_value=np.nan),
+                                 "tip": df_clean[col_tip].to_numpy(dtype="float64", na_value=np.nan)})
+            self.tip_hist = _merge(self.tip_hist, tips.groupby(["payment", "tip"]).size())
+        return self
+
+    def merge(self, other):
+        self.schema = self.schema or other.schema
+        self.rows_in += other.rows_in
+        self.rows_out += other.rows_out
+        if other.rule_bins is not None:
+            self.rule_bins = other.rule_bins.copy() if self.rule_bins is None else self.rule_bins + other.rule_bins
+        self.cube.merge(other.cube)
+        self.tip_hist = _merge(self.tip_hist, other.tip_hist)
+        for label, sketch in other.sketches.items():
+            self.sketches[label].merge(sketch)
+        self.plots.merge(other.plots)
+        self.od.merge(other.od)
+        self.fares.merge(other.fares)
+        self.demand.merge(other.demand)
+        return self
+
+    # ---- persistensi (mode append) --------------------------------------
+
+    def save(self, directory):
+        """Write the mergeable state (cube, tip histogram, sketches, plot data) to `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        cells = self.cube.cells
+        cells.reset_index().to_parquet(os.path.join(directory, "cube.parquet"), index=False)
+        if self.tip_hist is not None:
+            self.tip_hist.rename("trips").reset_index().to_parquet(os.path.join(directory, "tip_hist.parquet"),
+                                                                   index=False)
+        self.plots.save(os.path.join(directory, "plots.npz"))
+        self.od.save(os.path.join(directory, "od.npz"))
+        self.demand.save(os.path.join(directory, "demand.npz"))
+        if self.fares.table is not None:
+            self.fares.table.reset_index().to_parquet(os.path.join(directory, "fares.parquet"), index=False)
+        meta = {"version": STATE_VERSION, "schema": self.schema, "rows_in": int(self.rows_in),
+                "rows_out": int(self.rows_out), "cube_dims": list(cells.index.names),
+                "rule_bins": None if self.rule_bins is None else self.rule_bins.tolist(),
+                "sketches": {label: sketch.to_dict() for label, sketch in self.sketches.items()}}
+        with open(os.path.join(directory, "aggregates.json"), "w") as f:
+            json.dump(meta, f)
+        return directory
+
+    @classmethod
+    def load(cls, directory, seed=42):
+        with open(os.path.join(directory, "aggregates.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != STATE_VERSION:
+            raise ValueError(f"aggregate state version {meta['version']} != {STATE_VERSION}; rebuild it")
+        aggs = cls(seed=seed)
+        aggs.schema = meta["schema"]
+        aggs.rows_in, aggs.rows_out = meta["rows_in"], meta["rows_out"]
+        if meta["rule_bins"] is not None:
+            aggs.rule_bins = np.asarray(meta["rule_bins"], dtype=np.int64)
+        cells = pd.read_parquet(os.path.join(directory, "cube.parquet"))
+        if len(cells.columns):
+            aggs.cube.merge_cells(cells.set_index(meta["cube_dims"]))
+        tip_path = os.path.join(directory, "tip_hist.parquet")
+        if os.path.exists(tip_path):
+            aggs.tip_hist = pd.read_parquet(tip_path).set_index(["payment", "tip"])["trips"].rename(None)
+        aggs.plots = PlotData.load(os.path.join(directory, "plots.npz"))
+        aggs.od = ODMatrix.load(os.path.join(directory, "od.npz"))
+        aggs.demand = DemandSeries.load(os.path.join(directory, "demand.npz"))
+        fares_path = os.path.join(directory, "fares.parquet")
+        if os.path.exists(fares_path):
+            aggs.fares.table = pd.read_parquet(fares_path).set_index(["vendor", "month"])
+        aggs.sketches = {label: QuantileSketch.from_dict(state, seed=seed)
+                         for label, state in meta["sketches"].items()}
+        return aggs
+
+    def _trip_count(self, r):
+        # setara 'vendorid': 'count' di notebook
+        return r["vendor__count"] if self.schema["vendor"] is not None else r["trips"]
+
+    # ---- Tabel laporan -------------------------------------------------
+
+    def drop_stats(self):
+        return {"rows_in": self.rows_in, "rows_out": self.rows_out, "dropped": self.rows_in - self.rows_out}
+
+    def drop_report(self, rule_names=tuple(CLEANING_RULES)):
+        return rule_report(rule_names, self.rule_bins)
+
+    def demand_pivot(self):
+        counts = self.cube.rollup(["hour", "is_weekend"])["trips"]
+        demand_pivot = counts.unstack("is_weekend").reindex(columns=[False, True]).fillna(0)
+        demand_pivot.index = demand_pivot.index.astype(int).rename("pickup_hour")
+        demand_pivot.columns = ['Weekday', 'Weekend']
+        demand_pivot['Total'] = demand_pivot['Weekday'] + demand_pivot['Weekend']
+        demand_pivot['Weekend_Ratio'] = (demand_pivot['Weekend'] / demand_pivot['Total'] * 100).round(2)
+        return demand_pivot
+
+    def daily_demand(self):
+        daily = self.cube.rollup(["date", "is_weekend"])["trips"].astype(int)
+        return daily.rename("daily_trips").rename_axis(["pickup_date", "is_weekend"]).reset_index()
+
+    def daily_summary(self):
+        daily_summary = self.daily_demand().groupby('is_weekend')['daily_trips'].agg(['mean', 'std']).round(0)
+        daily_summary.index = daily_summary.index.map({False: 'Weekday', True: 'Weekend'}).rename(None)
+        return daily_summary
+
+    def demand_profile(self, zones=None):
+        """Mean trips per hour of day on weekdays, weekends and holidays (per covered day)."""
+        return self.demand.profile("trips", zones=zones)
+
+    def demand_trend(self, window_days=7, zones=None):
+        """Daily trips with a trailing `window_days` mean and the year-over-year change of that window."""
+        daily = self.demand.daily("trips", zones=zones)
+        trend = pd.DataFrame({"daily_trips": daily,
+                              f"rolling_{window_days}d": self.demand.rolling_mean(window_days, "trips", zones,
+                                                                                  per="day").to_numpy()})
+        trend["yoy_change_%"] = self.demand.year_over_year(window_days, "trips", zones)["change_%"]
+        return trend.dropna(subset=["daily_trips"]).rename_axis("pickup_date").round(2)
+
+    def revenue_by_pickup(self, top=10, zones=None):
+        """Top pickup zones by revenue; with a ZoneTable, adds Zone/Borough names (id lookup)."""
+        return revenue_table(self.cube.rollup("pu"), self.schema["pu"], top=top, zones=zones)
+
+    def top_corridors(self, k=10, by="trips", days=None, hours=None, zones=None):
+        """Top pickup → dropoff pairs over the given days (0=Monday) and hours; see ODMatrix."""
+        buckets = None if days is None and hours is None else hour_of_week_buckets(days, hours)
+        return self.od.top_corridors(k, by=by, buckets=buckets, zones=zones)
+
+    def fare_mismatch_report(self):
+        """Fare reconciliation mismatches per vendor and pickup month."""
+        return self.fares.report()
+
+    def revenue_components(self):
+        cells = self.cube.cells
+        s = self.schema
+        return pd.Series({s[m]: cells[f"{m}__sum"].sum() / cells[f"{m}__count"].sum()
+                          for m in ("fare", "tolls", "tip") if s[m] is not None})
+
+    def tip_median(self):
+        med = {}
+        for code, grp in self.tip_hist.groupby(level=0):
+            med[code] = hist_quantile(grp.index.get_level_values(1), grp.values, 0.5)
+        med = pd.Series(med)
+        med.index = label_series(med.index.to_series(), PAYMENT_LABELS).values
+        return med[med.index.notna()]
+
+    def operations_metrics(self):
+        """Mean/Median/Std/Q25/Q75 per metric; quantiles are within the sketches' rank error."""
+        rows = [{"Metric": label, **sketch.describe()} for label, sketch in self.sketches.items()]
+        return pd.DataFrame(rows).round(2)
+
+    def payment_analysis(self):
+        r, cube = self.cube.rollup("payment_type_label"), self.cube
+        payment_analysis = pd.DataFrame({
+            'Avg_Tip': cube.mean(r, "tip"),
+            'Median_Tip': self.tip_median().reindex(r.index.astype(object)).values,
+            'Std_Tip': cube.std(r, "tip"),
+            'Avg_Total': cube.mean(r, "total"),
+            'Trip_Count': self._trip_count(r).astype(int),
+        }).round(2)
+        payment_analysis['Tip_Rate_%'] = ((payment_analysis['Avg_Tip'] / payment_analysis['Avg_Total']) * 100).round(2)
+        return payment_analysis.sort_values('Trip_Count', ascending=False)
+
+    def payment_props(self):
+        return self.cube.rollup("payment_type_label")["trips"].sort_values(ascending=False)
+
+    def rate_analysis(self):
+        r, cube = self.cube.rollup("rate_code_label"), self.cube
+        rate_analysis = pd.DataFrame({
+            'Trip_Count': self._trip_count(r).astype(int),
+            'Avg_Total': cube.mean(r, "total"),
+            'Avg_Duration_min': cube.mean(r, "duration"),
+            'Avg_Distance_mi': cube.mean(r, "dist"),
+        }).round(2)
+        rate_analysis['Proportion_%'] = ((rate_analysis['Trip_Count'] / rate_analysis['Trip_Count'].sum()) * 100).round(2)
+        return rate_analysis.sort_values('Trip_Count', ascending=False)
+
+    def rate_props(self):
+        return self.cube.rollup("rate_code_label")["trips"].sort_values(ascending=False)
+
+    def airport_comparison(self):
+        s, r, cube = self.schema, self.cube.rollup("is_airport"), self.cube
+        airport_comparison = pd.DataFrame({
+            s["total"]: cube.mean(r, "total"),
+            "trip_duration_minutes": cube.mean(r, "duration"),
+            s["dist"]: cube.mean(r, "dist"),
+        }).round(2)
+        airport_comparison.index = airport_comparison.index.map({False: 'Non-Airport', True: 'Airport'}).rename(None)
+        return airport_comparison
@@ -0,0 +1,105 @@
+"""Cache kolumnar (Parquet/Feather) untuk tabel trip yang sudah dinormalisasi dan di-cast.
+
+Kunci cache = hash isi file sumber + PIPELINE_VERSION + hash opsi baca (compact, project,
+zona, argumen read_csv), jadi run berikutnya melewati parsing CSV sepenuhnya dan hanya membaca
+kolom yang dibutuhkan analisis — dan bacaan dengan opsi lain tidak pernah mendapat frame lama
+yang bentuknya berbeda.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from .ingest import read_trips
+from .instrument import stage
+
+# Naikkan setiap kali output prepare_frame berubah (kolom, tipe, aturan casting)
+PIPELINE_VERSION = "5"
+
+DEFAULT_CACHE_DIR = ".cache"
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+
+def file_digest(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_options(read_kwargs):
+    """Normalized JSON of the read_trips options that shape the prepared frame."""
+    options = {"compact": True, "project": True, **read_kwargs}
+    if options.get("zones") is not None:
+        options["zones"] = options["zones"].fingerprint()
+    return json.dumps(options, sort_keys=True, default=repr)
+
+
+def cache_key(path, digest=None, read_kwargs=None):
+    options = hashlib.sha256(read_options(read_kwargs or {}).encode()).hexdigest()[:12]
+    return f"{digest or file_digest(path)}-v{PIPELINE_VERSION}-{options}"
+
+
+def _paths(cache_dir, key, fmt):
+    base = os.path.join(cache_dir, key)
+    return base + FORMATS[fmt], base + ".json"
+
+
+def _read(data_path, fmt, columns):
+    if fmt == "parquet":
+        return pd.read_parquet(data_path, columns=columns)
+    return pd.read_feather(data_path, columns=columns)
+
+
+def _write_meta(meta, meta_path):
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, meta_path)
+
+
+def _write(df, data_path, fmt):
+    tmp = data_path + ".tmp"
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, data_path)  # atomic: cache setengah jadi tidak pernah terbaca
+
+
+def load_prepared(path, columns=None, cache_dir=DEFAULT_CACHE_DIR, fmt="parquet", digest=None, **read_csv_kwargs):
+    """Return (df, schema) for `path`, reading from the columnar cache when warm.
+
+    On a miss the CSV is parsed and run through prepare_frame, and the full frame is
+    written to the cache. `columns` projects the load (unknown names are ignored);
+    the schema always describes the full cached table.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {sorted(FORMATS)}, got {fmt!r}")
+    key = cache_key(path, digest, read_csv_kwargs)
+    data_path, meta_path = _paths(cache_dir, key, fmt)
+
+    if os.path.exists(data_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if columns is not None:
+            columns = [c for c in columns if c in meta["columns"]]
+        with stage("cache_read") as st:
+            df = _read(data_path, fmt, columns)
+            st.rows_out = len(df)
+        return df, meta["schema"]
+
+    df, schema = read_trips(path, **read_csv_kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    with stage("cache_write", rows_in=len(df)):
+        _write(df, data_path, fmt)
+    # meta terakhir & atomic: data tanpa meta utuh = cache miss
+    _write_meta({"source": os.path.abspath(path), "version": PIPELINE_VERSION,
+                 "options": read_options(read_csv_kwargs), "schema": schema,
+                 "columns": df.columns.tolist()}, meta_path)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df, schema
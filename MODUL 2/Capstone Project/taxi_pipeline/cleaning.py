@@ -0,0 +1,130 @@
+"""Aturan pembersihan anomali (durasi, jarak, kecepatan, biaya negatif) sebagai data.
+
+Semua aturan dievaluasi dalam satu lintasan NumPy: tiap aturan menyalakan satu bit di array
+uint8 `flags`, memakai dua buffer sementara saja. Dari histogram nilai `flags` (paling banyak
+2^k bin) didapat jumlah baris per aturan, baik sendiri maupun tumpang tindih.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .schema import AMOUNT_ROLES
+
+MAX_DURATION_MIN = 8*60   # >8 jam: out-of-scope intra-kota
+MAX_DISTANCE_MI = 1000
+MAX_SPEED_MPH = 120
+
+# nama aturan → kolom wajib (role/kolom) + kondisi (role/kolom, operator, ambang); OR antar kondisi
+CLEANING_RULES = {
+    # Waktu/durasi tidak logis
+    "time_bad": {"requires": ("pickup", "dropoff"),
+                 "conditions": [("pickup", "isna", None), ("dropoff", "isna", None),
+                                ("trip_duration_minutes", "<=", 0),
+                                ("trip_duration_minutes", ">", MAX_DURATION_MIN)]},
+    # Jarak tidak valid
+    "dist_bad": {"requires": ("dist",),
+                 "conditions": [("dist", "<=", 0), ("dist", ">", MAX_DISTANCE_MI)]},
+    # Kecepatan mustahil
+    "speed_bad": {"requires": ("avg_speed_mph",),
+                  "conditions": [("avg_speed_mph", ">", MAX_SPEED_MPH)]},
+    # Komponen biaya negatif / total negatif
+    "neg_bad": {"requires": (),
+                "conditions": [(role, "<", 0) for role in AMOUNT_ROLES]},
+}
+
+_OPS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+
+def _resolve(ref, schema, df):
+    col = schema[ref] if ref in schema else ref
+    return col if (col is not None and col in df.columns) else None
+
+
+def _values(s):
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype) and not pd.api.types.is_datetime64_any_dtype(s):
+        return s.to_numpy(dtype="float64", na_value=np.nan)
+    return s.to_numpy()
+
+
+class RuleResult:
+    """Per-row rule bitmask plus counts; bit i ↔ i-th rule name."""
+
+    def __init__(self, names, flags):
+        self.names = list(names)
+        self.flags = flags
+        self.bins = np.bincount(flags, minlength=1 << len(self.names))
+
+    @property
+    def drop_mask(self):
+        return self.flags != 0
+
+    def keep_positions(self):
+        return np.flatnonzero(self.flags == 0)
+
+    def report(self):
+        return rule_report(self.names, self.bins)
+
+
+def rule_report(names, bins):
+    """Rows flagged by each rule (any overlap) and rows flagged by that rule only.
+
+    The closing "any" row holds the total dropped rows; only_this_rule is NA there.
+    """
+    codes = np.arange(len(bins))
+    rows = []
+    for i, name in enumerate(names):
+        bit = 1 << i
+        rows.append({"rule": name, "flagged": int(bins[(codes & bit) != 0].sum()), "only_this_rule": int(bins[bit])})
+    rows.append({"rule": "any", "flagged": int(bins[1:].sum()), "only_this_rule": pd.NA})
+    return pd.DataFrame(rows).set_index("rule").astype("Int64")
+
+
+def rule_combinations(names, bins):
+    """Row counts per exact combination of rules that fired (e.g. 'dist_bad+speed_bad')."""
+    out = {}
+    for code in np.flatnonzero(bins[1:]) + 1:
+        out["+".join(n for i, n in enumerate(names) if code & (1 << i))] = int(bins[code])
+    return pd.Series(out, name="rows", dtype="int64").sort_values(ascending=False)
+
+
+def evaluate_rules(df, schema, rules=CLEANING_RULES):
+    """Evaluate all rules in one pass. Returns a RuleResult."""
+    if len(rules) > 8:
+        raise ValueError("at most 8 rules fit in the uint8 bitmask")
+    n = len(df)
+    flags = np.zeros(n, dtype=np.uint8)
+    hit = np.empty(n, dtype=bool)
+    bits = np.empty(n, dtype=np.uint8)
+    for i, (name, rule) in enumerate(rules.items()):
+        if any(_resolve(r, schema, df) is None for r in rule["requires"]):
+            continue
+        for ref, op, threshold in rule["conditions"]:
+            col = _resolve(ref, schema, df)
+            if col is None:
+                continue
+            x = _values(df[col])
+            if op == "isna":
+                hit[:] = np.isnat(x) if x.dtype.kind == "M" else pd.isna(x)
+            else:
+                _OPS[op](x, threshold, out=hit)  # NaN → False, sama seperti pandas
+            np.left_shift(hit.view(np.uint8), i, out=bits)
+            np.bitwise_or(flags, bits, out=flags)
+    return RuleResult(rules.keys(), flags)
+
+
+def build_drop_mask(df, schema, rules=CLEANING_RULES):
+    return pd.Series(evaluate_rules(df, schema, rules).drop_mask, index=df.index)
+
+
+def clean_frame(df, schema, rules=CLEANING_RULES, copy=True):
+    """Return (df_clean, stats) with stats {'rows_in', 'rows_out', 'dropped', 'rules': RuleResult}.
+
+    With copy=False, df_clean is the integer row positions to keep instead of a new frame
+    (take them lazily with `df.iloc[...]` / `df[col].to_numpy()[...]`).
+    """
+    result = evaluate_rules(df, schema, rules)
+    keep = result.keep_positions()
+    rows_before, rows_after = len(df), len(keep)
+    stats = {"rows_in": rows_before, "rows_out": rows_after, "dropped": rows_before-rows_after, "rules": result}
+    # take() sudah membuat frame baru (tanpa flag SettingWithCopy), tidak perlu .copy() lagi
+    return (df.take(keep) if copy else keep), stats
@@ -0,0 +1,203 @@
+"""Entry point baris perintah (tanpa notebook): `python -m taxi_pipeline INPUT -o OUTDIR`.
+
+Contoh:
+    python -m taxi_pipeline data.csv -o out
+    python -m taxi_pipeline "data/green_tripdata_2023-*.csv" -o out --stages demand,revenue --format parquet
+    python -m taxi_pipeline data.csv -o out --plots --jobs 4
+    python -m taxi_pipeline data.csv -o out --report out/run.json --flamegraph out/stacks.txt
+    python -m taxi_pipeline data/green_tripdata_2023-07.csv -o out --state state/   # append bulan baru
+    python -m taxi_pipeline dataset:green_tripdata_capstone -o out --offline         # dari store lokal
+
+Tabel laporan ditulis per stage sebagai CSV/Parquet; grafik hanya digambar dengan --plots.
+"""
+
+import argparse
+import os
+import sys
+from contextlib import nullcontext
+
+from . import instrument
+from .cache import DEFAULT_CACHE_DIR
+from .datasets import DEFAULT_STORE_DIR, default_fetcher, resolve_dataset
+from .driver import expand_paths, run_months
+from .incremental import append_months
+from .ingest import plan_read, read_header
+from .spatial import ZoneAssigner
+from .zones import load_zones
+
+STAGES = ("ingest", "clean", "demand", "revenue", "od", "operations", "payment", "ratecode")
+TABLE_FORMATS = ("csv", "parquet")
+
+
+def stage_tables(stage, run, zones=None):
+    """{table name: DataFrame/Series} written for one stage."""
+    aggs = run.aggregates
+    if stage == "ingest":
+        return {"ingest_report": run.ingest_report()}
+    if stage == "clean":
+        return {"impute_report": run.impute_report(), "drop_counts": run.drop_counts(),
+                "drop_rules": aggs.drop_report(), "fare_mismatch": aggs.fare_mismatch_report()}
+    if stage == "demand":
+        return {"demand_pivot": aggs.demand_pivot(), "daily_summary": aggs.daily_summary(),
+                "hourly_profile": aggs.demand_profile(), "daily_trend": aggs.demand_trend()}
+    if stage == "revenue":
+        return {"revenue_by_pickup": aggs.revenue_by_pickup(top=10, zones=zones),
+                "revenue_components": aggs.revenue_components().rename("mean")}
+    if stage == "od":
+        return {"top_corridors": aggs.top_corridors(k=20, zones=zones),
+                "peak_corridors": aggs.top_corridors(k=20, days=range(5), hours=(7, 8, 17, 18), zones=zones)}
+    if stage == "operations":
+        return {"operations_metrics": aggs.operations_metrics()}
+    if stage == "payment":
+        return {"payment_analysis": aggs.payment_analysis(), "payment_props": aggs.payment_props()}
+    if stage == "ratecode":
+        return {"rate_analysis": aggs.rate_analysis(), "rate_props": aggs.rate_props(),
+                "airport_comparison": aggs.airport_comparison()}
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+def stage_figures(stage, tables, plot_data=None):
+    """{figure name: Figure} for one stage (matplotlib imported on first use).
+
+    Distribution charts (total amount, operations) need the run's binned `plot_data`.
+    """
+    from . import plots
+    if stage == "demand":
+        return {"demand": plots.demand_figure(tables["demand_pivot"], tables["daily_summary"])}
+    if stage == "revenue":
+        total_hist = plot_data.hists["total"] if plot_data is not None else None
+        return {"revenue": plots.revenue_figure(tables["revenue_components"], total_hist)}
+    if stage == "operations" and plot_data is not None:
+        return {"operations": plots.operations_figure(plot_data)}
+    if stage == "payment":
+        return {"payment": plots.payment_figure(tables["payment_props"], tables["payment_analysis"])}
+    if stage == "ratecode":
+        return {"ratecode": plots.rate_figure(tables["rate_props"], tables["airport_comparison"])}
+    return {}
+
+
+def write_table(table, out_dir, name, fmt):
+    frame = table.to_frame() if table.ndim == 1 else table
+    frame.columns = [str(c) for c in frame.columns]
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    if fmt == "parquet":
+        frame.to_parquet(path)
+    else:
+        frame.to_csv(path)
+    return path
+
+
+def parse_stages(text):
+    stages = [s.strip() for s in text.split(",") if s.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown stage(s) {unknown}; choose from {','.join(STAGES)}")
+    return [s for s in STAGES if s in stages]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m taxi_pipeline",
+                                     description="NYC Green Taxi (LPEP) analysis without the notebook.")
+    parser.add_argument("inputs", nargs="+",
+                        help="trip CSV file(s), glob pattern(s) or dataset:NAME from the local dataset store")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("--stages", type=parse_stages, default=list(STAGES),
+                        help=f"comma-separated subset of {','.join(STAGES)} (default: all)")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default="csv")
+    parser.add_argument("--plots", action="store_true", help="also render figures as PNG")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for multiple files")
+    parser.add_argument("--cache", action="store_true", help="use the columnar cache (see --cache-dir)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--state", metavar="DIR",
+                        help="append mode: fold only files not yet in DIR into its persisted aggregates, "
+                             "then write tables for everything in DIR")
+    parser.add_argument("--reuse-fill-values", action="store_true",
+                        help="with --state, impute new months with the fill values of the latest month "
+                             "already in the state")
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="content-addressed dataset store")
+    parser.add_argument("--offline", action="store_true",
+                        help="never download: dataset:NAME inputs missing from the store are an error")
+    parser.add_argument("--zone-names", action="store_true",
+                        help="add zone/borough names from Data/rows.rdf to revenue tables")
+    parser.add_argument("--report", metavar="JSON", help="write per-stage timing/memory run report")
+    parser.add_argument("--flamegraph", metavar="TXT",
+                        help="write per-stage self time as collapsed stacks (flamegraph.pl/speedscope)")
+    parser.add_argument("--profile", metavar="PROF", help="write a cProfile dump of the whole run")
+    return parser
+
+
+def _needs_zone_assignment(path):
+    schema, _, _ = plan_read(read_header(path))
+    return schema["pu"] is None and schema["pu_lon"] is not None
+
+
+def run(args, files):
+    """Run the selected stages; returns the list of written paths."""
+    stage = instrument.stage
+    # file lama (lon/lat tanpa LocationID) → zona dari poligon Data/rows.rdf
+    needs_assignment = any(_needs_zone_assignment(f) for f in files)
+    zone_table, assigner = None, None
+    if args.zone_names or needs_assignment:
+        with stage("zones"):
+            zone_table = load_zones(cache_dir=args.cache_dir)
+            if needs_assignment:
+                assigner = ZoneAssigner(zone_table)
+
+    if args.state:
+        with stage("append_months", rows_in=len(files)):
+            result = append_months(files, args.state, n_jobs=args.jobs, reuse_fill_values=args.reuse_fill_values,
+                                   use_cache=args.cache, cache_dir=args.cache_dir, zones=assigner)
+    else:
+        with stage("run_months", rows_in=len(files)):
+            result = run_months(files, n_jobs=args.jobs, use_cache=args.cache, cache_dir=args.cache_dir,
+                                zones=assigner, ingest_only=(args.stages == ["ingest"]))
+
+    written = []
+    for step in args.stages:
+        with stage("tables"), stage(step):
+            tables = stage_tables(step, result, zones=zone_table if args.zone_names else None)
+            for name, t in tables.items():
+                written.append(write_table(t, args.output_dir, name, args.format))
+        if args.plots:
+            from . import plots
+            with stage("plots"), stage(step):
+                for name, fig in stage_figures(step, tables, result.aggregates.plots).items():
+                    path = os.path.join(args.output_dir, f"{name}.png")
+                    fig.savefig(path, dpi=100)
+                    plots.pyplot().close(fig)
+                    written.append(path)
+    return written
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    fetcher = None if args.offline else default_fetcher
+    try:
+        inputs = [resolve_dataset(p.split(":", 1)[1], args.store_dir, fetcher) if p.startswith("dataset:") else p
+                  for p in args.inputs]
+    except (KeyError, FileNotFoundError) as e:
+        print(e.args[0] if e.args else e, file=sys.stderr)
+        return 2
+    files = expand_paths(inputs)
+    if not files:
+        print(f"no input files match {args.inputs}", file=sys.stderr)
+        return 2
+
+    instrumented = args.report or args.flamegraph or args.profile
+    report = instrument.RunReport(name="taxi_pipeline", profile=bool(args.profile)) if instrumented else None
+    with report if report is not None else nullcontext():
+        written = run(args, files)
+
+    if report is not None:
+        report.meta.update({"inputs": files, "stages": args.stages, "jobs": args.jobs})
+        for path, write in ((args.report, report.write_json), (args.flamegraph, report.write_folded),
+                            (args.profile, report.write_profile)):
+            if path:
+                written.append(write(path))
+
+    for path in written:
+        print(path)
+    print(f"{len(files)} file(s), {len(written)} output(s)", file=sys.stderr)
+    return 0
@@ -0,0 +1,161 @@
+"""Kubus agregat (OLAP) trip bersih: date × hour × pickup zone × payment type × rate code.
+
+Tiap sel menyimpan jumlah trip dan count/sum/sum-of-squares/min/max per ukuran, sehingga
+kubus dari chunk/bulan berbeda bisa digabung dan semua tabel laporan (demand, revenue,
+payment, rate code, airport) dijawab dengan roll-up kecil, bukan scan ulang jutaan baris.
+Dimensi & ukuran memakai nama peran (bukan nama kolom fisik) agar lintas layout TLC konsisten.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .features import AIRPORT_CODES, PAYMENT_LABELS, RATE_LABELS, label_series
+from .timefeatures import calendar_rows, epoch_days
+
+# dimensi kubus → kolom sumber (peran skema, atau nama kolom turunan)
+CUBE_DIMS = {"date": "pickup_date", "hour": "pickup_hour", "pu": "pu", "payment": "payment", "ratecode": "ratecode"}
+# ukuran → kolom sumber; "vendor" hanya dihitung (count) untuk Trip_Count ala notebook
+CUBE_MEASURES = {"total": "total", "fare": "fare", "tolls": "tolls", "tip": "tip", "dist": "dist",
+                 "pass": "pass", "duration": "trip_duration_minutes", "speed": "avg_speed_mph",
+                 "vendor": "vendor"}
+COUNT_ONLY = ("vendor",)
+# kunci numerik disimpan float64 (NaN = tidak diketahui) agar partial antar chunk selaras
+NUMERIC_DIMS = ("hour", "pu", "payment", "ratecode")
+
+# dimensi turunan yang bisa dipakai di rollup()
+DERIVED_DIMS = ("is_weekend", "day_of_week", "is_holiday", "month", "payment_type_label", "rate_code_label",
+                "is_airport")
+_CALENDAR_DIMS = {"day_of_week": "dow", "is_weekend": "weekend", "is_holiday": "holiday", "month": "month"}
+
+_COMPACT_EVERY = 8
+
+
+def _reducer(col):
+    if col.endswith("__min"):
+        return "min"
+    if col.endswith("__max"):
+        return "max"
+    return "sum"
+
+
+def _agg_map(columns):
+    return {c: _reducer(c) for c in columns}
+
+
+def _source(ref, schema, df):
+    col = schema[ref] if ref in schema else ref
+    return df[col] if (col is not None and col in df.columns) else None
+
+
+def cube_partial(df_clean, schema):
+    """One chunk's cube cells (index = CUBE_DIMS; rows with missing keys are kept as NaN)."""
+    n = len(df_clean)
+    keys = {}
+    for dim, ref in CUBE_DIMS.items():
+        s = _source(ref, schema, df_clean)
+        if s is None:
+            keys[dim] = np.full(n, np.nan)
+        elif dim in NUMERIC_DIMS:
+            keys[dim] = s.to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            keys[dim] = s.to_numpy()
+    frame = pd.DataFrame(keys, index=df_clean.index)
+    for m, ref in CUBE_MEASURES.items():
+        s = _source(ref, schema, df_clean)
+        x = s.to_numpy(dtype="float64", na_value=np.nan) if s is not None else np.full(n, np.nan)
+        frame[m] = x
+        if m not in COUNT_ONLY:
+            frame[f"{m}__sq"] = x * x
+
+    g = frame.groupby(list(CUBE_DIMS), dropna=False, sort=False)
+    parts = {"trips": g.size()}
+    for m in CUBE_MEASURES:
+        parts[f"{m}__count"] = g[m].count()
+        if m in COUNT_ONLY:
+            continue
+        parts[f"{m}__sum"] = g[m].sum()
+        parts[f"{m}__sq"] = g[f"{m}__sq"].sum()
+        parts[f"{m}__min"] = g[m].min()
+        parts[f"{m}__max"] = g[m].max()
+    return pd.DataFrame(parts)
+
+
+def _add_derived(cells, by):
+    """Add derived dimensions requested in `by` to a reset-index cube frame."""
+    wanted = [d for d in _CALENDAR_DIMS if d in by]
+    if wanted:
+        # tanggal (datetime64) → hari-epoch → baris tabel kalender
+        valid = cells["date"].notna().to_numpy()
+        cal, row = calendar_rows(epoch_days(cells["date"].to_numpy()), valid)
+        for dim in wanted:
+            values = getattr(cal, _CALENDAR_DIMS[dim])[row]
+            cells[dim] = values & valid if values.dtype == bool else pd.Series(values).where(valid).to_numpy()
+    if "payment_type_label" in by:
+        cells["payment_type_label"] = label_series(cells["payment"], PAYMENT_LABELS)
+    if "rate_code_label" in by or "is_airport" in by:
+        cells["rate_code_label"] = label_series(cells["ratecode"], RATE_LABELS)
+        cells["is_airport"] = cells["rate_code_label"].isin(AIRPORT_CODES)
+    return cells
+
+
+class TripCube:
+    """Mergeable cube of trip aggregates; add() per chunk, merge() across workers/months."""
+
+    def __init__(self):
+        self._cells = None
+        self._pending = []
+
+    def add(self, df_clean, schema):
+        self._pending.append(cube_partial(df_clean, schema))
+        if len(self._pending) >= _COMPACT_EVERY:
+            self.compact()
+        return self
+
+    def merge(self, other):
+        self._pending.extend(p for p in [other._cells] + other._pending if p is not None)
+        if len(self._pending) >= _COMPACT_EVERY:
+            self.compact()
+        return self
+
+    def merge_cells(self, cells):
+        """Fold in already-aggregated cells (e.g. a cube loaded from disk)."""
+        self._pending.append(cells)
+        return self
+
+    def compact(self):
+        parts = [p for p in [self._cells] + self._pending if p is not None]
+        self._pending = []
+        if not parts:
+            return self
+        merged = parts[0]
+        if len(parts) > 1:
+            merged = pd.concat(parts)
+            merged = merged.groupby(level=list(range(merged.index.nlevels)), dropna=False, sort=False) \
+                           .agg(_agg_map(merged.columns))
+        self._cells = merged
+        return self
+
+    @property
+    def cells(self):
+        """Cube cells (compacted); empty frame before any data was added."""
+        self.compact()
+        return self._cells if self._cells is not None else pd.DataFrame()
+
+    def rollup(self, by):
+        """Sum cube cells to the dimensions in `by` (cube dims and/or DERIVED_DIMS)."""
+        by = [by] if isinstance(by, str) else list(by)
+        values = list(self.cells.columns)
+        cells = _add_derived(self.cells.reset_index(), by)
+        return cells[by + values].groupby(by, observed=True).agg(_agg_map(values))
+
+    # ---- statistik dari hasil rollup ------------------------------------
+
+    @staticmethod
+    def mean(r, m):
+        return r[f"{m}__sum"] / r[f"{m}__count"]
+
+    @staticmethod
+    def std(r, m):
+        n, s, sq = r[f"{m}__count"], r[f"{m}__sum"], r[f"{m}__sq"]
+        var = (sq - s**2 / n) / (n - 1)
+        return np.sqrt(var.clip(lower=0)).where(n > 1)
@@ -0,0 +1,212 @@
+"""Penyimpanan dataset lokal ber-alamat isi (sha256 → file), pengganti gdown.download.
+
+- Objek disimpan di <store>/objects/<2 hex pertama>/<sha256><ekstensi asli>, mis.
+  `ab/ab12….csv.gz`. Ekstensi .gz/.zst dipertahankan, jadi read_csv/iter_chunks
+  mendekompresi secara streaming langsung dari objek itu — tidak ada salinan CSV mentah di disk.
+- catalog.json memetakan nama dataset → sha256 + nama file + sumber. Dataset dengan sha256
+  yang sudah diketahui (DATASETS atau katalog) diverifikasi terhadap hash itu; yang belum
+  dicatat hash-nya saat pertama masuk store lalu diverifikasi terhadapnya sesudahnya.
+- Integritas: hash dihitung saat objek masuk store. Run berikutnya cukup mencocokkan
+  (ukuran, mtime) dengan stempel .ok; hash ulang hanya kalau file berubah (atau recheck=True).
+  Objek yang tidak cocok dipindah ke .corrupt dan diperlakukan sebagai hilang.
+- Fetcher hanya dipanggil kalau objek tidak ada. Fetcher = callable(entry, dest_path) yang
+  menulis file ke dest_path; default memilih menurut skema `source` (gdrive:, http(s)://).
+  Di lingkungan tanpa jaringan, isi store lewat add() dan jalankan dengan fetcher=None.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from .cache import DEFAULT_CACHE_DIR
+
+DEFAULT_STORE_DIR = os.path.join(DEFAULT_CACHE_DIR, "store")
+CATALOG = "catalog.json"
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+# dataset yang dipakai capstone.py (sha256 diisi katalog saat pertama masuk store)
+DATASETS = {
+    "green_tripdata_capstone": {"filename": "data.csv", "sha256": None,
+                                "source": "gdrive:1NYZJYi8n6Vc2Hso2_g_9Fut9M1QrkGjP"},
+}
+
+
+def object_suffix(filename):
+    """Extension kept on the stored object: '.csv', '.csv.gz', '.csv.zst', ..."""
+    root, ext = os.path.splitext(os.path.basename(filename))
+    if ext in COMPRESSED_SUFFIXES:
+        return os.path.splitext(root)[1] + ext
+    return ext
+
+
+def _copy_hashed(src, dest):
+    """Copy file object `src` to path `dest`, returning the sha256 of the bytes."""
+    h = hashlib.sha256()
+    with open(dest, "wb") as out:
+        for block in iter(lambda: src.read(1 << 20), b""):
+            h.update(block)
+            out.write(block)
+    return h.hexdigest()
+
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def gdrive_fetch(entry, dest):
+    """Fetch a `gdrive:<file id>` source with gdown (only imported when a download is needed)."""
+    import gdown
+    file_id = entry["source"].split(":", 1)[1]
+    if gdown.download(f"https://drive.google.com/uc?id={file_id}", dest, quiet=False) is None:
+        raise OSError(f"gdown could not download {entry['source']}")
+
+
+def url_fetch(entry, dest):
+    """Fetch an http(s) source with urllib."""
+    from urllib.request import urlopen
+    with urlopen(entry["source"]) as src, open(dest, "wb") as out:
+        shutil.copyfileobj(src, out, 1 << 20)
+
+
+FETCHERS = {"gdrive": gdrive_fetch, "http": url_fetch, "https": url_fetch}
+
+
+def default_fetcher(entry, dest):
+    scheme = entry.get("source", "").split(":", 1)[0]
+    if scheme not in FETCHERS:
+        raise FileNotFoundError(f"no fetcher for source {entry.get('source')!r}")
+    FETCHERS[scheme](entry, dest)
+
+
+class DatasetStore:
+    """Content-addressed local file store with a name → sha256 catalog."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self.catalog_path = os.path.join(root, CATALOG)
+
+    # ---- katalog ---------------------------------------------------------
+
+    def catalog(self):
+        if not os.path.exists(self.catalog_path):
+            return {}
+        with open(self.catalog_path) as f:
+            return json.load(f)
+
+    def _record(self, name, entry):
+        catalog = self.catalog()
+        catalog[name] = entry
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.catalog_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(catalog, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.catalog_path)
+
+    def entry(self, name):
+        """Catalog entry of `name`, falling back to the built-in DATASETS registry."""
+        entry = dict(DATASETS.get(name, {}))
+        entry.update({k: v for k, v in self.catalog().get(name, {}).items() if v is not None})
+        if not entry:
+            raise KeyError(f"unknown dataset {name!r}")
+        entry.setdefault("filename", name)
+        return entry
+
+    # ---- objek -------------------------------------------------------------
+
+    def object_path(self, sha256, filename):
+        return os.path.join(self.root, "objects", sha256[:2], sha256 + object_suffix(filename))
+
+    def _stamp(self, path):
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def verify(self, path, sha256, recheck=False):
+        """True when the object at `path` has content `sha256` (stat stamp unless `recheck`)."""
+        if not os.path.exists(path):
+            return False
+        stamp_path = path + ".ok"
+        if not recheck and os.path.exists(stamp_path):
+            with open(stamp_path) as f:
+                if json.load(f) == self._stamp(path):
+                    return True
+        if _hash_file(path) != sha256:
+            os.replace(path, path + ".corrupt")
+            return False
+        with open(stamp_path, "w") as f:
+            json.dump(self._stamp(path), f)
+        return True
+
+    def _insert(self, tmp, sha256, filename, expected=None):
+        if expected is not None and sha256 != expected:
+            os.remove(tmp)
+            raise ValueError(f"{filename}: sha256 {sha256} does not match expected {expected}")
+        path = self.object_path(sha256, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)   # atomic: objek setengah jadi tidak pernah terlihat
+        with open(path + ".ok", "w") as f:
+            json.dump(self._stamp(path), f)
+        return path
+
+    def _tmp_path(self):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".incoming-", dir=self.root)
+        os.close(fd)
+        return tmp
+
+    def add(self, path, name=None, source=None):
+        """Copy a local file into the store (hashing while copying); returns the object path."""
+        name = name or os.path.basename(path)
+        filename = os.path.basename(path)
+        try:
+            expected = self.entry(name).get("sha256")
+        except KeyError:
+            expected = None
+        tmp = self._tmp_path()
+        with open(path, "rb") as src:
+            sha256 = _copy_hashed(src, tmp)
+        stored = self._insert(tmp, sha256, filename, expected)
+        self._record(name, {"sha256": sha256, "filename": filename,
+                            "source": source or DATASETS.get(name, {}).get("source")})
+        return stored
+
+    def resolve(self, name, fetcher=default_fetcher, recheck=False):
+        """Local path of dataset `name`, fetching it only when the store has no valid copy.
+
+        Pass fetcher=None in an offline environment: a missing object then raises
+        FileNotFoundError instead of touching the network.
+        """
+        entry = self.entry(name)
+        sha256, filename = entry.get("sha256"), entry["filename"]
+        if sha256 is not None and self.verify(self.object_path(sha256, filename), sha256, recheck):
+            return self.object_path(sha256, filename)
+        if fetcher is None:
+            raise FileNotFoundError(f"dataset {name!r} is not in {self.root} and no fetcher was given; "
+                                    f"add it with DatasetStore.add()")
+        tmp = self._tmp_path()
+        try:
+            fetcher(entry, tmp)
+            sha256_new = _hash_file(tmp)
+            path = self._insert(tmp, sha256_new, filename, sha256)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._record(name, {"sha256": sha256_new, "filename": filename, "source": entry.get("source")})
+        return path
+
+
+def resolve_dataset(name, store_dir=DEFAULT_STORE_DIR, fetcher=default_fetcher, recheck=False):
+    """Path of dataset `name` in the local store (see DatasetStore.resolve)."""
+    return DatasetStore(store_dir).resolve(name, fetcher=fetcher, recheck=recheck)
+
+
+def dataset_digest(path):
+    """sha256 of a store object, read from its file name (no hashing); None outside the store."""
+    stem = os.path.basename(path).split(".", 1)[0]
+    return stem if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem) else None
@@ -0,0 +1,181 @@
+"""Parsing datetime pickup/dropoff dengan format tetap yang dideteksi sekali.
+
+- Format TLC dideteksi dari sampel kecil, lalu dipakai untuk seluruh kolom/chunk.
+- Format lebar-tetap TLC ("2023-01-01 00:00:00", "01/01/2023 12:00:00 AM", ...) di-parse
+  langsung dari byte digit dengan NumPy, tanpa strptime per baris.
+- Format lain di-parse dengan format tetap; string berulang hanya di-parse sekali.
+- Hanya baris yang gagal yang jatuh ke parsing per-nilai (format="mixed").
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ISO_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Layout lebar-tetap: posisi digit tiap komponen dan karakter pemisah yang diharapkan
+FIXED_LAYOUTS = {
+    ISO_FORMAT: {"width": 19, "Y": 0, "m": 5, "d": 8, "H": 11, "M": 14, "S": 17,
+                 "seps": {4: b"-", 7: b"-", 10: b" T", 13: b":", 16: b":"}},
+    "%m/%d/%Y %I:%M:%S %p": {"width": 22, "Y": 6, "m": 0, "d": 3, "H": 11, "M": 14, "S": 17, "ampm": 20,
+                             "seps": {2: b"/", 5: b"/", 10: b" ", 13: b":", 16: b":", 19: b" "}},
+    "%m/%d/%Y %H:%M:%S": {"width": 19, "Y": 6, "m": 0, "d": 3, "H": 11, "M": 14, "S": 17,
+                          "seps": {2: b"/", 5: b"/", 10: b" ", 13: b":", 16: b":"}},
+    "%m/%d/%Y %H:%M": {"width": 16, "Y": 6, "m": 0, "d": 3, "H": 11, "M": 14,
+                       "seps": {2: b"/", 5: b"/", 10: b" ", 13: b":"}},
+    "%Y-%m-%d %H:%M": {"width": 16, "Y": 0, "m": 5, "d": 8, "H": 11, "M": 14,
+                       "seps": {4: b"-", 7: b"-", 10: b" T", 13: b":"}},
+}
+# Variasi format di file TLC lintas tahun (urutan = prioritas deteksi)
+TLC_FORMATS = tuple(FIXED_LAYOUTS)
+
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_NAT = np.datetime64("NaT")
+# rentang datetime64[ns] (±1677–2262) dalam detik; di luar itu cast ns meluap diam-diam
+_NS_SECONDS = (pd.Timestamp.min.ceil("s").value // 10**9, pd.Timestamp.max.floor("s").value // 10**9)
+
+
+def detect_format(values, sample_size=200, min_ratio=0.99):
+    """Return the first TLC format that parses (almost) all of a non-null sample, or None."""
+    sample = []
+    for v in values:
+        if pd.notna(v):
+            sample.append(str(v))
+            if len(sample) == sample_size:
+                break
+    if not sample:
+        return None
+    for fmt in TLC_FORMATS:
+        ok = 0
+        for v in sample:
+            try:
+                datetime.strptime(v, fmt)
+                ok += 1
+            except ValueError:
+                pass
+        if ok >= min_ratio * len(sample):
+            return fmt
+    return None
+
+
+def _days_from_civil(y, m, d):
+    # Algoritma Howard Hinnant: tanggal proleptic Gregorian → hari sejak 1970-01-01
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * np.where(m > 2, m - 3, m + 9) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_fixed_width(values, fmt):
+    """Vectorized parser for a zero-padded layout in FIXED_LAYOUTS.
+
+    Returns (datetime64[ns] array, ok mask); rows that don't match the layout exactly, or fall
+    outside the datetime64[ns] range, are NaT.
+    """
+    layout = FIXED_LAYOUTS[fmt]
+    n, width = len(values), layout["width"]
+    try:
+        raw = np.asarray(values, dtype=object).astype(f"S{width + 1}")
+    except UnicodeEncodeError:
+        return np.full(n, _NAT, dtype="datetime64[ns]"), np.zeros(n, dtype=bool)
+    b = raw.view(np.uint8).reshape(n, width + 1)
+
+    ok = b[:, width] == 0  # panjang string persis `width`
+    for pos, allowed in layout["seps"].items():
+        hit = np.zeros(n, dtype=bool)
+        for ch in allowed:
+            hit |= b[:, pos] == ch
+        ok &= hit
+
+    def field(start, size=2):
+        nonlocal ok
+        out = np.zeros(n, dtype=np.int32)
+        for i in range(start, start + size):
+            d = b[:, i] - np.uint8(48)  # non-digit wrap ke >9
+            ok &= d < 10
+            out = out * 10 + d
+        return out
+
+    year, month, day = field(layout["Y"], 4), field(layout["m"]), field(layout["d"])
+    hour, minute = field(layout["H"]), field(layout["M"])
+    second = field(layout["S"]) if "S" in layout else np.zeros(n, dtype=np.int32)
+
+    if "ampm" in layout:
+        p = layout["ampm"]
+        pm = b[:, p] == ord("P")
+        ok &= (pm | (b[:, p] == ord("A"))) & (b[:, p + 1] == ord("M")) & (hour >= 1) & (hour <= 12)
+        hour = hour % 12 + 12 * pm
+
+    ok &= (month >= 1) & (month <= 12) & (hour < 24) & (minute < 60) & (second < 60)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _MONTH_DAYS[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    ok &= (day >= 1) & (day <= month_days)
+
+    days = _days_from_civil(year.astype(np.int64), month, day)
+    seconds = days * 86400 + hour * 3600 + minute * 60 + second
+    ok &= (seconds >= _NS_SECONDS[0]) & (seconds <= _NS_SECONDS[1])
+    out = np.where(ok, seconds, 0).astype("datetime64[s]").astype("datetime64[ns]")
+    out[~ok] = _NAT
+    return out, ok
+
+
+def _as_ns(parsed):
+    """datetime64 values of any unit → datetime64[ns], NaT outside the ns range."""
+    seconds = np.asarray(parsed).astype("datetime64[s]")
+    valid = ~np.isnat(seconds)
+    valid[valid] = ((seconds[valid].astype(np.int64) >= _NS_SECONDS[0])
+                    & (seconds[valid].astype(np.int64) <= _NS_SECONDS[1]))
+    out = np.full(len(seconds), _NAT, dtype="datetime64[ns]")
+    out[valid] = np.asarray(parsed)[valid].astype("datetime64[ns]")
+    return out
+
+
+def _parse_memoized(values, fmt, **to_datetime_kwargs):
+    """to_datetime over the unique strings only, broadcast back via factorize codes."""
+    codes, uniques = pd.factorize(values)
+    out = np.full(len(values), _NAT, dtype="datetime64[ns]")
+    if len(uniques):
+        parsed = pd.to_datetime(pd.Series(uniques).astype(str), format=fmt, errors="coerce", **to_datetime_kwargs)
+        parsed = _as_ns(parsed)
+        hit = codes >= 0
+        out[hit] = parsed[codes[hit]]
+    return out
+
+
+def parse_datetimes(series, fmt=None):
+    """Drop-in for `pd.to_datetime(series, errors="coerce")` using a fixed (or detected) format."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    values = series.to_numpy(dtype=object)
+    fmt = fmt if fmt is not None else detect_format(values)
+
+    if fmt in FIXED_LAYOUTS:
+        out, _ = parse_fixed_width(values, fmt)
+    elif fmt is not None:
+        out = _parse_memoized(values, fmt)
+    else:
+        out = np.full(len(values), _NAT, dtype="datetime64[ns]")
+
+    # fallback per-nilai hanya untuk baris yang gagal
+    failed = np.isnat(out)
+    failed[failed] = pd.notna(values[failed])
+    if failed.any():
+        out[failed] = _parse_memoized(values[failed], "mixed")
+    return pd.Series(out, index=series.index, name=series.name)
+
+
+class DatetimeParser:
+    """Remembers the detected format per column so chunked reads detect it only once."""
+
+    def __init__(self, formats=None):
+        self.formats = dict(formats or {})
+
+    def parse(self, series):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if series.name not in self.formats:
+            self.formats[series.name] = detect_format(series.to_numpy(dtype=object))
+        return parse_datetimes(series, self.formats[series.name])
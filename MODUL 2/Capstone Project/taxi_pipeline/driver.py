@@ -0,0 +1,165 @@
+"""Driver multi-bulan: tiap file bulanan diproses satu worker (ProcessPoolExecutor).
+
+Worker memuat, menormalisasi, mengimputasi, membersihkan, dan mengagregasi satu bulan, lalu
+mengembalikan agregat parsial (TripAggregates) + laporan imputasi. Driver menggabungkan hasil
+dalam urutan file (bukan urutan selesai), jadi hasil akhir deterministik berapa pun jumlah
+worker dan bagaimana pun penjadwalannya.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import TripAggregates
+from .cache import DEFAULT_CACHE_DIR, load_prepared
+from .dtypes import memory_report
+from .impute import BatchImputer
+from .ingest import read_trips
+from .instrument import RunReport, current_report, stage
+from .schema import impute_columns
+from .stream import process_chunk
+
+
+def expand_paths(paths):
+    """Sorted, de-duplicated file list from a glob pattern or a list of paths/patterns."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    found = []
+    for p in paths:
+        p = os.fspath(p)
+        matches = glob.glob(p) if glob.has_magic(p) else [p]
+        found.extend(matches)
+    return sorted(set(found))
+
+
+def data_period(df, schema):
+    """'YYYY-MM' of the median pickup time (robust to stray trips from other months), or None."""
+    col = schema["pickup"]
+    if col is None or col not in df.columns:
+        return None
+    ts = df[col].to_numpy().astype("datetime64[ns]")
+    ts = ts[~np.isnat(ts)]
+    if not len(ts):
+        return None
+    return str(np.partition(ts, len(ts) // 2)[len(ts) // 2].astype("datetime64[M]"))
+
+
+def analyze_month(path, fill_values=None, alpha=0.05, sample_cap=100_000, use_cache=False,
+                  cache_dir=DEFAULT_CACHE_DIR, zones=None, ingest_only=False, instrument=False):
+    """Worker: one monthly file → {'source', 'ingest', 'aggregates', 'impute_report', 'fill_values'}.
+
+    With ingest_only=True the file is only loaded (aggregates is None). With instrument=True
+    and no RunReport active in this process (pool worker), stage records are returned
+    under 'stages' for the driver to graft into its report.
+    """
+    if instrument and current_report() is None:
+        with RunReport(name="worker") as report:
+            result = analyze_month(path, fill_values, alpha, sample_cap, use_cache, cache_dir, zones, ingest_only)
+        result["stages"] = report.to_dict()["stages"]
+        return result
+    with stage("analyze_month"):
+        return _analyze_month(path, fill_values, alpha, sample_cap, use_cache, cache_dir, zones, ingest_only)
+
+
+def _analyze_month(path, fill_values, alpha, sample_cap, use_cache, cache_dir, zones, ingest_only):
+    with stage("load") as st:
+        if use_cache:
+            df, schema = load_prepared(path, cache_dir=cache_dir, zones=zones)
+        else:
+            df, schema = read_trips(path, zones=zones)
+        st.rows_out = len(df)
+    mem = memory_report(df)
+    ingest = {"rows": len(df), "columns": df.shape[1], "bytes": int(mem["bytes"].sum()),
+              "baseline_bytes": int(mem["baseline_bytes"].sum()), "period": data_period(df, schema),
+              **{f"col_{role}": col for role, col in schema.items()}}
+    if ingest_only:
+        return {"source": path, "ingest": ingest, "aggregates": None, "impute_report": {}, "fill_values": {}}
+
+    report = {}
+    if fill_values is None:
+        # sama dengan notebook: mean/median per kolom dari normaltest, di-fit pada bulan ini
+        with stage("impute_fit", rows_in=len(df)):
+            imputer = BatchImputer(alpha=alpha, sample_cap=sample_cap).fit(df, impute_columns(schema))
+        fill_values, report = imputer.fill_values_, imputer.impute_report
+
+    df_clean, drop_stats = process_chunk(df, schema, fill_values)
+    with stage("aggregate", rows_in=len(df_clean)):
+        aggregates = TripAggregates().update(df_clean, schema, rows_in=drop_stats["rows_in"],
+                                             rule_bins=drop_stats["rules"].bins)
+    return {"source": path, "ingest": ingest, "aggregates": aggregates, "impute_report": report,
+            "fill_values": fill_values}
+
+
+def _analyze(args):
+    path, kwargs = args
+    return analyze_month(path, **kwargs)
+
+
+class MonthlyRun:
+    """Merged result of run_months(): final tables via `aggregates`, plus per-month logs."""
+
+    def __init__(self, results, aggregates=None):
+        self.sources = [r["source"] for r in results]
+        # aggregates = state awal (mis. dimuat dari disk oleh mode append); hasil baru digabung ke situ
+        self.aggregates = TripAggregates() if aggregates is None else aggregates
+        for r in results:
+            if r["aggregates"] is not None:
+                self.aggregates.merge(r["aggregates"])
+        self._results = results
+
+    def ingest_report(self):
+        """Rows, columns, memory and resolved column per role for each source."""
+        return pd.DataFrame([{"source": r["source"], **r["ingest"]} for r in self._results]).set_index("source")
+
+    def impute_report(self):
+        """Method/p-value/stat/fill value per (source, column)."""
+        rows = []
+        for r in self._results:
+            for col, value in r["fill_values"].items():
+                rows.append({"source": r["source"], "column": col, **r["impute_report"].get(col, {}),
+                             "fill_value": value})
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).set_index(["source", "column"])
+
+    def drop_counts(self):
+        """rows_in/rows_out/dropped per source, plus a total row."""
+        table = pd.DataFrame([{"source": r["source"],
+                               **(r["aggregates"].drop_stats() if r["aggregates"] is not None else r["drop_stats"])}
+                              for r in self._results if r["aggregates"] is not None or r.get("drop_stats")])
+        table = table.set_index("source")
+        table.loc["total"] = table.sum()
+        return table
+
+
+def run_months(paths, n_jobs=None, fill_values=None, alpha=0.05, sample_cap=100_000,
+               use_cache=False, cache_dir=DEFAULT_CACHE_DIR, zones=None, ingest_only=False):
+    """Analyze many monthly files in parallel and merge them into one MonthlyRun.
+
+    `paths` is a glob pattern or list of paths; `n_jobs` is the worker count (None = CPU
+    count, 1 = in-process, no pool). Without `fill_values`, each month is imputed with its
+    own fitted BatchImputer, as the notebook does for a single file.
+    """
+    files = expand_paths(paths)
+    if not files:
+        raise FileNotFoundError(f"no input files match {paths!r}")
+    kwargs = {"fill_values": fill_values, "alpha": alpha, "sample_cap": sample_cap,
+              "use_cache": use_cache, "cache_dir": cache_dir, "zones": zones, "ingest_only": ingest_only,
+              "instrument": current_report() is not None}
+    tasks = [(f, kwargs) for f in files]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(files))
+    if n_jobs == 1:
+        results = [_analyze(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # map() mengembalikan hasil sesuai urutan input → merge deterministik
+            results = list(pool.map(_analyze, tasks))
+        report = current_report()
+        for r in results:
+            if report is not None and "stages" in r:
+                report.graft(r.pop("stages"))
+    with stage("merge", rows_in=len(results)):
+        return MonthlyRun(results)
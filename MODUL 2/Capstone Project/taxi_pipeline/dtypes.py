@@ -0,0 +1,104 @@
+"""Rencana dtype hemat memori untuk kolom TLC.
+
+Hanya dtype category yang diberikan ke read_csv (teks apa pun valid sebagai kategori). Kolom
+numerik dibaca tanpa dtype ketat lalu di-coerce (to_numeric errors="coerce") dan baru diturunkan
+ke dtype ringkas (downcast): satu sel kotor ("abc", 1.5, 300 untuk UInt8) menjadi NaN/NA, tidak
+menggagalkan seluruh file/chunk dan tidak wrap-around.
+
+- komponen tarif → float32 (sen cukup presisi di float32)
+- trip_distance tetap float64: avg_speed_mph dibandingkan persis dengan ambang 120 mph
+- passenger_count → float32 (bisa diimputasi mean, jadi tidak integer)
+- vendor/payment/rate code → UInt8 nullable
+- PU/DO LocationID → category dengan kategori integer
+- label payment/rate code → category (lihat features.add_labels)
+"""
+
+import numpy as np
+import pandas as pd
+
+from .schema import normalize_columns, resolve_schema
+
+ROLE_DTYPES = {
+    "pass": "float32",
+    "fare": "float32", "mta": "float32", "impr": "float32",
+    "tolls": "float32", "tip": "float32", "total": "float32",
+    "extra": "float32", "ehail": "float32", "congestion": "float32",
+    "vendor": "UInt8", "payment": "UInt8", "ratecode": "UInt8",
+    "pu": "category", "do": "category",
+}
+# Kolom TLC tanpa peran analisis, tetap dibuat ringkas
+EXTRA_DTYPES = {
+    "store_and_fwd_flag": "category",
+    "trip_type": "UInt8",
+}
+CATEGORY_ROLES = ("pu", "do")
+
+
+def compact_dtypes(schema, columns=()):
+    """Compact dtype per (normalized) column: resolved roles plus EXTRA_DTYPES among `columns`."""
+    plan = {schema[r]: dt for r, dt in ROLE_DTYPES.items() if schema.get(r) is not None}
+    plan.update({c: dt for c, dt in EXTRA_DTYPES.items() if c in set(columns)})
+    return plan
+
+
+def plan_dtypes(raw_columns):
+    """Map raw CSV header names to their compact dtypes."""
+    raw_by_norm = dict(zip(normalize_columns(list(raw_columns)), raw_columns))
+    return {raw_by_norm[c]: dt for c, dt in compact_dtypes(resolve_schema(raw_by_norm), raw_by_norm).items()}
+
+
+def read_dtypes(plan):
+    """The part of a dtype plan that is safe for `pd.read_csv(dtype=...)` (category only)."""
+    return {c: dt for c, dt in plan.items() if dt == "category"}
+
+
+def downcast(s, dtype):
+    """Coerce a column to numbers (bad cells → NaN) and cast it to `dtype`.
+
+    For integer dtypes, values outside the dtype's range or with a fraction become NA.
+    """
+    if not pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        s = pd.to_numeric(s, errors="coerce")
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype.numpy_dtype)
+        x = s.to_numpy(dtype="float64", na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            ok = (x >= info.min) & (x <= info.max) & (x == np.floor(x))
+        return pd.Series(np.where(ok, x, np.nan), index=s.index, name=s.name).astype(dtype)
+    return s.astype(dtype)
+
+
+def numeric_categories(s):
+    """Turn a category column parsed from text ('74', '75', ...) into sorted integer categories."""
+    cats = pd.to_numeric(s.cat.categories, errors="coerce")
+    bad = pd.isna(cats) | (cats != np.floor(cats))
+    if bad.any():
+        # kategori bukan bilangan bulat (sel kotor) → NaN
+        s = s.cat.remove_categories(s.cat.categories[bad])
+        cats = cats[~bad]
+    if not cats.is_unique:      # mis. "74" dan "74.0"
+        return pd.to_numeric(s.astype(object), errors="coerce")
+    s = s.cat.rename_categories(cats.astype("int64"))
+    return s.cat.reorder_categories(np.sort(s.cat.categories.values))
+
+
+def memory_report(df):
+    """Bytes per column vs the default float64/int64/object layout, with savings."""
+    rows = []
+    for c in df.columns:
+        s = df[c]
+        used = s.memory_usage(deep=True, index=False)
+        if isinstance(s.dtype, pd.CategoricalDtype) and s.cat.categories.dtype.kind in "iuf":
+            baseline = len(s) * 8
+        elif isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(s.dtype) or s.dtype == object:
+            baseline = s.astype(object).memory_usage(deep=True, index=False)
+        elif s.dtype == bool:
+            baseline = used
+        else:
+            baseline = len(s) * 8
+        rows.append({"column": c, "dtype": str(s.dtype), "bytes": used,
+                     "baseline_bytes": baseline, "saved_bytes": baseline - used})
+    report = pd.DataFrame(rows).set_index("column")
+    report["saved_%"] = (report["saved_bytes"] / report["baseline_bytes"].where(report["baseline_bytes"] > 0) * 100).round(1)
+    return report
@@ -0,0 +1,159 @@
+"""Rekonsiliasi tarif: Σ komponen tarif vs total_amount, dengan toleransi per rate code.
+
+Semua komponen yang ada di skema ikut dijumlah (fare, extra, mta_tax, improvement_surcharge,
+tolls, tip, ehail_fee, congestion_surcharge — yang tidak ada di layout file dilewati). Penjumlahan
+memakai satu akumulator float64 yang diisi kolom demi kolom (NaN dilewati, seperti
+sum(skipna=True)), tanpa membangun DataFrame irisan. Toleransi diambil per baris dari tabel
+ber-indeks rate code (np.take), jadi biaya per chunk tetap linear dan sebanding dengan ingest.
+
+FareMismatchStats meringkas hasilnya per (vendor, bulan pickup): jumlah trip, yang bisa dicek,
+mismatch, serta selisih rata-rata/maksimum; bisa digabung antar chunk/bulan seperti agregat lain.
+"""
+
+import numpy as np
+import pandas as pd
+
+# urutan = urutan komponen di struk TLC
+FARE_COMPONENT_ROLES = ("fare", "extra", "mta", "impr", "tolls", "tip", "ehail", "congestion")
+# ambang lama notebook
+FARE_TOLERANCE = 0.75
+# profil → {rate code: toleransi $, "default": untuk kode lain/NaN}
+TOLERANCE_PROFILES = {
+    "flat": {"default": FARE_TOLERANCE},
+    # bandara/luar kota: surcharge & tol dibulatkan; negotiated fare diketik manual oleh sopir
+    "ratecode": {"default": FARE_TOLERANCE, 2: 1.25, 3: 1.25, 4: 1.25, 5: 2.50, 6: 1.00},
+    "strict": {"default": 0.01},
+}
+DEFAULT_PROFILE = "ratecode"
+_MAX_CODE = 255
+
+
+def tolerance_table(profile=DEFAULT_PROFILE):
+    """Tolerance per rate code 0..255 (last slot = missing code) for a profile name or dict."""
+    spec = TOLERANCE_PROFILES[profile] if isinstance(profile, str) else profile
+    table = np.full(_MAX_CODE + 2, float(spec.get("default", FARE_TOLERANCE)))
+    for code, tol in spec.items():
+        if code != "default":
+            table[int(code)] = float(tol)
+    return table
+
+
+def fare_components(schema):
+    """Physical fare component columns present in the schema."""
+    return [schema[r] for r in FARE_COMPONENT_ROLES if schema.get(r) is not None]
+
+
+def _float(df, col):
+    return df[col].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def reconcile(df, schema, profile=DEFAULT_PROFILE):
+    """(components_sum, diff = sum − total, mismatch flag) arrays, or None without fare/total columns."""
+    if schema["fare"] is None or schema["total"] is None:
+        return None
+    acc = np.zeros(len(df))
+    for c in fare_components(schema):
+        x = _float(df, c)
+        np.add(acc, x, out=acc, where=~np.isnan(x))
+    diff = acc - _float(df, schema["total"])
+
+    table = tolerance_table(profile)
+    if schema["ratecode"] is not None:
+        code = _float(df, schema["ratecode"])
+        idx = np.where((code >= 0) & (code <= _MAX_CODE), code, _MAX_CODE + 1)
+        tol = table[np.nan_to_num(idx, nan=_MAX_CODE + 1).astype(np.intp)]
+    else:
+        tol = table[-1]
+    with np.errstate(invalid="ignore"):
+        flag = np.abs(diff) > tol   # NaN total → bukan mismatch (tidak bisa dicek)
+    return acc, diff, flag
+
+
+def add_fare_check(df, schema, profile=DEFAULT_PROFILE):
+    """Add fare_components_sum, total_components_diff and fare_mismatch_flag (flag only, no drop)."""
+    result = reconcile(df, schema, profile)
+    if result is not None:
+        df["fare_components_sum"], df["total_components_diff"], df["fare_mismatch_flag"] = result
+    return df
+
+
+class FareMismatchStats:
+    """Mismatch counts and differences per (vendor, pickup month); update() per chunk, merge() across."""
+
+    COLUMNS = ("trips", "checked", "mismatches", "diff_sum", "abs_diff_sum", "abs_diff_max")
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+        self.table = None
+
+    def update(self, df, schema):
+        if "total_components_diff" in df.columns:
+            diff = _float(df, "total_components_diff")
+            flag = df["fare_mismatch_flag"].to_numpy(dtype=bool)
+        else:
+            result = reconcile(df, schema, self.profile)
+            if result is None:
+                return self
+            _, diff, flag = result
+        n = len(diff)
+        vendor = _float(df, schema["vendor"]) if schema["vendor"] is not None else np.full(n, np.nan)
+        vendor = np.where((vendor >= 0) & (vendor < _MAX_CODE), vendor, -1).astype(np.int64)
+        month = np.full(n, -1, dtype=np.int64)   # bulan sejak 1970-01; -1 = tanpa waktu pickup
+        if schema["pickup"] is not None:
+            ts = df[schema["pickup"]].to_numpy().astype("datetime64[M]")
+            ok = ~np.isnat(ts)
+            month[ok] = ts[ok].astype(np.int64)
+        # kunci gabungan bulan × vendor → factorize + bincount, tanpa groupby pandas
+        inverse, keys = pd.factorize(month * (_MAX_CODE + 1) + vendor + 1)
+        size = len(keys)
+        checked = ~np.isnan(diff)
+        d = np.where(checked, diff, 0.0)
+        abs_d = np.abs(d)
+        abs_max = np.zeros(size)
+        np.maximum.at(abs_max, inverse, abs_d)
+        key_month, key_vendor = np.divmod(keys, _MAX_CODE + 1)
+        part = pd.DataFrame({
+            "trips": np.bincount(inverse, minlength=size),
+            "checked": np.bincount(inverse, weights=checked, minlength=size).astype(np.int64),
+            "mismatches": np.bincount(inverse, weights=flag, minlength=size).astype(np.int64),
+            "diff_sum": np.bincount(inverse, weights=d, minlength=size),
+            "abs_diff_sum": np.bincount(inverse, weights=abs_d, minlength=size),
+            "abs_diff_max": abs_max,
+        }, index=pd.MultiIndex.from_arrays([key_vendor - 1, key_month], names=["vendor", "month"]))
+        self._absorb(part)
+        return self
+
+    def _absorb(self, part):
+        if self.table is None:
+            self.table = part
+            return
+        both = pd.concat([self.table, part])
+        self.table = both.groupby(level=[0, 1]).agg(
+            {c: ("max" if c == "abs_diff_max" else "sum") for c in self.COLUMNS})
+
+    def merge(self, other):
+        if other.table is not None:
+            self._absorb(other.table)
+        return self
+
+    def report(self):
+        """Per (vendor, month 'YYYY-MM') trips, mismatches, mismatch % and mean/max |diff|."""
+        if self.table is None:
+            return pd.DataFrame(columns=["trips", "checked", "mismatches", "mismatch_%", "mean_diff",
+                                         "mean_abs_diff", "max_abs_diff"])
+        t = self.table.sort_index()
+        vendor = t.index.get_level_values("vendor").to_numpy()
+        month = t.index.get_level_values("month").to_numpy()
+        label = [f"{1970 + m // 12:04d}-{m % 12 + 1:02d}" if m >= 0 else None for m in month]
+        checked = t["checked"].where(t["checked"] > 0)
+        out = pd.DataFrame({
+            "trips": t["trips"].to_numpy(),
+            "checked": t["checked"].to_numpy(),
+            "mismatches": t["mismatches"].to_numpy(),
+            "mismatch_%": (t["mismatches"] / checked * 100).round(2).to_numpy(),
+            "mean_diff": (t["diff_sum"] / checked).round(3).to_numpy(),
+            "mean_abs_diff": (t["abs_diff_sum"] / checked).round(3).to_numpy(),
+            "max_abs_diff": t["abs_diff_max"].round(2).to_numpy(),
+        }, index=pd.MultiIndex.from_arrays([pd.Series(vendor, dtype="float64").where(vendor >= 0).astype("Int64"),
+                                            label], names=["vendor", "month"]))
+        return out
@@ -0,0 +1,31 @@
+"""Fitur analisis: flag konsistensi tarif (lihat fares.py), fitur waktu (lihat timefeatures.py),
+label payment/rate code."""
+
+import pandas as pd
+
+from .fares import add_fare_check
+from .timefeatures import add_time_features
+
+PAYMENT_LABELS = {1: 'Credit Card', 2: 'Cash', 3: 'No Charge', 4: 'Dispute', 5: 'Unknown', 6: 'Voided'}
+RATE_LABELS = {1: 'Standard', 2: 'JFK', 3: 'Newark', 4: 'Nassau/Westchester', 5: 'Negotiated', 6: 'Group'}
+AIRPORT_CODES = ['JFK', 'Newark']
+
+def label_series(codes, labels):
+    """Map numeric codes to a categorical of labels (categories in code order)."""
+    return codes.map(labels).astype(pd.CategoricalDtype(list(labels.values())))
+
+
+def add_labels(df, schema):
+    if schema["payment"] is not None:
+        df['payment_type_label'] = label_series(df[schema["payment"]], PAYMENT_LABELS)
+    if schema["ratecode"] is not None:
+        df['rate_code_label'] = label_series(df[schema["ratecode"]], RATE_LABELS)
+        df['is_airport'] = df['rate_code_label'].isin(AIRPORT_CODES)
+    return df
+
+
+def add_analysis_features(df, schema):
+    add_fare_check(df, schema)
+    add_time_features(df, schema)
+    add_labels(df, schema)
+    return df
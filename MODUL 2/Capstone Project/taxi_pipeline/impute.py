@@ -0,0 +1,175 @@
+"""Imputasi mean/median berbasis uji normalitas (D'Agostino–Pearson), dijalankan batch.
+
+Sampel baris diambil sekali untuk semua kolom target, uji normalitas dihitung bersama pada
+array 2-D (NaN-aware per kolom), lalu statistik pengisi dihitung sekali per kolom (paralel
+antar kolom). Hasil fit bisa dipakai ulang untuk chunk/bulan berikutnya tanpa uji ulang.
+
+Untuk mode streaming/paralel, partial_fit() mengakumulasi mean persis dan median dari
+QuantileSketch per kolom chunk demi chunk; imputer dari worker lain digabung dengan merge().
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .sketch import DEFAULT_EPS, QuantileSketch
+
+
+def normaltest_columns(X):
+    """D'Agostino–Pearson K² for each column of X, ignoring NaN per column.
+
+    Same formulas as scipy.stats.normaltest (skewtest + kurtosistest), vectorized over
+    columns that may have different non-null counts. Returns (stat, p_value, n).
+    """
+    X = np.asarray(X, dtype=float)
+    valid = ~np.isnan(X)
+    n = valid.sum(axis=0).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(X, axis=0) / n
+        d = np.where(valid, X - mean, 0.0)
+        d2 = d * d
+        m2 = d2.sum(axis=0) / n
+        m3 = (d2 * d).sum(axis=0) / n
+        m4 = (d2 * d2).sum(axis=0) / n
+
+        # skewtest
+        b2 = m3 / m2**1.5
+        y = b2 * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n**2 + 27*n - 70) * (n + 1) * (n + 3)
+                 / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9)))
+        W2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(W2))
+        alpha = np.sqrt(2.0 / (W2 - 1))
+        y = np.where(y == 0, 1, y)
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha)**2 + 1))
+
+        # kurtosistest
+        b2 = m4 / m2**2
+        E = 3.0 * (n - 1) / (n + 1)
+        varb2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+        x = (b2 - E) / np.sqrt(varb2)
+        sqrtbeta1 = (6.0 * (n*n - 5*n + 2) / ((n + 7) * (n + 9))
+                     * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3))))
+        A = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + np.sqrt(1 + 4.0 / sqrtbeta1**2))
+        term1 = 1 - 2 / (9.0 * A)
+        denom = 1 + x * np.sqrt(2 / (A - 4.0))
+        term2 = np.sign(denom) * np.where(denom == 0.0, np.nan, ((1 - 2.0 / A) / np.abs(denom))**(1 / 3.0))
+        z_kurt = (term1 - term2) / np.sqrt(2 / (9.0 * A))
+
+    k2 = z_skew**2 + z_kurt**2
+    # p-value chi-square 2 derajat bebas: sf(x) = exp(-x/2) persis (tanpa impor scipy.stats)
+    return k2, np.exp(-k2 / 2), n
+
+
+class BatchImputer:
+    """Fitted mean/median imputer; `impute_report` matches the notebook's per-column table.
+
+    fit() → decides mean vs median per column (normaltest on one shared row sample) and
+    computes the fill values; transform() → fillna with them (any chunk or month).
+    With `sketch_eps` set, medians come from a QuantileSketch with that rank error instead
+    of sorting the full column; partial_fit()/merge() always use sketches.
+    """
+
+    def __init__(self, alpha=0.05, sample_cap=100_000, seed=42, n_jobs=None, sketch_eps=None):
+        self.alpha = alpha
+        self.sample_cap = sample_cap
+        self.seed = seed
+        self.n_jobs = n_jobs
+        self.sketch_eps = sketch_eps
+        self.impute_report = {}
+        self.fill_values_ = {}
+        self.sketches_ = {}
+
+    def _sample(self, df, columns):
+        n = len(df)
+        idx = slice(None)
+        if n > self.sample_cap:
+            rng = np.random.default_rng(self.seed)
+            idx = np.sort(rng.choice(n, size=self.sample_cap, replace=False))
+        # indeks per kolom: tidak menyalin seluruh baris df[columns] dulu
+        return np.column_stack([df[c].to_numpy(dtype="float64", na_value=np.nan)[idx] for c in columns])
+
+    def _fill_value(self, series, method):
+        x = series.to_numpy(dtype="float64", na_value=np.nan)
+        if np.isnan(x).all():
+            return np.nan
+        if method == "median" and self.sketch_eps is not None:
+            return QuantileSketch(eps=self.sketch_eps, seed=self.seed).update(x).median()
+        return float(np.nanmean(x) if method == "mean" else np.nanmedian(x))
+
+    def _decide(self, df, columns):
+        X = self._sample(df, columns)
+        stat, p, n = normaltest_columns(X)
+        std = np.nanstd(X, axis=0)
+        for j, c in enumerate(columns):
+            # kalau data terlalu kecil/variasi nol → median
+            if n[j] < 8 or not std[j] > 0:
+                self.impute_report[c] = {"method": "median", "p_value": np.nan, "stat": np.nan}
+            else:
+                self.impute_report[c] = {"method": ("mean" if p[j] >= self.alpha else "median"),
+                                         "p_value": float(p[j]), "stat": float(stat[j])}
+
+    def fit(self, df, columns):
+        columns = [c for c in columns if c is not None and c in df.columns]
+        self.impute_report, self.fill_values_, self.sketches_ = {}, {}, {}
+        if not columns:
+            return self
+        self._decide(df, columns)
+
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            values = pool.map(lambda c: self._fill_value(df[c], self.impute_report[c]["method"]), columns)
+            self.fill_values_ = dict(zip(columns, values))
+        return self
+
+    def partial_fit(self, df, columns):
+        """Fold one chunk into the fit; mean vs median is decided on the first chunk seen."""
+        columns = [c for c in columns if c is not None and c in df.columns]
+        new = [c for c in columns if c not in self.impute_report]
+        if new:
+            self._decide(df, new)
+        eps = self.sketch_eps if self.sketch_eps is not None else DEFAULT_EPS
+        for c in columns:
+            sketch = self.sketches_.setdefault(c, QuantileSketch(eps=eps, seed=self.seed))
+            sketch.update(df[c].to_numpy(dtype="float64", na_value=np.nan))
+        self._refresh()
+        return self
+
+    def merge(self, other):
+        """Combine with an imputer partial_fit on other chunks (this one's methods win)."""
+        for c, entry in other.impute_report.items():
+            self.impute_report.setdefault(c, entry)
+        for c, sketch in other.sketches_.items():
+            if c in self.sketches_:
+                self.sketches_[c].merge(sketch)
+            else:
+                self.sketches_[c] = sketch
+        self._refresh()
+        return self
+
+    def _refresh(self):
+        for c, sketch in self.sketches_.items():
+            method = self.impute_report[c]["method"]
+            self.fill_values_[c] = sketch.mean() if method == "mean" else sketch.median()
+
+    def transform(self, df):
+        for c, v in self.fill_values_.items():
+            if c in df.columns:
+                df[c] = df[c].fillna(v)
+        return df
+
+    def fit_transform(self, df, columns):
+        return self.fit(df, columns).transform(df)
+
+    def report(self):
+        return pd.DataFrame.from_dict(self.impute_report, orient="index")
+
+    def to_dict(self):
+        return {"alpha": self.alpha, "impute_report": self.impute_report, "fill_values": self.fill_values_}
+
+    @classmethod
+    def from_dict(cls, state):
+        imputer = cls(alpha=state["alpha"])
+        imputer.impute_report = dict(state["impute_report"])
+        imputer.fill_values_ = dict(state["fill_values"])
+        return imputer
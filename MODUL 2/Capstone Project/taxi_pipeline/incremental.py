@@ -0,0 +1,115 @@
+"""Mode append: state agregat tersimpan di disk, bulan baru cukup diproses sekali.
+
+Saat file bulanan baru datang, hanya file itu yang dibaca, diimputasi, dibersihkan dan
+diagregasi; hasilnya digabung ke state lama (kubus, histogram tip, sketch kuantil, data
+grafik — semuanya mergeable), lalu tabel laporan dibuat ulang dari state gabungan. File yang
+isinya (sha256) sudah tercatat dilewati, jadi menjalankan ulang perintah yang sama tidak
+menghitung dobel. Tabel dari kubus identik dengan run_months atas semua file; kuantil dari
+sketch bisa bergeser sedikit (masih dalam eps) karena urutan merge berbeda.
+
+Isi direktori state:
+    manifest.json          versi, generasi, dan catatan per sumber (digest, ingest + periode,
+                           laporan imputasi, fill value, drop stats)
+    aggregates-<gen>/      TripAggregates.save() generasi itu
+
+manifest.json ditulis terakhir lewat os.replace, jadi state yang terlihat selalu utuh: kalau
+proses mati di tengah, generasi setengah jadi diabaikan dan dihapus pada run berikutnya.
+"""
+
+import json
+import os
+import shutil
+
+from .aggregate import TripAggregates
+from .cache import DEFAULT_CACHE_DIR, file_digest
+from .driver import MonthlyRun, expand_paths, run_months
+from .instrument import stage
+
+STATE_VERSION = "1"
+MANIFEST = "manifest.json"
+
+
+def _to_python(value):
+    # skalar numpy (fill value, p-value) → tipe JSON biasa
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def load_state(state_dir):
+    """(manifest, TripAggregates) of a state directory; an empty state if none exists yet."""
+    path = os.path.join(state_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"version": STATE_VERSION, "generation": 0, "sources": []}, TripAggregates()
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest["version"] != STATE_VERSION:
+        raise ValueError(f"state version {manifest['version']} != {STATE_VERSION}; rebuild {state_dir}")
+    return manifest, TripAggregates.load(os.path.join(state_dir, f"aggregates-{manifest['generation']}"))
+
+
+def save_state(state_dir, manifest, aggregates):
+    """Write a new generation of the state, then swap the manifest to it atomically."""
+    os.makedirs(state_dir, exist_ok=True)
+    generation = manifest["generation"] + 1
+    aggregates.save(os.path.join(state_dir, f"aggregates-{generation}"))
+    manifest = {**manifest, "generation": generation}
+    tmp = os.path.join(state_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, default=_to_python)
+    os.replace(tmp, os.path.join(state_dir, MANIFEST))
+    # generasi lama / sisa run yang gagal
+    for name in os.listdir(state_dir):
+        if name.startswith("aggregates-") and name != f"aggregates-{generation}":
+            shutil.rmtree(os.path.join(state_dir, name), ignore_errors=True)
+    return manifest
+
+
+def _record(result, digest):
+    return {"source": result["source"], "digest": digest, "ingest": result["ingest"],
+            "impute_report": result["impute_report"], "fill_values": result["fill_values"],
+            "drop_stats": result["aggregates"].drop_stats() if result["aggregates"] is not None else None}
+
+
+def latest_source(sources):
+    """Record of the chronologically latest month (ingest period; append order breaks ties/gaps)."""
+    order = range(len(sources))
+    return sources[max(order, key=lambda i: (sources[i]["ingest"].get("period") or "", i))]
+
+
+def append_months(paths, state_dir, n_jobs=None, reuse_fill_values=False, alpha=0.05, sample_cap=100_000,
+                  use_cache=False, cache_dir=DEFAULT_CACHE_DIR, zones=None):
+    """Fold new monthly files into the persisted state and return the MonthlyRun over everything.
+
+    Files whose content digest is already in the state are skipped. Each new month is
+    imputed with its own fitted values (as run_months does), or, with reuse_fill_values=True,
+    with the fill values persisted for the latest previous month (no refit).
+    """
+    files = expand_paths(paths)
+    if not files:
+        raise FileNotFoundError(f"no input files match {paths!r}")
+    with stage("load_state"):
+        manifest, aggregates = load_state(state_dir)
+    known = {s["digest"] for s in manifest["sources"]}
+    new = []
+    with stage("digest", rows_in=len(files)):
+        for path in files:
+            digest = file_digest(path)
+            if digest not in known:
+                known.add(digest)
+                new.append((path, digest))
+
+    fill_values = None
+    if reuse_fill_values and manifest["sources"]:
+        fill_values = latest_source(manifest["sources"])["fill_values"] or None
+    if new:
+        with stage("run_months", rows_in=len(new)):
+            run = run_months([p for p, _ in new], n_jobs=n_jobs, fill_values=fill_values, alpha=alpha,
+                             sample_cap=sample_cap, use_cache=use_cache, cache_dir=cache_dir, zones=zones)
+        aggregates.merge(run.aggregates)
+        records = [_record(r, d) for r, (_, d) in zip(run._results, new)]
+        with stage("save_state"):
+            manifest = save_state(state_dir, {**manifest, "sources": manifest["sources"] + records}, aggregates)
+
+    results = [{**s, "aggregates": None} for s in manifest["sources"]]
+    return MonthlyRun(results, aggregates=aggregates)
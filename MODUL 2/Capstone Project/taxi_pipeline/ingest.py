@@ -0,0 +1,154 @@
+"""Pemuatan CSV TLC: casting tipe, fitur durasi/kecepatan, dan pembacaan per chunk.
+
+Skema di-resolve dari header saja (plan_read): kandidat nama → kolom fisik, lalu hanya kolom
+ber-peran yang dibaca (usecols). Hanya kolom kategori yang diberi dtype saat baca; kolom
+numerik di-coerce lalu diturunkan ke dtype ringkas di coerce_types (lihat dtypes.py). Rencana baca di-cache per layout
+header, jadi file bulanan dengan layout sama (atau varian tahun lain: ehail_fee /
+congestion_surcharge ada atau tidak) tidak di-resolve ulang.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .datetimes import DatetimeParser
+from .dtypes import CATEGORY_ROLES, compact_dtypes, downcast, numeric_categories, plan_dtypes, read_dtypes
+from .instrument import stage
+from .schema import (COLUMN_CANDIDATES, DATETIME_ROLES, NUMERIC_ROLES, ZERO_FILL_ROLES,
+                     cols_for, normalize_columns, resolve_schema)
+from .spatial import assign_zone_columns
+
+DEFAULT_CHUNKSIZE = 250_000
+# (header mentah, project) → (schema, usecols, dtype)
+_READ_PLANS = {}
+
+
+def coerce_types(df, schema, parser=None, compact=True):
+    # Datetime: format TLC dideteksi sekali per kolom (lihat datetimes.py)
+    parser = parser if parser is not None else DatetimeParser()
+    with stage("parse_datetimes", rows_in=len(df)):
+        for c in cols_for(schema, DATETIME_ROLES):
+            df[c] = parser.parse(df[c])
+    # Numerik: sel kotor → NaN, lalu (compact) dtype ringkas; UInt8 di luar 0..255 → NA
+    categorical = set(cols_for(schema, CATEGORY_ROLES))
+    targets = compact_dtypes(schema, df.columns) if compact else {}
+    for c in dict.fromkeys(cols_for(schema, NUMERIC_ROLES) + list(targets)):
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            if c in categorical:
+                df[c] = numeric_categories(df[c])
+        elif targets.get(c, "category") != "category":
+            df[c] = downcast(df[c], targets[c])
+        elif not pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def add_trip_metrics(df, schema):
+    """Add trip_duration_minutes/hours and avg_speed_mph (NaN when inputs are missing)."""
+    col_pickup, col_dropoff, col_dist = schema["pickup"], schema["dropoff"], schema["dist"]
+    if (col_pickup is not None) and (col_dropoff is not None):
+        df["trip_duration_minutes"] = (df[col_dropoff] - df[col_pickup]).dt.total_seconds()/60.0
+        df["trip_duration_hours"]   = df["trip_duration_minutes"]/60.0
+    else:
+        df["trip_duration_minutes"] = np.nan
+        df["trip_duration_hours"]   = np.nan
+
+    if col_dist is not None:
+        df["avg_speed_mph"] = np.where(df["trip_duration_hours"]>0,
+                                       df[col_dist]/df["trip_duration_hours"], np.nan)
+    else:
+        df["avg_speed_mph"] = np.nan
+    return df
+
+
+def prepare_frame(df, schema=None, parser=None, zones=None, compact=True):
+    """Normalize columns, resolve the schema (unless given), cast types and add trip metrics.
+
+    Returns (df, schema). Pass the schema (and DatetimeParser) from the first chunk to keep
+    later chunks consistent. With a spatial.ZoneAssigner as `zones`, files that only have
+    pickup/dropoff lon/lat get pulocationid/dolocationid columns.
+    """
+    with stage("prepare", rows_in=len(df)) as st:
+        df.columns = normalize_columns(df.columns.tolist())
+        if schema is None:
+            schema = resolve_schema(df.columns)
+        if zones is not None:
+            with stage("zone_assign", rows_in=len(df)):
+                assign_zone_columns(df, schema, zones)
+        coerce_types(df, schema, parser, compact)
+        add_trip_metrics(df, schema)
+        st.rows_out = len(df)
+    return df, schema
+
+
+def fill_missing(df, schema, fill_values=None):
+    """Zero-fill tolls/tip, then fill the remaining columns from a precomputed {col: value} dict."""
+    for c in cols_for(schema, ZERO_FILL_ROLES):
+        df[c] = df[c].fillna(0.0)
+    for c, v in (fill_values or {}).items():
+        if c in df.columns:
+            df[c] = df[c].fillna(v)
+    return df
+
+
+def read_header(path, **read_csv_kwargs):
+    return pd.read_csv(path, nrows=0, **read_csv_kwargs).columns.tolist()
+
+
+def plan_read(header, project=True):
+    """(schema, usecols, dtype) for a raw CSV header, cached per layout.
+
+    `usecols` holds the raw names of every resolved role (None with project=False: read all
+    columns); `dtype` is the read-safe part of the compact dtype plan (see dtypes.read_dtypes)
+    restricted to the columns read.
+    """
+    key = (tuple(header), project)
+    plan = _READ_PLANS.get(key)
+    if plan is None:
+        raw_by_norm = dict(zip(normalize_columns(list(header)), header))
+        schema = resolve_schema(raw_by_norm)
+        dtype = read_dtypes(plan_dtypes(header))
+        usecols = None
+        if project:
+            usecols = [raw_by_norm[c] for c in cols_for(schema, COLUMN_CANDIDATES)]
+            dtype = {c: dt for c, dt in dtype.items() if c in set(usecols)}
+        plan = _READ_PLANS[key] = (schema, usecols, dtype)
+    schema, usecols, dtype = plan
+    # kopi: assign_zone_columns mengubah schema di tempat
+    return dict(schema), usecols, dtype
+
+
+def _read_kwargs(path, compact, project, read_csv_kwargs):
+    """(read_csv kwargs, schema or None) with the layout's projection and dtypes filled in."""
+    if not (compact or project) or "usecols" in read_csv_kwargs:
+        return read_csv_kwargs, None
+    schema, usecols, dtype = plan_read(read_header(path), project)
+    read_csv_kwargs = dict(read_csv_kwargs)
+    if project:
+        read_csv_kwargs["usecols"] = usecols
+    if compact:
+        read_csv_kwargs.setdefault("dtype", dtype)
+    return read_csv_kwargs, schema
+
+
+def read_trips(path, compact=True, zones=None, project=True, **read_csv_kwargs):
+    """Read a trip CSV (role columns only, compact dtypes by default) and prepare it. Returns (df, schema)."""
+    read_csv_kwargs, schema = _read_kwargs(path, compact, project, read_csv_kwargs)
+    with stage("read_csv") as st:
+        df = pd.read_csv(path, **read_csv_kwargs)
+        st.rows_out = len(df)
+    return prepare_frame(df, schema, zones=zones, compact=compact)
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, compact=True, zones=None, project=True, **read_csv_kwargs):
+    """Yield (chunk, schema) for a CSV read in bounded chunks; schema is resolved once."""
+    parser = DatetimeParser()
+    read_csv_kwargs, schema = _read_kwargs(path, compact, project, read_csv_kwargs)
+    reader = iter(pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs))
+    while True:
+        with stage("read_csv") as st:
+            chunk = next(reader, None)
+            st.rows_out = len(chunk) if chunk is not None else 0
+        if chunk is None:
+            return
+        chunk, schema = prepare_frame(chunk, schema, parser, zones, compact)
+        yield chunk, schema
@@ -0,0 +1,241 @@
+"""Instrumentasi per stage: wall time, CPU time, baris masuk/keluar, dan delta puncak memori.
+
+Modul pipeline membungkus langkahnya dengan `stage("nama")`; tanpa RunReport aktif, stage()
+tidak melakukan apa-apa (biaya ~nol). Dengan `with RunReport() as report:` tiap stage dicatat
+per path bertingkat ("load;prepare;parse_datetimes"); panggilan berulang (per chunk) dijumlah.
+Hasilnya bisa ditulis sebagai JSON dan sebagai collapsed stacks (format flamegraph.pl /
+speedscope), opsional ditambah profil cProfile (.prof).
+
+Memori = RSS proses (Linux: /proc/self/statm, di-sampling oleh thread latar); di OS lain
+dipakai ru_maxrss (hanya naik, jadi delta puncak per stage bisa 0).
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+_SAMPLE_INTERVAL = 0.005
+_CURRENT = contextvars.ContextVar("taxi_pipeline_report", default=None)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """Resident set size in bytes (None when the platform gives no way to read it)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageRecord:
+    """Accumulated measurements for one stage path."""
+
+    FIELDS = ("path", "calls", "wall_s", "cpu_s", "rows_in", "rows_out", "rss_start_mb", "peak_delta_mb")
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.rss_start_mb = None
+        self.peak_delta_mb = None
+
+    @property
+    def name(self):
+        return self.path.rsplit(";", 1)[-1]
+
+    @property
+    def depth(self):
+        return self.path.count(";")
+
+    def add(self, other):
+        self.calls += other["calls"]
+        self.wall_s += other["wall_s"]
+        self.cpu_s += other["cpu_s"]
+        for key in ("rows_in", "rows_out"):
+            if other[key] is not None:
+                setattr(self, key, (getattr(self, key) or 0) + other[key])
+        if self.rss_start_mb is None:
+            self.rss_start_mb = other["rss_start_mb"]
+        if other["peak_delta_mb"] is not None:
+            self.peak_delta_mb = max(self.peak_delta_mb or 0.0, other["peak_delta_mb"])
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+
+class _ActiveStage:
+    """Handle yielded by stage(); set `rows_out` (and optionally `rows_in`) inside the block."""
+
+    def __init__(self, rows_in):
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak_rss = None
+
+
+class _NullStage:
+    rows_in = rows_out = None
+
+    def __setattr__(self, key, value):
+        pass
+
+
+_NULL = _NullStage()
+
+
+class RunReport:
+    """Collects stage records while active (`with RunReport() as report:`)."""
+
+    def __init__(self, name="run", sample_interval=_SAMPLE_INTERVAL, profile=False):
+        self.name = name
+        self.sample_interval = sample_interval
+        self.records = {}
+        self.meta = {"name": name, "pid": os.getpid(), "python": sys.version.split()[0]}
+        self._stack = []
+        self._active = []
+        self._lock = threading.Lock()
+        self._stop = None
+        self._token = None
+        self._profiler = cProfile.Profile() if profile else None
+        self._started = None
+
+    # ---- aktif/nonaktif ----------------------------------------------------
+
+    def __enter__(self):
+        self._token = _CURRENT.set(self)
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        threading.Thread(target=self._sample, daemon=True).start()
+        if self._profiler is not None:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler is not None:
+            self._profiler.disable()
+        self._stop.set()
+        _CURRENT.reset(self._token)
+        self.meta["wall_s"] = time.perf_counter() - self._started
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for active in self._active:
+                    active.peak_rss = max(active.peak_rss or 0, rss)
+
+    # ---- pencatatan --------------------------------------------------------
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        self._stack.append(name)
+        path = ";".join(self._stack)
+        active = _ActiveStage(rows_in)
+        rss0 = current_rss()
+        active.peak_rss = rss0
+        with self._lock:
+            self._active.append(active)
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield active
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            rss1 = current_rss()
+            with self._lock:
+                self._active.remove(active)
+            self._stack.pop()
+            peak = max(p for p in (active.peak_rss, rss1) if p is not None) if rss0 is not None else None
+            self.record(path, {"calls": 1, "wall_s": wall, "cpu_s": cpu,
+                               "rows_in": active.rows_in, "rows_out": active.rows_out,
+                               "rss_start_mb": rss0 / 1e6 if rss0 is not None else None,
+                               "peak_delta_mb": (peak - rss0) / 1e6 if rss0 is not None else None})
+
+    def record(self, path, values):
+        rec = self.records.get(path)
+        if rec is None:
+            rec = self.records[path] = StageRecord(path)
+        rec.add(values)
+
+    def graft(self, records, under=None):
+        """Add records collected elsewhere (e.g. a worker process) below the current stage."""
+        prefix = under if under is not None else ";".join(self._stack)
+        for values in records:
+            path = f"{prefix};{values['path']}" if prefix else values["path"]
+            self.record(path, values)
+
+    # ---- keluaran ----------------------------------------------------------
+
+    def to_dict(self):
+        return {"meta": self.meta, "stages": [r.to_dict() for r in self.records.values()]}
+
+    def table(self):
+        """Stage records as a DataFrame (one row per path), with self (exclusive) wall time."""
+        if not self.records:
+            return pd.DataFrame(columns=StageRecord.FIELDS)
+        table = pd.DataFrame([r.to_dict() for r in self.records.values()]).set_index("path")
+        table["self_wall_s"] = [self._self_wall(p) for p in table.index]
+        return table
+
+    def _self_wall(self, path):
+        rec = self.records[path]
+        children = [r for p, r in self.records.items()
+                    if p.startswith(path + ";") and r.depth == rec.depth + 1]
+        return max(rec.wall_s - sum(c.wall_s for c in children), 0.0)
+
+    def folded(self):
+        """Collapsed-stack lines ('a;b;c <microseconds>') of self wall time per stage."""
+        root = self.name
+        return [f"{root};{p} {int(round(self._self_wall(p) * 1e6))}" for p in self.records]
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
+        return path
+
+    def write_profile(self, path):
+        """cProfile stats (.prof, for snakeviz/pstats); requires RunReport(profile=True)."""
+        if self._profiler is None:
+            raise ValueError("RunReport was created without profile=True")
+        self._profiler.dump_stats(path)
+        return path
+
+
+def current_report():
+    """The RunReport active in this process (a forked pool worker does not inherit it)."""
+    report = _CURRENT.get()
+    return report if report is not None and report.meta["pid"] == os.getpid() else None
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time a pipeline stage in the active RunReport; a no-op when none is active."""
+    report = current_report()
+    if report is None:
+        yield _NULL
+        return
+    with report.stage(name, rows_in) as active:
+        yield active
@@ -0,0 +1,217 @@
+"""Matriks origin–destination (pickup zone → dropoff zone) per jam-dalam-minggu, sparse.
+
+Tiap ukuran (trips, revenue = Σ total_amount, Σ/count durasi) disimpan sebagai satu
+scipy.sparse CSR berbentuk (168, Z·Z): baris = bucket jam-dalam-minggu (hari × 24 + jam,
+Senin 00:00 = 0), kolom = pu × Z + do. Satu baris CSR = matriks OD satu bucket; matrix()
+mengembalikannya (atau jumlah beberapa bucket) sebagai CSR Z × Z berindeks LocationID.
+
+update() per chunk membangun COO dari array kunci (tanpa groupby pandas) dan menjumlahkannya ke
+CSR yang ada; merge() antar chunk/bulan/worker cukup penjumlahan sparse. Pasangan OD per
+bucket yang benar-benar terisi biasanya jauh di bawah 168 × 266², jadi memori kecil berapa pun
+jumlah trip. top_corridors() menjumlah bucket terpilih jadi satu vektor Z² lalu argpartition.
+scipy.sparse baru diimpor saat ada trip yang dipadatkan ke CSR (atau state non-kosong dimuat),
+jadi run yang tidak menyentuh matriks OD (mis. CLI --stages ingest) tidak ikut memuat scipy.
+"""
+
+import numpy as np
+import pandas as pd
+
+# LocationID TLC 1..265 (264/265 = unknown); indeks 0 tidak dipakai
+DEFAULT_ZONES = 266
+HOURS_OF_WEEK = 7 * 24
+OD_MEASURES = ("trips", "revenue", "duration_sum", "duration_count")
+# baris yang ditampung sebagai COO sebelum dijumlahkan ke CSR (penjumlahan CSR ~ O(nnz))
+_COMPACT_ROWS = 4_000_000
+
+
+def hour_of_week_buckets(days=None, hours=None):
+    """Bucket ids for the given days (0=Monday … 6=Sunday) and hours (0–23); None = all."""
+    days = range(7) if days is None else days
+    hours = range(24) if hours is None else hours
+    return sorted(d * 24 + h for d in days for h in hours)
+
+
+def _sparse():
+    from scipy import sparse
+    return sparse
+
+
+def _float(df, col):
+    return df[col].to_numpy(dtype="float64", na_value=np.nan) if col is not None and col in df.columns else None
+
+
+class ODMatrix:
+    """Sparse per-hour-of-week OD accumulators; update() per chunk, merge() across chunks/months."""
+
+    def __init__(self, n_zones=DEFAULT_ZONES):
+        self.n_zones = int(n_zones)
+        self.shape = (HOURS_OF_WEEK, self.n_zones * self.n_zones)
+        self.data = {}      # ukuran → CSR; belum ada = semua nol
+        self.skipped = 0    # trip tanpa pu/do/waktu yang valid
+        self._pending = []
+        self._pending_rows = 0
+
+    def _keys(self, df, schema):
+        """(row mask, bucket, flat od index) of the trips with valid zones and pickup time."""
+        pu, do = _float(df, schema["pu"]), _float(df, schema["do"])
+        hour, dow = _float(df, "pickup_hour"), _float(df, "pickup_day_of_week")
+        if hour is None and schema["pickup"] is not None:
+            ts = df[schema["pickup"]]
+            hour, dow = ts.dt.hour.to_numpy("float64", na_value=np.nan), \
+                ts.dt.dayofweek.to_numpy("float64", na_value=np.nan)
+        if pu is None or do is None or hour is None:
+            return np.zeros(len(df), dtype=bool), None, None
+        with np.errstate(invalid="ignore"):
+            ok = ((pu >= 0) & (pu < self.n_zones) & (do >= 0) & (do < self.n_zones)
+                  & (hour >= 0) & (dow >= 0))
+        bucket = (dow[ok] * 24 + hour[ok]).astype(np.int32)
+        od = pu[ok].astype(np.int32) * self.n_zones + do[ok].astype(np.int32)
+        return ok, bucket, od
+
+    def update(self, df_clean, schema):
+        ok, bucket, od = self._keys(df_clean, schema)
+        self.skipped += int(len(ok) - ok.sum())
+        if bucket is None or not len(bucket):
+            return self
+        total = _float(df_clean, schema["total"])
+        duration = _float(df_clean, "trip_duration_minutes")
+        values = {"trips": np.ones(len(bucket))}
+        values["revenue"] = np.nan_to_num(total[ok]) if total is not None else np.zeros(len(bucket))
+        if duration is not None:
+            d = duration[ok]
+            has = ~np.isnan(d)
+            values["duration_sum"] = np.where(has, d, 0.0)
+            values["duration_count"] = has.astype("float64")
+        else:
+            values["duration_sum"] = values["duration_count"] = np.zeros(len(bucket))
+        self._pending.append((bucket, od, values))
+        self._pending_rows += len(bucket)
+        if self._pending_rows >= _COMPACT_ROWS:
+            self.compact()
+        return self
+
+    def compact(self):
+        """Fold the buffered chunk keys into the CSR matrices."""
+        if not self._pending:
+            return self
+        sparse = _sparse()
+        bucket = np.concatenate([p[0] for p in self._pending])
+        od = np.concatenate([p[1] for p in self._pending])
+        for m in OD_MEASURES:
+            v = np.concatenate([p[2][m] for p in self._pending])
+            # COO → CSR menjumlahkan duplikat (bucket, od)
+            block = sparse.coo_array((v, (bucket, od)), shape=self.shape).tocsr()
+            self.data[m] = self.data[m] + block if m in self.data else block
+        self._pending, self._pending_rows = [], 0
+        return self
+
+    def merge(self, other):
+        if other.n_zones != self.n_zones:
+            raise ValueError("cannot merge OD matrices with different zone counts")
+        self.compact()
+        other.compact()
+        for m, csr in other.data.items():
+            self.data[m] = self.data[m] + csr if m in self.data else csr.copy()
+        self.skipped += other.skipped
+        return self
+
+    # ---- query -------------------------------------------------------------
+
+    def _summed(self, measure, buckets):
+        self.compact()
+        if measure not in self.data:
+            return np.zeros(self.shape[1])
+        rows = self.data[measure] if buckets is None else self.data[measure][np.asarray(buckets, dtype=np.intp)]
+        return np.asarray(rows.sum(axis=0)).ravel()
+
+    def _vector(self, measure, buckets):
+        if measure == "mean_duration":
+            total, count = self._summed("duration_sum", buckets), self._summed("duration_count", buckets)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(count > 0, total / count, 0.0)
+        return self._summed(measure, buckets)
+
+    def matrix(self, measure="trips", buckets=None):
+        """Z × Z CSR (row = pickup id, column = dropoff id) summed over `buckets` (None = whole week).
+
+        `measure` is one of trips, revenue, duration_sum, duration_count or mean_duration.
+        """
+        v = self._vector(measure, buckets)
+        nz = np.flatnonzero(v)
+        return _sparse().csr_array((v[nz], divmod(nz, self.n_zones)), shape=(self.n_zones, self.n_zones))
+
+    def bucket_matrix(self, bucket, measure="trips"):
+        """OD matrix of one hour-of-week bucket (day_of_week * 24 + hour)."""
+        return self.matrix(measure, [bucket])
+
+    def top_corridors(self, k=10, by="trips", buckets=None, zones=None):
+        """Top-k (pickup, dropoff) pairs by `by` over `buckets`, with trips, revenue and mean duration.
+
+        With a ZoneTable, pickup/dropoff zone names are added.
+        """
+        if by not in ("trips", "revenue", "mean_duration"):
+            raise ValueError(f"by must be trips, revenue or mean_duration, got {by!r}")
+        trips = self._summed("trips", buckets)
+        score = trips if by == "trips" else self._vector(by, buckets)
+        occupied = np.flatnonzero(trips)
+        k = min(k, len(occupied))
+        if k == 0:
+            return pd.DataFrame(columns=["pu", "do", "trips", "revenue", "mean_duration"])
+        pick = occupied[np.argpartition(-score[occupied], k - 1)[:k]]
+        revenue = self._summed("revenue", buckets)[pick]
+        dur_sum, dur_count = self._summed("duration_sum", buckets)[pick], self._summed("duration_count", buckets)[pick]
+        pu, do = divmod(pick, self.n_zones)
+        table = pd.DataFrame({"pu": pu, "do": do, "trips": trips[pick].astype(np.int64),
+                              "revenue": revenue.round(2),
+                              "mean_duration": np.where(dur_count > 0, dur_sum / np.maximum(dur_count, 1), np.nan)
+                              .round(2)})
+        table = table.sort_values([by, "pu", "do"],
+                                  ascending=[False, True, True]).reset_index(drop=True)
+        if zones is not None:
+            for end in ("pu", "do"):
+                names = zones.lookup(table[end])
+                table[f"{end}_zone"] = names["zone"].values
+                table[f"{end}_borough"] = names["borough"].values
+        return table
+
+    def hourly_profile(self, pu, do, measure="trips"):
+        """Value of one corridor in each of the 168 hour-of-week buckets."""
+        self.compact()
+        if measure in self.data:
+            values = self.data[measure][:, [int(pu) * self.n_zones + int(do)]].toarray().ravel()
+        else:
+            values = np.zeros(HOURS_OF_WEEK)
+        return pd.Series(values, index=pd.RangeIndex(HOURS_OF_WEEK, name="hour_of_week"))
+
+    # ---- persistensi -------------------------------------------------------
+
+    def state(self):
+        self.compact()
+        arrays = {"n_zones": np.int64(self.n_zones), "skipped": np.int64(self.skipped)}
+        for m in OD_MEASURES:
+            if m in self.data:
+                csr = self.data[m]
+                arrays.update({f"{m}/data": csr.data, f"{m}/indices": csr.indices, f"{m}/indptr": csr.indptr})
+            else:
+                arrays.update({f"{m}/data": np.zeros(0), f"{m}/indices": np.zeros(0, dtype=np.int32),
+                               f"{m}/indptr": np.zeros(HOURS_OF_WEEK + 1, dtype=np.int32)})
+        return arrays
+
+    @classmethod
+    def from_state(cls, state):
+        od = cls(int(state["n_zones"]))
+        od.skipped = int(state["skipped"])
+        for m in OD_MEASURES:
+            if len(state[f"{m}/data"]):
+                od.data[m] = _sparse().csr_array((state[f"{m}/data"], state[f"{m}/indices"], state[f"{m}/indptr"]),
+                                                 shape=od.shape)
+        return od
+
+    def save(self, path):
+        np.savez_compressed(path, **self.state())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls.from_state({k: f[k] for k in f.files})
@@ -0,0 +1,158 @@
+"""Groupby out-of-core: revenue per pickup zone lewat partisi hash yang di-spill ke disk.
+
+Tiap chunk bersih dipecah per hash(LocationID) ke N file partisi (record biner tetap:
+kunci int64 + nilai float64 per ukuran, di-append). Satu kunci selalu jatuh ke partisi yang
+sama, jadi tiap partisi diagregasi sendiri-sendiri (paralel, ProcessPoolExecutor) dan
+hasilnya cukup disambung — tanpa merge antar partisi. Partisi dibaca per blok lewat memmap,
+sehingga memori tetap terbatas walau satu zona sangat ramai. Hasil akhirnya tabel top-N yang
+sama dengan TripAggregates.revenue_by_pickup.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import revenue_table
+from .cleaning import clean_frame
+from .driver import expand_paths
+from .ingest import DEFAULT_CHUNKSIZE, fill_missing, iter_chunks
+from .instrument import stage
+
+DEFAULT_PARTITIONS = 16
+REVENUE_MEASURES = ("total", "tolls", "tip")
+_BLOCK_ROWS = 1 << 20
+# konstanta hash multiplikatif Fibonacci (64-bit), menyebar ID berurutan ke partisi berbeda
+_HASH_MULT = np.uint64(0x9E3779B97F4A7C15)
+
+
+def partition_of(keys, n_partitions):
+    """Partition number (0..n-1) of each int64 key."""
+    h = keys.astype(np.uint64) * _HASH_MULT
+    return ((h >> np.uint64(32)) % np.uint64(n_partitions)).astype(np.intp)
+
+
+def _record_dtype(measures):
+    return np.dtype([("key", "<i8")] + [(m, "<f8") for m in measures])
+
+
+def aggregate_partition(path, measures, block_rows=_BLOCK_ROWS):
+    """`<m>__sum`/`<m>__count` per key for one spill file (NaN values are skipped, like pandas)."""
+    dtype = _record_dtype(measures)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size == 0:
+        return None
+    records = np.memmap(path, dtype=dtype, mode="r")
+    parts = []
+    for start in range(0, len(records), block_rows):
+        block = records[start:start + block_rows]
+        keys, inverse = np.unique(block["key"], return_inverse=True)
+        columns = {}
+        for m in measures:
+            v = block[m]
+            ok = ~np.isnan(v)
+            columns[f"{m}__sum"] = np.bincount(inverse[ok], weights=v[ok], minlength=len(keys))
+            columns[f"{m}__count"] = np.bincount(inverse[ok], minlength=len(keys))
+        parts.append(pd.DataFrame(columns, index=keys))
+    del records
+    return parts[0] if len(parts) == 1 else pd.concat(parts).groupby(level=0).sum()
+
+
+def _aggregate_task(args):
+    return aggregate_partition(*args)
+
+
+class HashPartitionedGroupBy:
+    """Spill (key, measures) rows into hash partitions on disk; aggregate them in parallel.
+
+    Use as a context manager (or call `close()`) to remove the spill directory.
+    """
+
+    def __init__(self, key="pu", measures=REVENUE_MEASURES, n_partitions=DEFAULT_PARTITIONS, spill_dir=None):
+        self.key = key
+        self.measures = tuple(measures)
+        self.n_partitions = n_partitions
+        self.dtype = _record_dtype(self.measures)
+        self.schema = None
+        self.rows = 0
+        self.directory = tempfile.mkdtemp(prefix="taxi-spill-", dir=spill_dir)
+        self.paths = [os.path.join(self.directory, f"part-{i:04d}.bin") for i in range(n_partitions)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def spill_bytes(self):
+        return sum(os.path.getsize(p) for p in self.paths if os.path.exists(p))
+
+    def add(self, df_clean, schema):
+        """Append one cleaned chunk to the partition files (rows without a key are skipped)."""
+        self.schema = self.schema or schema
+        key = df_clean[schema[self.key]].to_numpy(dtype="float64", na_value=np.nan)
+        ok = ~np.isnan(key)
+        records = np.empty(int(ok.sum()), dtype=self.dtype)
+        records["key"] = key[ok]
+        for m in self.measures:
+            col = schema[m]
+            records[m] = (df_clean[col].to_numpy(dtype="float64", na_value=np.nan)[ok]
+                          if col is not None else np.nan)
+        with stage("spill", rows_in=len(records)):
+            part = partition_of(records["key"], self.n_partitions)
+            # stable sort → tiap partisi satu slice berurutan, satu write per file per chunk
+            order = np.argsort(part, kind="stable")
+            bounds = np.searchsorted(part[order], np.arange(self.n_partitions + 1))
+            records = records[order]
+            for i in np.flatnonzero(np.diff(bounds)):
+                with open(self.paths[i], "ab") as f:
+                    records[bounds[i]:bounds[i + 1]].tofile(f)
+        self.rows += len(records)
+        return self
+
+    def aggregate(self, n_jobs=None):
+        """Per-key `<m>__sum`/`<m>__count` frame; partitions are aggregated in a process pool."""
+        tasks = [(p, self.measures) for p in self.paths]
+        with stage("partition_aggregate", rows_in=self.rows):
+            n_jobs = min(n_jobs or os.cpu_count() or 1, len(tasks))
+            if n_jobs == 1:
+                parts = [_aggregate_task(t) for t in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                    parts = list(pool.map(_aggregate_task, tasks))
+        parts = [p for p in parts if p is not None]
+        columns = [f"{m}__{s}" for m in self.measures for s in ("sum", "count")]
+        if not parts:
+            return pd.DataFrame(columns=columns, dtype="float64")
+        # partisi saling lepas kuncinya → cukup disambung, lalu urut kunci seperti groupby
+        return pd.concat(parts).sort_index()[columns]
+
+    def revenue_by_pickup(self, top=10, zones=None, n_jobs=None):
+        """Same table as TripAggregates.revenue_by_pickup, computed from the spill files."""
+        return revenue_table(self.aggregate(n_jobs), self.schema[self.key], top=top, zones=zones)
+
+
+def spill_revenue(paths, spill_dir=None, n_partitions=DEFAULT_PARTITIONS, chunksize=DEFAULT_CHUNKSIZE,
+                  fill_values=None, zones=None, **read_csv_kwargs):
+    """Stream files chunk by chunk (fill + clean, as the pipeline does) into a HashPartitionedGroupBy."""
+    groupby = HashPartitionedGroupBy(n_partitions=n_partitions, spill_dir=spill_dir)
+    try:
+        for path in expand_paths(paths):
+            for chunk, schema in iter_chunks(path, chunksize=chunksize, zones=zones, **read_csv_kwargs):
+                with stage("fill_missing", rows_in=len(chunk)):
+                    fill_missing(chunk, schema, fill_values)
+                with stage("clean", rows_in=len(chunk)) as st:
+                    keep, _ = clean_frame(chunk, schema, copy=False)
+                    st.rows_out = len(keep)
+                groupby.add(chunk.iloc[keep], schema)
+    except BaseException:
+        groupby.close()
+        raise
+    return groupby
@@ -0,0 +1,250 @@
+"""Data grafik terbinning: histogram bin-tetap dan grid densitas 2-D yang bisa digabung.
+
+Grafik distribusi di notebook (total_amount, durasi, kecepatan, penumpang, speed vs duration)
+digambar dari array kecil ini, bukan dari kolom penuh atau df.sample(5000): biaya plot tidak
+lagi bergantung pada jumlah baris. Bin tetap (rentang & lebar ditentukan di PLOT_HISTOGRAMS /
+PLOT_GRIDS) sehingga hasil per chunk/bulan cukup dijumlah, dan seluruh PlotData bisa disimpan
+ke .npz lalu dimuat lagi tanpa membaca ulang data. Nilai di luar rentang dihitung sebagai
+underflow/overflow; count/sum/min/max tetap persis (untuk garis mean).
+"""
+
+import os
+
+import numpy as np
+
+# histogram → (kolom sumber: peran skema / kolom turunan, batas bawah, batas atas, jumlah bin)
+PLOT_HISTOGRAMS = {
+    "total": ("total", 0.0, 250.0, 500),
+    "duration": ("trip_duration_minutes", 0.0, 480.0, 960),   # cleaning membuang > 8 jam
+    "speed": ("avg_speed_mph", 0.0, 120.0, 480),              # cleaning membuang > 120 mph
+    "pass": ("pass", -0.5, 10.5, 11),                         # satu bin per jumlah penumpang
+}
+# grid 2-D → ((kolom x, lo, hi, bin), (kolom y, lo, hi, bin))
+PLOT_GRIDS = {
+    "speed_vs_duration": (("trip_duration_minutes", 0.0, 120.0, 240), ("avg_speed_mph", 0.0, 60.0, 240)),
+}
+
+
+def _bin_index(values, lo, hi, bins):
+    """Bin of each finite value (-1 below, `bins` above the range); NaN rows are dropped."""
+    values = values[~np.isnan(values)]
+    idx = np.floor((values - lo) * (bins / (hi - lo))).astype(np.int64)
+    idx[values == hi] = bins - 1           # batas atas inklusif, seperti np.histogram
+    return values, np.clip(idx, -1, bins)
+
+
+class FixedHistogram:
+    """Counts over `bins` equal-width bins on [lo, hi], plus exact count/sum/min/max."""
+
+    def __init__(self, lo, hi, bins):
+        self.lo, self.hi, self.bins = float(lo), float(hi), int(bins)
+        self.counts = np.zeros(self.bins + 2, dtype=np.int64)   # [underflow, bin 0..n-1, overflow]
+        self.count = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def edges(self):
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    @property
+    def inside(self):
+        return self.counts[1:-1]
+
+    @property
+    def underflow(self):
+        return int(self.counts[0])
+
+    @property
+    def overflow(self):
+        return int(self.counts[-1])
+
+    def update(self, values):
+        values, idx = _bin_index(np.asarray(values, dtype="float64"), self.lo, self.hi, self.bins)
+        if len(values):
+            self.counts += np.bincount(idx + 1, minlength=self.bins + 2)
+            self.count += len(values)
+            self.sum += float(values.sum())
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other):
+        if (other.lo, other.hi, other.bins) != (self.lo, self.hi, self.bins):
+            raise ValueError("cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def mean(self):
+        return self.sum / self.count if self.count else np.nan
+
+    def quantile(self, q):
+        """Quantile by linear interpolation inside the bin (values outside the range clamp to it)."""
+        if not self.count:
+            return np.nan
+        cum = np.cumsum(self.counts)
+        target = q * self.count
+        i = int(np.searchsorted(cum, target, side="left"))
+        if i == 0:
+            return self.min
+        if i == self.bins + 1:
+            return self.max
+        before = cum[i - 1]
+        frac = (target - before) / self.counts[i] if self.counts[i] else 0.0
+        edges = self.edges
+        return float(np.clip(edges[i - 1] + frac * (edges[i] - edges[i - 1]), self.min, self.max))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def coarsen(self, target_bins=50):
+        """(edges, counts) trimmed to the occupied range and merged to about `target_bins` bins."""
+        nonzero = np.flatnonzero(self.inside)
+        if not len(nonzero):
+            return self.edges[:1], np.zeros(0, dtype=np.int64)
+        first, last = nonzero[0], nonzero[-1] + 1
+        step = max(1, int(np.ceil((last - first) / target_bins)))
+        last = first + step * int(np.ceil((last - first) / step))
+        counts = np.zeros(last - first, dtype=np.int64)
+        inside = self.inside[first:min(last, self.bins)]
+        counts[:len(inside)] = inside
+        edges = self.lo + (self.hi - self.lo) / self.bins * np.arange(first, last + 1, step)
+        return edges, counts.reshape(-1, step).sum(axis=1)
+
+    def state(self):
+        return {"range": np.array([self.lo, self.hi, self.bins]), "counts": self.counts,
+                "stats": np.array([self.count, self.sum, self.min, self.max])}
+
+    @classmethod
+    def from_state(cls, state):
+        lo, hi, bins = state["range"]
+        hist = cls(lo, hi, int(bins))
+        hist.counts = np.asarray(state["counts"], dtype=np.int64).copy()
+        count, hist.sum, hist.min, hist.max = (float(v) for v in state["stats"])
+        hist.count = int(count)
+        return hist
+
+
+class DensityGrid:
+    """2-D count grid over [x_lo, x_hi] × [y_lo, y_hi]; points outside either range are counted apart."""
+
+    def __init__(self, x_range, y_range):
+        self.x_range = tuple(float(v) for v in x_range[:2]) + (int(x_range[2]),)
+        self.y_range = tuple(float(v) for v in y_range[:2]) + (int(y_range[2]),)
+        self.counts = np.zeros((self.x_range[2], self.y_range[2]), dtype=np.int64)
+        self.outside = 0
+
+    @property
+    def x_edges(self):
+        lo, hi, n = self.x_range
+        return np.linspace(lo, hi, n + 1)
+
+    @property
+    def y_edges(self):
+        lo, hi, n = self.y_range
+        return np.linspace(lo, hi, n + 1)
+
+    def update(self, x, y):
+        x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+        ok = ~(np.isnan(x) | np.isnan(y))
+        _, ix = _bin_index(x[ok], *self.x_range)
+        _, iy = _bin_index(y[ok], *self.y_range)
+        nx, ny = self.counts.shape
+        inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        self.outside += int((~inside).sum())
+        self.counts += np.bincount(ix[inside] * ny + iy[inside], minlength=nx * ny).reshape(nx, ny)
+        return self
+
+    def merge(self, other):
+        if (other.x_range, other.y_range) != (self.x_range, self.y_range):
+            raise ValueError("cannot merge grids with different bins")
+        self.counts += other.counts
+        self.outside += other.outside
+        return self
+
+    def state(self):
+        return {"x_range": np.array(self.x_range), "y_range": np.array(self.y_range),
+                "counts": self.counts, "outside": np.int64(self.outside)}
+
+    @classmethod
+    def from_state(cls, state):
+        x, y = state["x_range"], state["y_range"]
+        grid = cls((x[0], x[1], int(x[2])), (y[0], y[1], int(y[2])))
+        grid.counts = np.asarray(state["counts"], dtype=np.int64).copy()
+        grid.outside = int(state["outside"])
+        return grid
+
+
+class PlotData:
+    """All binned plot inputs; update() per cleaned chunk, merge() across chunks/months."""
+
+    def __init__(self, histograms=PLOT_HISTOGRAMS, grids=PLOT_GRIDS):
+        self.sources = {name: spec[0] for name, spec in histograms.items()}
+        self.grid_sources = {name: (x[0], y[0]) for name, (x, y) in grids.items()}
+        self.hists = {name: FixedHistogram(*spec[1:]) for name, spec in histograms.items()}
+        self.grids = {name: DensityGrid(x[1:], y[1:]) for name, (x, y) in grids.items()}
+
+    @staticmethod
+    def _column(df, schema, ref):
+        col = schema[ref] if ref in schema else ref
+        if col is None or col not in df.columns:
+            return None
+        return df[col].to_numpy(dtype="float64", na_value=np.nan)
+
+    def update(self, df_clean, schema):
+        for name, ref in self.sources.items():
+            values = self._column(df_clean, schema, ref)
+            if values is not None:
+                self.hists[name].update(values)
+        for name, (x_ref, y_ref) in self.grid_sources.items():
+            x, y = self._column(df_clean, schema, x_ref), self._column(df_clean, schema, y_ref)
+            if x is not None and y is not None:
+                self.grids[name].update(x, y)
+        return self
+
+    def merge(self, other):
+        for name, hist in other.hists.items():
+            self.hists[name].merge(hist)
+        for name, grid in other.grids.items():
+            self.grids[name].merge(grid)
+        return self
+
+    def value_counts(self, name):
+        """{bin centre: count} of the occupied bins (for integer-valued data like 'pass')."""
+        hist = self.hists[name]
+        centres = (hist.edges[:-1] + hist.edges[1:]) / 2
+        nonzero = np.flatnonzero(hist.inside)
+        return {float(c): int(n) for c, n in zip(centres[nonzero].round(6), hist.inside[nonzero])}
+
+    def save(self, path):
+        arrays = {}
+        for kind, items, sources in (("hist", self.hists, self.sources), ("grid", self.grids, self.grid_sources)):
+            for name, obj in items.items():
+                arrays.update({f"{kind}/{name}/{k}": v for k, v in obj.state().items()})
+                arrays[f"{kind}/{name}/source"] = np.asarray(sources[name], dtype=str)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)   # atomic, seperti cache lain
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = cls(histograms={}, grids={})
+        with np.load(path, allow_pickle=False) as f:
+            states = {}
+            for key in f.files:
+                kind, name, field = key.split("/")
+                states.setdefault((kind, name), {})[field] = f[key]
+        for (kind, name), state in states.items():
+            if kind == "hist":
+                data.hists[name] = FixedHistogram.from_state(state)
+                data.sources[name] = str(state["source"])
+            else:
+                data.grids[name] = DensityGrid.from_state(state)
+                data.grid_sources[name] = tuple(str(v) for v in state["source"])
+        return data
@@ -0,0 +1,158 @@
+"""Grafik notebook yang digambar dari tabel laporan dan PlotData terbinning (bukan dari df mentah).
+
+matplotlib (dan seaborn, kalau terpasang) baru diimpor saat grafik pertama dibuat, jadi run
+yang hanya menulis tabel tidak membayar biaya impornya.
+"""
+
+import numpy as np
+
+_PLT = None
+
+
+def pyplot():
+    """Lazily import pyplot with a non-interactive backend and the notebook's style."""
+    global _PLT
+    if _PLT is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        plt.style.use('seaborn-v0_8')
+        try:
+            import seaborn as sns
+            sns.set_palette("husl")
+        except ImportError:
+            pass
+        _PLT = plt
+    return _PLT
+
+
+def demand_figure(demand_pivot, daily_summary):
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    demand_pivot[['Weekday', 'Weekend']].plot(kind='bar', ax=ax1, color=['#3498db', '#e74c3c'])
+    ax1.set_title('Trip Demand by Hour: Weekday vs Weekend', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Hour of Day')
+    ax1.set_ylabel('Number of Trips')
+    ax1.legend()
+    ax1.tick_params(axis='x', rotation=45)
+
+    daily_summary['mean'].plot(kind='bar', ax=ax2, color=['#3498db', '#e74c3c'])
+    ax2.set_title('Average Daily Trip Volume', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Day Type')
+    ax2.set_ylabel('Average Trips per Day')
+    ax2.tick_params(axis='x', rotation=0)
+    for i, v in enumerate(daily_summary['mean']):
+        ax2.text(i, v + 5, str(int(v)), color='black', ha='center', fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def draw_histogram(ax, hist, bins=50, **kwargs):
+    """Bar histogram of a FixedHistogram, re-binned to about `bins` bins over the occupied range."""
+    edges, counts = hist.coarsen(bins)
+    return ax.hist(edges[:-1], bins=edges, weights=counts, **kwargs)
+
+
+def draw_density(ax, grid, cmap='viridis'):
+    """Log-scaled density image of a DensityGrid (empty cells left blank)."""
+    counts = np.where(grid.counts > 0, grid.counts, np.nan).T
+    mesh = ax.pcolormesh(grid.x_edges, grid.y_edges, np.log10(counts), cmap=cmap, shading='flat')
+    ax.figure.colorbar(mesh, ax=ax, label='log10(trips)')
+    return mesh
+
+
+def revenue_figure(revenue_components, total_hist=None):
+    plt = pyplot()
+    if total_hist is None:
+        fig, ax1 = plt.subplots(1, 1, figsize=(7.5, 6))
+    else:
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    revenue_components.plot(kind='pie', ax=ax1, autopct='%1.1f%%', startangle=90)
+    ax1.set_title('Revenue Components Breakdown', fontsize=14, fontweight='bold')
+    ax1.set_ylabel('')
+
+    if total_hist is not None:
+        draw_histogram(ax2, total_hist, alpha=0.7, color='green')
+        ax2.axvline(total_hist.mean(), color='red', linestyle='--', label=f'Mean: ${total_hist.mean():.2f}')
+        ax2.axvline(total_hist.median(), color='orange', linestyle='--', label=f'Median: ${total_hist.median():.2f}')
+        ax2.set_title('Total Amount Distribution', fontsize=14, fontweight='bold')
+        ax2.set_xlabel('Total Amount ($)')
+        ax2.set_ylabel('Frequency')
+        ax2.legend()
+    fig.tight_layout()
+    return fig
+
+
+def operations_figure(plot_data):
+    plt = pyplot()
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+
+    duration = plot_data.hists['duration']
+    draw_histogram(ax1, duration, alpha=0.7, color='blue')
+    ax1.set_title('Trip Duration Distribution', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('Duration (minutes)')
+    ax1.set_ylabel('Frequency')
+    ax1.axvline(duration.mean(), color='red', linestyle='--', alpha=0.8)
+
+    speed = plot_data.hists['speed']
+    draw_histogram(ax2, speed, alpha=0.7, color='orange')
+    ax2.set_title('Average Speed Distribution', fontsize=12, fontweight='bold')
+    ax2.set_xlabel('Speed (mph)')
+    ax2.set_ylabel('Frequency')
+    ax2.axvline(speed.mean(), color='red', linestyle='--', alpha=0.8)
+
+    passenger_counts = plot_data.value_counts('pass')
+    ax3.bar([f'{v:g}' for v in passenger_counts], list(passenger_counts.values()), color='green')
+    ax3.set_title('Passenger Count Distribution', fontsize=12, fontweight='bold')
+    ax3.set_xlabel('Number of Passengers')
+    ax3.set_ylabel('Trip Count')
+    ax3.tick_params(axis='x', rotation=0)
+
+    draw_density(ax4, plot_data.grids['speed_vs_duration'])
+    ax4.set_title('Speed vs Duration Relationship', fontsize=12, fontweight='bold')
+    ax4.set_xlabel('Trip Duration (minutes)')
+    ax4.set_ylabel('Average Speed (mph)')
+
+    fig.tight_layout()
+    return fig
+
+
+def payment_figure(payment_props, payment_analysis):
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    payment_props.plot(kind='pie', ax=ax1, autopct='%1.1f%%', startangle=90)
+    ax1.set_title('Payment Type Distribution', fontsize=14, fontweight='bold')
+    ax1.set_ylabel('')
+
+    payment_analysis['Avg_Tip'].plot(kind='bar', ax=ax2, color=['#3498db', '#e74c3c', '#2ecc71', '#f39c12'])
+    ax2.set_title('Average Tip Amount by Payment Type', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Payment Type')
+    ax2.set_ylabel('Average Tip ($)')
+    ax2.tick_params(axis='x', rotation=45)
+
+    fig.tight_layout()
+    return fig
+
+
+def rate_figure(rate_props, airport_comparison):
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    rate_props.plot(kind='bar', ax=ax1, color='skyblue')
+    ax1.set_title('Rate Code Distribution', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Rate Code Type')
+    ax1.set_ylabel('Trip Count')
+    ax1.tick_params(axis='x', rotation=45)
+
+    airport_comparison.plot(kind='bar', ax=ax2)
+    ax2.set_title('Airport vs Non-Airport Trips Comparison', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Trip Type')
+    ax2.set_ylabel('Average Values')
+    ax2.legend(['Total Amount ($)', 'Duration (min)', 'Distance (mi)'])
+    ax2.tick_params(axis='x', rotation=0)
+
+    fig.tight_layout()
+    return fig
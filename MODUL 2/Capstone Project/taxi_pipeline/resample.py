@@ -0,0 +1,207 @@
+"""Bootstrap & uji permutasi tervektorisasi untuk perbandingan payment type dan airport.
+
+Replikat dihitung per batch sebagai matriks (batch × n) — indeks bootstrap dari
+rng.integers, permutasi dari argpartition kunci acak per baris — lalu statistik (mean/median)
+dihitung sepanjang axis=1, tanpa loop Python per replikat. Untuk mean, permutasi hanya
+menjumlah grup yang lebih kecil (grup lain = total − jumlah itu); median dibaca dari cumsum
+jumlah terpilih per posisi data terurut, bukan np.median per baris. Replikat dipecah jadi task berukuran tetap
+dengan seed turunan SeedSequence, lalu dijalankan di ProcessPoolExecutor; karena pemecahan &
+seed tidak bergantung jumlah worker, hasilnya sama persis berapa pun n_jobs.
+
+CI = persentil bootstrap; p-value permutasi = (1 + #|d*| ≥ |d|) / (B + 1). Tidak perlu asumsi
+normal seperti ttest_ind. Input wajarnya sampel berukuran tetap (StratifiedReservoir), tapi
+array penuh juga bisa (biaya ~ n × replikat).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESAMPLES = 5_000
+# batas elemen matriks replikat per batch (~32 MB float64)
+_MAX_DRAWS = 4_000_000
+_TASK_REPLICATES = 1000
+
+STATISTICS = {
+    "mean": lambda a: a.mean(axis=-1),
+    "median": lambda a: np.median(a, axis=-1),
+}
+# metrik tabel notebook → (kolom sumber: peran skema / kolom turunan, statistik)
+PAYMENT_METRICS = {"Avg_Tip": ("tip", "mean"), "Median_Tip": ("tip", "median"), "Avg_Total": ("total", "mean")}
+AIRPORT_METRICS = {"total": ("total", "mean"), "trip_duration_minutes": ("trip_duration_minutes", "mean"),
+                   "dist": ("dist", "mean")}
+
+
+def _kth(sorted_values, cum, k):
+    # nilai terkecil ke-k (1-based) per baris, dari cumsum jumlah terpilih per posisi terurut
+    return sorted_values[(cum < k).sum(axis=1)]
+
+
+def _median_from_counts(sorted_values, cum, n):
+    if n % 2:
+        return _kth(sorted_values, cum, (n + 1) // 2)
+    return (_kth(sorted_values, cum, n // 2) + _kth(sorted_values, cum, n // 2 + 1)) / 2
+
+
+def _bootstrap_batch(rng, stat, x, b):
+    n = len(x)
+    idx = rng.integers(0, n, (b, n), dtype=np.int32)
+    if stat == "mean":
+        return x[idx].mean(axis=1)
+    # median: hitung berapa kali tiap posisi terurut terambil → cumsum → posisi tengah (tanpa sort per baris)
+    order = np.argsort(x, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    flat = (rank[idx] + np.arange(b)[:, None] * n).ravel()
+    cum = np.bincount(flat, minlength=b * n).reshape(b, n).cumsum(axis=1, dtype=np.int32)
+    return _median_from_counts(x[order], cum, n)
+
+
+def _permutation_batch(rng, stat, pooled, n_x, b):
+    # permutasi acak: m kunci acak terkecil jadi grup yang lebih kecil (argpartition, bukan sort penuh)
+    n, n_y = len(pooled), len(pooled) - n_x
+    m = min(n_x, n_y)
+    keys = rng.random((b, n), dtype=np.float32)
+    part = np.argpartition(keys, m, axis=1)[:, :m] if m < n else np.broadcast_to(np.arange(n), (b, n))
+    if stat == "mean":
+        small = pooled[part].sum(axis=1)
+        rest = pooled.sum() - small
+        sum_x, sum_y = (small, rest) if m == n_x else (rest, small)
+        return sum_x / n_x - sum_y / n_y
+    # median: pooled terurut + mask keanggotaan (di posisi terurut) → cumsum per baris untuk kedua grup
+    order = np.argsort(pooled, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    sorted_values = pooled[order]
+    chosen = np.zeros((b, n), dtype=bool)
+    np.put_along_axis(chosen, rank[part], True, axis=1)
+    cum_small = chosen.cumsum(axis=1, dtype=np.int32)
+    cum_rest = np.arange(1, n + 1, dtype=np.int32) - cum_small
+    cum_x, cum_y = (cum_small, cum_rest) if m == n_x else (cum_rest, cum_small)
+    return _median_from_counts(sorted_values, cum_x, n_x) - _median_from_counts(sorted_values, cum_y, n_y)
+
+
+def _replicates(task):
+    """Replicate values of one task: bootstrap statistic of x, or permutation difference x − y."""
+    kind, stat, x, y, size, seed = task
+    rng = np.random.default_rng(seed)
+    pooled = x if kind == "bootstrap" else np.concatenate([x, y])
+    batch = max(1, _MAX_DRAWS // max(len(pooled), 1))
+    out = np.empty(size)
+    for start in range(0, size, batch):
+        b = min(batch, size - start)
+        if kind == "bootstrap":
+            out[start:start + b] = _bootstrap_batch(rng, stat, x, b)
+        else:
+            out[start:start + b] = _permutation_batch(rng, stat, pooled, len(x), b)
+    return out
+
+
+def run_replicates(specs, n_resamples=DEFAULT_RESAMPLES, seed=42, n_jobs=None):
+    """Replicate arrays for each spec (kind, stat, x, y); all specs share one process pool."""
+    tasks, owner = [], []
+    for i, ((kind, stat, x, y), ss) in enumerate(zip(specs, np.random.SeedSequence(seed).spawn(len(specs)))):
+        sizes = [min(_TASK_REPLICATES, n_resamples - s) for s in range(0, n_resamples, _TASK_REPLICATES)]
+        x = np.asarray(x, dtype="float64")
+        y = None if y is None else np.asarray(y, dtype="float64")
+        for size, child in zip(sizes, ss.spawn(len(sizes))):
+            tasks.append((kind, stat, x, y, size, child))
+            owner.append(i)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if n_jobs == 1:
+        results = [_replicates(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_replicates, tasks))
+    out = [[] for _ in specs]
+    for i, r in zip(owner, results):
+        out[i].append(r)
+    return [np.concatenate(parts) if parts else np.empty(0) for parts in out]
+
+
+def _p_value(replicates, observed, alternative):
+    if alternative == "greater":
+        extreme = replicates >= observed
+    elif alternative == "less":
+        extreme = replicates <= observed
+    else:
+        extreme = np.abs(replicates) >= abs(observed)
+    return (1 + extreme.sum()) / (len(replicates) + 1)
+
+
+def bootstrap_ci(x, stat="mean", n_resamples=DEFAULT_RESAMPLES, alpha=0.05, seed=42, n_jobs=1):
+    """(estimate, ci_low, ci_high) — percentile bootstrap."""
+    x = np.asarray(x, dtype="float64")
+    reps, = run_replicates([("bootstrap", stat, x, None)], n_resamples, seed, n_jobs)
+    lo, hi = np.quantile(reps, [alpha / 2, 1 - alpha / 2])
+    return float(STATISTICS[stat](x)), float(lo), float(hi)
+
+
+def permutation_test(x, y, stat="mean", n_resamples=DEFAULT_RESAMPLES, alternative="two-sided", seed=42, n_jobs=1):
+    """(observed stat(x) − stat(y), p-value)."""
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    reps, = run_replicates([("permutation", stat, x, y)], n_resamples, seed, n_jobs)
+    observed = float(STATISTICS[stat](x) - STATISTICS[stat](y))
+    return observed, float(_p_value(reps, observed, alternative))
+
+
+def compare_groups(groups, metrics, reference=None, n_resamples=DEFAULT_RESAMPLES, alpha=0.05, seed=42,
+                   n_jobs=None, alternative="two-sided"):
+    """CI per (metric, group) and permutation p-value of each group against `reference`.
+
+    `groups` is {group label: DataFrame}; `metrics` is {metric name: (column, stat)}. The
+    reference defaults to the largest group. Groups with fewer than 2 rows get NaN.
+    """
+    groups = {k: g for k, g in groups.items() if k is not None}
+    if reference is None:
+        reference = max(groups, key=lambda k: len(groups[k]))
+    specs, index = [], []
+    for metric, (col, stat) in metrics.items():
+        ref = groups[reference][col].dropna().to_numpy(dtype="float64")
+        for label, g in groups.items():
+            x = g[col].dropna().to_numpy(dtype="float64")
+            index.append((metric, label, col, stat, x, ref))
+            specs.append(("bootstrap", stat, x, None) if len(x) > 1 else None)
+            specs.append(("permutation", stat, x, ref) if len(x) > 1 and label != reference else None)
+    todo = [s for s in specs if s is not None]
+    done = iter(run_replicates(todo, n_resamples, seed, n_jobs))
+    reps = [next(done) if s is not None else None for s in specs]
+
+    rows = []
+    for k, (metric, label, col, stat, x, ref) in enumerate(index):
+        boot, perm = reps[2 * k], reps[2 * k + 1]
+        fn = STATISTICS[stat]
+        row = {"Metric": metric, "group": label, "n": len(x),
+               "estimate": float(fn(x)) if len(x) else np.nan, "ci_low": np.nan, "ci_high": np.nan,
+               "diff_vs_ref": np.nan, "p_value": np.nan}
+        if boot is not None:
+            row["ci_low"], row["ci_high"] = np.quantile(boot, [alpha / 2, 1 - alpha / 2])
+        if perm is not None:
+            row["diff_vs_ref"] = float(fn(x) - fn(ref))
+            row["p_value"] = float(_p_value(perm, row["diff_vs_ref"], alternative))
+        rows.append(row)
+    table = pd.DataFrame(rows).set_index(["Metric", "group"])
+    table.attrs["reference"] = reference
+    return table
+
+
+def _metrics(schema, metrics):
+    return {name: (schema[ref] if ref in schema else ref, stat) for name, (ref, stat) in metrics.items()
+            if (schema[ref] if ref in schema else ref) is not None}
+
+
+def payment_inference(df, schema, reference="Credit Card", **kwargs):
+    """Bootstrap CIs and permutation p-values (vs `reference`) for the payment_analysis groups."""
+    groups = {label: g for label, g in df.groupby("payment_type_label", observed=True)}
+    return compare_groups(groups, _metrics(schema, PAYMENT_METRICS),
+                          reference=reference if reference in groups else None, **kwargs)
+
+
+def airport_inference(df, schema, **kwargs):
+    """Bootstrap CIs and Airport vs Non-Airport permutation p-values for airport_comparison."""
+    groups = {("Airport" if flag else "Non-Airport"): g for flag, g in df.groupby("is_airport")}
+    metrics = {schema[ref] if ref in schema else ref: spec
+               for ref, spec in _metrics(schema, AIRPORT_METRICS).items()}
+    return compare_groups(groups, metrics, reference="Non-Airport" if "Non-Airport" in groups else None, **kwargs)
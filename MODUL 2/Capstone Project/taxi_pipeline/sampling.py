@@ -0,0 +1,154 @@
+"""Reservoir sampling berstrata, satu pass dan ramah chunk, dengan RNG ber-seed.
+
+Tiap baris mendapat prioritas acak U(0,1); reservoir satu strata = `size` baris dengan
+prioritas terkecil (A-Res dengan bobot seragam). Artinya sampel tiap strata adalah sampel
+acak seragam tanpa pengembalian dari semua baris strata itu, dan dua reservoir (chunk lain,
+worker lain, bulan lain) digabung cukup dengan mengambil lagi `size` prioritas terkecil.
+Per chunk hanya baris di bawah ambang prioritas strata yang penuh yang ikut diurutkan, jadi
+biaya per chunk hampir linear dan memori = size × jumlah strata.
+
+Strata = satu/lebih kolom (peran skema atau kolom turunan, mis. "payment", "ratecode",
+"is_weekend", "is_airport"); NaN jadi strata tersendiri.
+"""
+
+import numpy as np
+import pandas as pd
+
+_PRIORITY = "__priority"
+_STRATUM = "__stratum"
+
+
+def _label(value):
+    """Canonical stratum value: None for missing, plain Python scalar otherwise."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+class StratifiedReservoir:
+    """Fixed-size uniform sample per stratum; update() per chunk, merge() across workers."""
+
+    def __init__(self, size=5000, strata=("payment",), columns=None, seed=42):
+        self.size = int(size)
+        self.strata = (strata,) if isinstance(strata, str) else tuple(strata)
+        if not self.strata or not all(isinstance(ref, str) for ref in self.strata):
+            raise ValueError(f"strata must be one or more column/role names, got {strata!r}")
+        self.columns = None if columns is None else tuple(columns)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.labels = []          # id strata → nilai kunci (skalar, atau tuple bila > 1 kolom)
+        self._ids = {}
+        self._seen = np.zeros(0, dtype=np.int64)
+        self._rows = None
+        self._keys = None
+
+    @staticmethod
+    def _resolve(ref, schema):
+        return schema[ref] if schema is not None and ref in schema and schema[ref] is not None else ref
+
+    def _stratum_id(self, label):
+        sid = self._ids.get(label)
+        if sid is None:
+            sid = self._ids[label] = len(self.labels)
+            self.labels.append(label)
+            self._seen = np.append(self._seen, 0)
+        return sid
+
+    def _stratum_ids(self, df):
+        """Global stratum id of every row (factorize per key column, then combine)."""
+        combined = np.zeros(len(df), dtype=np.int64)
+        uniques = []
+        for col in self._keys:
+            codes, values = pd.factorize(df[col], use_na_sentinel=False)
+            uniques.append([_label(v) for v in values])
+            combined = combined * max(len(values), 1) + codes
+        present, inverse = np.unique(combined, return_inverse=True)
+        ids = np.empty(len(present), dtype=np.int64)
+        for i, code in enumerate(present):
+            parts = []
+            for values in reversed(uniques):
+                code, j = divmod(int(code), max(len(values), 1))
+                parts.append(values[j])
+            label = parts[0] if len(parts) == 1 else tuple(reversed(parts))
+            ids[i] = self._stratum_id(label)
+        return ids[inverse]
+
+    def update(self, df, schema=None):
+        """Fold one chunk into the reservoirs."""
+        keys = [self._resolve(r, schema) for r in self.strata]
+        missing = [ref for ref, col in zip(self.strata, keys) if col not in df.columns]
+        if missing:
+            raise ValueError(f"strata column(s) {missing} not in the frame; derive them before sampling "
+                             f"(e.g. features.add_labels for payment_type_label/rate_code_label/is_airport)")
+        if self._keys is None:
+            self._keys = keys
+        columns = list(df.columns) if self.columns is None else \
+            [c for c in dict.fromkeys(keys + [self._resolve(r, schema) for r in self.columns]) if c in df.columns]
+        stratum = self._stratum_ids(df)
+        self._seen += np.bincount(stratum, minlength=len(self._seen))
+        priority = self.rng.random(len(df))
+
+        # ambang = prioritas terbesar di reservoir yang sudah penuh; baris di atasnya tak mungkin masuk
+        candidate = priority < self._thresholds()[stratum]
+        chunk = df.loc[candidate, columns].copy()
+        chunk[_STRATUM] = stratum[candidate]
+        chunk[_PRIORITY] = priority[candidate]
+        self._absorb(chunk)
+        return self
+
+    def _thresholds(self):
+        threshold = np.ones(len(self.labels))
+        if self._rows is not None:
+            prio = self._rows.groupby(_STRATUM)[_PRIORITY]
+            size, top = prio.size(), prio.max()
+            full = size.index[size >= self.size]
+            threshold[full] = top[full]
+        return threshold
+
+    def _absorb(self, rows):
+        rows = rows if self._rows is None else pd.concat([self._rows, rows], ignore_index=True)
+        rows = rows.sort_values([_STRATUM, _PRIORITY], kind="stable")
+        rank = rows.groupby(_STRATUM).cumcount().to_numpy()
+        self._rows = rows[rank < self.size].reset_index(drop=True)
+
+    def merge(self, other):
+        """Combine with a reservoir built over other rows (same size and strata)."""
+        if (other.size, other.strata) != (self.size, self.strata):
+            raise ValueError("cannot merge reservoirs with different size/strata")
+        self._keys = self._keys or other._keys
+        remap = np.array([self._stratum_id(label) for label in other.labels], dtype=np.int64)
+        np.add.at(self._seen, remap, other._seen)
+        if other._rows is not None:
+            rows = other._rows.copy()
+            rows[_STRATUM] = remap[rows[_STRATUM].to_numpy()]
+            self._absorb(rows)
+        return self
+
+    # ---- keluaran ----------------------------------------------------------
+
+    def sample(self, stratum=None):
+        """Sampled rows (all strata, or the one with key `stratum`) without internal columns."""
+        if self._rows is None:
+            return pd.DataFrame()
+        rows = self._rows
+        if stratum is not None:
+            rows = rows[rows[_STRATUM] == self._ids.get(stratum, -1)]
+        return rows.drop(columns=[_STRATUM, _PRIORITY]).reset_index(drop=True)
+
+    def groups(self):
+        """{stratum key: sampled rows}, in first-seen order."""
+        if self._rows is None:
+            return {}
+        rows = self._rows.drop(columns=_PRIORITY)
+        return {self.labels[sid]: g.drop(columns=_STRATUM).reset_index(drop=True)
+                for sid, g in rows.groupby(_STRATUM)}
+
+    def summary(self):
+        """Rows seen, rows sampled and the seen/sampled weight per stratum."""
+        sampled = np.zeros(len(self.labels), dtype=np.int64)
+        if self._rows is not None:
+            sampled += np.bincount(self._rows[_STRATUM].to_numpy(), minlength=len(self.labels))
+        index = pd.Index(self.labels, tupleize_cols=len(self.strata) > 1, name=None)
+        table = pd.DataFrame({"seen": self._seen, "sampled": sampled}, index=index)
+        table["weight"] = table["seen"] / table["sampled"].where(table["sampled"] > 0)
+        return table
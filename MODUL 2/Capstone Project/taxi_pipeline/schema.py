@@ -0,0 +1,78 @@
+"""Normalisasi nama kolom dan resolusi skema lintas variasi file TLC (lpep/tpep)."""
+
+# Kandidat nama kolom per peran; urutan = prioritas
+COLUMN_CANDIDATES = {
+    "pickup":  ["lpep_pickup_datetime", "tpep_pickup_datetime", "pickup_datetime"],
+    "dropoff": ["lpep_dropoff_datetime", "tpep_dropoff_datetime", "dropoff_datetime"],
+    "dist":    ["trip_distance", "distance"],
+    "pass":    ["passenger_count", "passenger_cnt"],
+    "fare":    ["fare_amount", "fare"],
+    "mta":     ["mta_tax", "mta"],
+    "impr":    ["improvement_surcharge", "improvement_surch"],
+    "tolls":   ["tolls_amount", "tolls"],
+    "tip":     ["tip_amount", "tip"],
+    "total":   ["total_amount", "total"],
+    # komponen yang muncul/hilang antar tahun layout TLC (ehail_fee dihapus 2019+,
+    # congestion_surcharge baru ada 2019+); None kalau file tidak punya
+    "extra":   ["extra"],
+    "ehail":   ["ehail_fee"],
+    "congestion": ["congestion_surcharge"],
+    "vendor":  ["vendorid", "vendor_id"],
+    "payment": ["payment_type"],
+    "ratecode": ["ratecodeid", "rate_code_id", "ratecode_id"],
+    "pu":      ["pulocationid", "pu_location_id"],
+    "do":      ["dolocationid", "do_location_id"],
+    # file TLC lama: koordinat, bukan LocationID (lihat spatial.assign_zone_columns)
+    "pu_lon":  ["pickup_longitude"],
+    "pu_lat":  ["pickup_latitude"],
+    "do_lon":  ["dropoff_longitude"],
+    "do_lat":  ["dropoff_latitude"],
+}
+
+DATETIME_ROLES = ("pickup", "dropoff")
+NUMERIC_ROLES = ("dist", "pass", "fare", "mta", "impr", "tolls", "tip", "total",
+                 "extra", "ehail", "congestion", "vendor", "payment", "ratecode", "pu", "do",
+                 "pu_lon", "pu_lat", "do_lon", "do_lat")
+# Komponen biaya yang tidak boleh negatif
+AMOUNT_ROLES = ("fare", "mta", "impr", "tolls", "tip", "total")
+# Tip tunai tak tercatat; NaN → 0 aman
+ZERO_FILL_ROLES = ("tolls", "tip")
+# Kolom turunan dari ingest.add_trip_metrics
+TRIP_METRIC_COLS = ["trip_duration_minutes", "trip_duration_hours", "avg_speed_mph"]
+# Kolom yang diimputasi mean/median (normaltest), sama dengan impute_targets di notebook
+IMPUTE_ROLES = ("pass", "dist", "fare", "mta", "impr", "total")
+IMPUTE_METRIC_COLS = ["trip_duration_minutes", "avg_speed_mph"]
+
+
+def normalize_columns(cols):
+    return [c.strip().lower().replace(" ", "_") for c in cols]
+
+
+def find_col(df, candidates):
+    for c in candidates:
+        if c in df.columns:
+            return c
+    return None
+
+
+def resolve_schema(columns):
+    """Return dict {role: physical column or None} for normalized column names."""
+    present = set(columns)
+    schema = {}
+    for role, candidates in COLUMN_CANDIDATES.items():
+        schema[role] = next((c for c in candidates if c in present), None)
+    return schema
+
+
+def cols_for(schema, roles):
+    """Physical columns for the given roles, skipping roles missing from the file."""
+    return [schema[r] for r in roles if schema.get(r) is not None]
+
+
+def impute_columns(schema):
+    return cols_for(schema, IMPUTE_ROLES) + IMPUTE_METRIC_COLS
+
+
+def analysis_columns(schema):
+    """Columns the analysis sections read: every resolved role plus the trip metrics."""
+    return cols_for(schema, COLUMN_CANDIDATES) + TRIP_METRIC_COLS
@@ -0,0 +1,162 @@
+"""Sketch kuantil streaming (gaya KLL) untuk median/IQR tanpa menyimpan & mengurutkan kolom penuh.
+
+Sketch diisi per chunk (array NumPy sekaligus, bukan per nilai) dan bisa digabung antar
+chunk/worker/bulan. Galat peringkat dikendalikan lewat `eps` (mis. 0.005 → kuantil meleset
+paling jauh ~0.5% peringkat). Selama belum ada kompaksi (data kecil), hasilnya persis sama
+dengan pandas. Mean/std/min/max ikut dilacak persis (sum & sum of squares).
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_EPS = 0.005
+_MIN_CAPACITY = 8
+_DECAY = 2 / 3
+
+
+def k_for_eps(eps):
+    """Compactor size k for a target normalized rank error (single quantile, ~99% confidence)."""
+    # kebalikan dari rumus galat empiris KLL: eps ≈ 2.296 / k^0.9723
+    return max(_MIN_CAPACITY, int(math.ceil((2.296 / eps) ** (1 / 0.9723))))
+
+
+def rank_error(k):
+    return 2.296 / k ** 0.9723
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch over float values (NaN is ignored).
+
+    update() takes whole arrays/Series; merge() combines sketches from other chunks or
+    workers; quantile() answers any q in [0, 1] within about `eps` in rank.
+    """
+
+    def __init__(self, eps=DEFAULT_EPS, k=None, seed=None):
+        self.k = k if k is not None else k_for_eps(eps)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def eps(self):
+        return rank_error(self.k)
+
+    @property
+    def exact(self):
+        """True while nothing has been compacted (quantiles are exact)."""
+        return len(self.levels) == 1
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * _DECAY ** depth)))
+
+    def _over_capacity(self):
+        """Lowest level holding more than its capacity, or None."""
+        for h, level in enumerate(self.levels):
+            if len(level) > self._capacity(h):
+                return h
+        return None
+
+    def _compress(self):
+        # level baru di atas memperkecil kapasitas semua level di bawahnya → ulangi dari
+        # level terendah sampai tiap level muat (tiap kompaksi mengurangi jumlah item, jadi berhenti)
+        h = self._over_capacity()
+        while h is not None:
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            level = np.sort(self.levels[h])
+            # jumlah ganjil → satu item tertinggal di level ini
+            keep, level = level[:len(level) % 2], level[len(level) % 2:]
+            promoted = level[self._rng.integers(2)::2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h = self._over_capacity()
+
+    def capacity(self):
+        """Maximum number of retained items for the current number of levels."""
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, values):
+        x = np.asarray(values, dtype="float64").ravel()
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return self
+        self.count += len(x)
+        self.sum += float(x.sum())
+        self.sumsq += float(np.dot(x, x))
+        self.min = float(np.fmin(self.min, x.min()))
+        self.max = float(np.fmax(self.max, x.max()))
+        self.levels[0] = np.concatenate([self.levels[0], x])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1]; exact (linear, like pandas) before compaction."""
+        q_arr = np.atleast_1d(np.asarray(q, dtype="float64"))
+        if self.count == 0:
+            out = np.full(len(q_arr), np.nan)
+        elif self.exact:
+            out = np.quantile(self.levels[0], q_arr)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+            order = np.argsort(items, kind="stable")
+            items, cum = items[order], np.cumsum(weights[order])
+            # item pertama yang bobot kumulatifnya ≥ q·n, dijepit ke min/max yang persis
+            idx = np.searchsorted(cum, q_arr * cum[-1], side="left")
+            out = items[np.minimum(idx, len(items) - 1)]
+            out = np.where(q_arr <= 0, self.min, np.where(q_arr >= 1, self.max, out))
+        return out if np.ndim(q) else float(out[0])
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def mean(self):
+        return self.sum / self.count if self.count else np.nan
+
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        var = (self.sumsq - self.sum ** 2 / self.count) / (self.count - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def describe(self):
+        """Mean/Median/Std/Q25/Q75, the columns of the notebook's operations_metrics table."""
+        q25, q50, q75 = self.quantile([0.25, 0.5, 0.75])
+        return {"Mean": self.mean(), "Median": q50, "Std": self.std(), "Q25": q25, "Q75": q75}
+
+    def __len__(self):
+        return sum(len(lv) for lv in self.levels)
+
+    def to_dict(self):
+        return {"k": self.k, "levels": [lv.tolist() for lv in self.levels], "count": self.count,
+                "sum": self.sum, "sumsq": self.sumsq, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        sketch = cls(k=state["k"], seed=seed)
+        sketch.levels = [np.asarray(lv, dtype="float64") for lv in state["levels"]]
+        for key in ("count", "sum", "sumsq", "min", "max"):
+            setattr(sketch, key, state[key])
+        return sketch
@@ -0,0 +1,221 @@
+"""Penentuan zona (point-in-polygon) massal untuk file TLC lama yang hanya punya lon/lat.
+
+- Bbox kota dibagi grid halus; tiap sel menyimpan daftar sisi poligon yang menyentuhnya
+  (CSR, urut per zona) dan zona yang memuat titik tengah sel (dihitung sekali saat build).
+- Titik di sel tanpa sisi poligon langsung mendapat zona titik tengah sel.
+- Titik lain: ray casting NumPy dari titik ke titik tengah sel, hanya terhadap sisi di sel
+  itu; paritas perpotongan per zona membalik keanggotaan titik tengah.
+- Opsional: blok titik dibagi ke process pool (n_jobs).
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ASSIGN_GRID = 256
+# batas jumlah pasangan titik×sisi per batch (memori sementara ~ 40 byte per pasangan)
+_MAX_PAIRS = 4_000_000
+_MIN_POINTS_PER_JOB = 200_000
+
+_WORKER = None
+
+
+def _orient(ax, ay, bx, by, px, py):
+    # > 0 kalau p di kiri garis a→b
+    return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+
+class ZoneAssigner:
+    """Vectorized lon/lat → taxi zone location id, built from a zones.ZoneTable."""
+
+    def __init__(self, table, grid_size=DEFAULT_ASSIGN_GRID):
+        self.grid_size = grid_size
+        self.extent = table.extent.copy()
+        # kategori = id lokasi unik terurut; kode per baris zona (id 56/103 ada dua baris)
+        self.categories = np.unique(table.ids).astype("int64")
+        self.zone_code = np.searchsorted(self.categories, table.ids).astype(np.int32)
+        self._build_edges(table)
+        self._build_cells()
+        self._build_centers()
+
+    def fingerprint(self):
+        """Short hash of the grid and polygon edges (identifies the assignment in cache keys)."""
+        h = hashlib.sha256(str(self.grid_size).encode())
+        for a in (self.extent, self.categories, self.zone_code, self.ax, self.ay, self.bx, self.by, self.edge_zone):
+            h.update(np.ascontiguousarray(a).tobytes())
+        return h.hexdigest()[:16]
+
+    # ---- build -------------------------------------------------------------
+
+    def _build_edges(self, table):
+        coords, offsets = table.coords, table.ring_offsets
+        is_last = np.zeros(len(coords), dtype=bool)
+        is_last[offsets[1:] - 1] = True
+        start = np.flatnonzero(~is_last)
+        end = start + 1
+        # ring yang tidak tertutup (titik awal ≠ akhir) diberi sisi penutup
+        first, last = offsets[:-1], offsets[1:] - 1
+        open_ring = np.flatnonzero((coords[first] != coords[last]).any(axis=1))
+        start = np.concatenate([start, last[open_ring]])
+        end = np.concatenate([end, first[open_ring]])
+
+        vertex_zone = np.repeat(table.ring_zone, np.diff(offsets))
+        self.ax, self.ay = coords[start, 0], coords[start, 1]
+        self.bx, self.by = coords[end, 0], coords[end, 1]
+        self.edge_zone = vertex_zone[start]
+
+    def cell_xy(self, lon, lat):
+        minx, miny, maxx, maxy = self.extent
+        g = self.grid_size
+        cx = np.clip(((lon - minx) / (maxx - minx) * g).astype(np.int64), 0, g - 1)
+        cy = np.clip(((lat - miny) / (maxy - miny) * g).astype(np.int64), 0, g - 1)
+        return cx, cy
+
+    def _build_cells(self):
+        g = self.grid_size
+        cx0, cy0 = self.cell_xy(np.minimum(self.ax, self.bx), np.minimum(self.ay, self.by))
+        cx1, cy1 = self.cell_xy(np.maximum(self.ax, self.bx), np.maximum(self.ay, self.by))
+        # tiap sisi dicatat di semua sel yang beririsan dengan bbox-nya
+        w = cx1 - cx0 + 1
+        n = w * (cy1 - cy0 + 1)
+        edge = np.repeat(np.arange(len(n)), n)
+        local = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        cell = (cy0[edge] + local // w[edge]) * g + cx0[edge] + local % w[edge]
+
+        order = np.lexsort((self.edge_zone[edge], cell))
+        self.cell_edges = edge[order]
+        self.cell_offsets = np.zeros(g * g + 1, dtype=np.int64)
+        self.cell_offsets[1:] = np.cumsum(np.bincount(cell, minlength=g * g))
+
+        # sisi orientasi titik tengah sel terhadap tiap sisi (konstan per entri CSR)
+        entry_cell = np.repeat(np.arange(g * g), np.diff(self.cell_offsets))
+        cxm, cym = self._cell_centers(entry_cell)
+        e = self.cell_edges
+        self.center_side = _orient(self.ax[e], self.ay[e], self.bx[e], self.by[e], cxm, cym) > 0
+
+    def _cell_centers(self, cell):
+        minx, miny, maxx, maxy = self.extent
+        g = self.grid_size
+        x = minx + ((cell % g) + 0.5) * (maxx - minx) / g
+        y = miny + ((cell // g) + 0.5) * (maxy - miny) / g
+        return x, y
+
+    def _build_centers(self):
+        """Zone row containing each cell centre (-1 = none), via one scanline per grid row."""
+        g = self.grid_size
+        self.center_zone = np.full(g * g, -1, dtype=np.int32)
+        xs, ys = self._cell_centers(np.arange(g))[0], self._cell_centers(np.arange(g) * g)[1]
+        for row, y in enumerate(ys):
+            hit = (self.ay > y) != (self.by > y)
+            if not hit.any():
+                continue
+            ax, ay, bx, by = self.ax[hit], self.ay[hit], self.bx[hit], self.by[hit]
+            xi = ax + (y - ay) * (bx - ax) / (by - ay)
+            order = np.argsort(xi, kind="stable")
+            xi, zones = xi[order], self.edge_zone[hit][order]
+            # susuri garis dari kiri: keanggotaan zona membalik di tiap perpotongan
+            inside, state = set(), np.empty(len(xi), dtype=np.int32)
+            for k, z in enumerate(zones):
+                inside.symmetric_difference_update((z,))
+                state[k] = min(inside) if inside else -1
+            k = np.searchsorted(xi, xs, side="right") - 1
+            self.center_zone[row * g:(row + 1) * g] = np.where(k >= 0, state[np.maximum(k, 0)], -1)
+
+    # ---- assign --------------------------------------------------------------
+
+    def _assign_rows(self, lon, lat):
+        """Zone row per point (-1 = outside every zone)."""
+        lon = np.asarray(lon, dtype="float64")
+        lat = np.asarray(lat, dtype="float64")
+        out = np.full(len(lon), -1, dtype=np.int32)
+        minx, miny, maxx, maxy = self.extent
+        valid = np.flatnonzero((lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy))
+        if not len(valid):
+            return out
+        cx, cy = self.cell_xy(lon[valid], lat[valid])
+        cell = cy * self.grid_size + cx
+        out[valid] = self.center_zone[cell]
+
+        n_edges = self.cell_offsets[cell + 1] - self.cell_offsets[cell]
+        edgy = np.flatnonzero(n_edges > 0)
+        # batch supaya array pasangan titik×sisi tetap kecil
+        cum = np.cumsum(n_edges[edgy])
+        cuts = np.searchsorted(cum, np.arange(_MAX_PAIRS, cum[-1] if len(cum) else 0, _MAX_PAIRS))
+        for part in np.split(edgy, cuts):
+            if len(part):
+                pts = valid[part]
+                out[pts] = self._refine(lon[pts], lat[pts], cell[part], n_edges[part], self.center_zone[cell[part]])
+        return out
+
+    def _refine(self, px, py, cell, n_edges, center):
+        # pasangan (titik, entri sisi sel), urut per titik lalu per zona
+        pair_pt = np.repeat(np.arange(len(px)), n_edges)
+        local = np.arange(len(pair_pt)) - np.repeat(np.cumsum(n_edges) - n_edges, n_edges)
+        entry = self.cell_offsets[cell][pair_pt] + local
+        e = self.cell_edges[entry]
+        ax, ay, bx, by = self.ax[e], self.ay[e], self.bx[e], self.by[e]
+        qx, qy = px[pair_pt], py[pair_pt]
+        cxm, cym = self._cell_centers(cell[pair_pt])
+
+        # segmen titik→tengah sel memotong sisi a→b (aturan setengah-terbuka di verteks)
+        cross = ((_orient(qx, qy, cxm, cym, ax, ay) > 0) != (_orient(qx, qy, cxm, cym, bx, by) > 0)) \
+            & ((_orient(ax, ay, bx, by, qx, qy) > 0) != self.center_side[entry])
+
+        zone = self.edge_zone[e]
+        new_seg = np.ones(len(pair_pt), dtype=bool)
+        new_seg[1:] = (pair_pt[1:] != pair_pt[:-1]) | (zone[1:] != zone[:-1])
+        starts = np.flatnonzero(new_seg)
+        parity = np.add.reduceat(cross.view(np.uint8), starts) & 1
+        seg_pt, seg_zone = pair_pt[starts], zone[starts]
+        is_center = seg_zone == center[seg_pt]
+        inside = (parity == 1) != is_center
+
+        result = center.copy()
+        # zona tengah sel yang sisinya terlewati → titik keluar dari zona itu
+        left_center = is_center & ~inside
+        result[seg_pt[left_center]] = -1
+        result[seg_pt[inside]] = seg_zone[inside]
+        return result
+
+    def assign(self, lon, lat, n_jobs=None):
+        """Location id per point as an integer categorical (NaN outside all zones)."""
+        lon = np.asarray(lon, dtype="float64")
+        lat = np.asarray(lat, dtype="float64")
+        if n_jobs and n_jobs > 1 and len(lon) >= 2 * _MIN_POINTS_PER_JOB:
+            blocks = np.array_split(np.arange(len(lon)), min(n_jobs, len(lon) // _MIN_POINTS_PER_JOB))
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self,)) as pool:
+                rows = np.concatenate(list(pool.map(_worker_assign, [(lon[b], lat[b]) for b in blocks])))
+        else:
+            rows = self._assign_rows(lon, lat)
+        codes = np.where(rows >= 0, self.zone_code[np.maximum(rows, 0)], -1)
+        return pd.Categorical.from_codes(codes, self.categories)
+
+
+def _init_worker(assigner):
+    global _WORKER
+    _WORKER = assigner
+
+
+def _worker_assign(block):
+    return _WORKER._assign_rows(*block)
+
+
+def assign_zone_columns(df, schema, assigner, n_jobs=None):
+    """Add pu/do location id columns from pickup/dropoff lon/lat when the file lacks them.
+
+    Updates `schema` in place (pu → 'pulocationid', do → 'dolocationid') so later chunks
+    prepared with the same schema get the same columns.
+    """
+    for role, (lon_role, lat_role), name in (("pu", ("pu_lon", "pu_lat"), "pulocationid"),
+                                             ("do", ("do_lon", "do_lat"), "dolocationid")):
+        if schema[role] is not None and schema[role] in df.columns:
+            continue
+        if schema[lon_role] is None or schema[lat_role] is None:
+            continue
+        lon = pd.to_numeric(df[schema[lon_role]], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        lat = pd.to_numeric(df[schema[lat_role]], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        df[name] = pd.Series(assigner.assign(lon, lat, n_jobs=n_jobs), index=df.index)
+        schema[role] = name
+    return df
@@ -0,0 +1,57 @@
+"""Mode streaming: proses CSV per chunk dan gabungkan agregat secara bertahap (memori datar)."""
+
+from .aggregate import TripAggregates
+from .cleaning import clean_frame
+from .features import add_analysis_features
+from .impute import BatchImputer
+from .ingest import DEFAULT_CHUNKSIZE, fill_missing, iter_chunks
+from .instrument import stage
+from .sampling import StratifiedReservoir
+from .schema import impute_columns
+
+
+def process_chunk(chunk, schema, fill_values=None):
+    """Fill, clean and feature-engineer one prepared chunk. Returns (df_clean, drop stats)."""
+    with stage("fill_missing", rows_in=len(chunk)):
+        fill_missing(chunk, schema, fill_values)
+    with stage("clean", rows_in=len(chunk)) as st:
+        df_clean, drop_stats = clean_frame(chunk, schema)
+        st.rows_out = len(df_clean)
+    with stage("features", rows_in=len(df_clean)):
+        add_analysis_features(df_clean, schema)
+    return df_clean, drop_stats
+
+
+def stream_aggregate(path, chunksize=DEFAULT_CHUNKSIZE, fill_values=None, aggregates=None, **read_csv_kwargs):
+    """Run the cleaning pipeline over `path` chunk by chunk and return a TripAggregates.
+
+    Statistical imputation needs whole-file statistics, so only tolls/tip are zero-filled
+    unless precomputed `fill_values` ({col: value}, e.g. `stream_fit_imputer(path).fill_values_`)
+    are passed in.
+    """
+    aggregates = aggregates if aggregates is not None else TripAggregates()
+    for chunk, schema in iter_chunks(path, chunksize=chunksize, **read_csv_kwargs):
+        df_clean, drop_stats = process_chunk(chunk, schema, fill_values)
+        with stage("aggregate", rows_in=len(df_clean)):
+            aggregates.update(df_clean, schema, rows_in=drop_stats["rows_in"], rule_bins=drop_stats["rules"].bins)
+    return aggregates
+
+
+def stream_fit_imputer(path, chunksize=DEFAULT_CHUNKSIZE, imputer=None, **read_csv_kwargs):
+    """First streaming pass: fit a BatchImputer chunk by chunk (median from quantile sketches)."""
+    imputer = imputer if imputer is not None else BatchImputer()
+    for chunk, schema in iter_chunks(path, chunksize=chunksize, **read_csv_kwargs):
+        with stage("impute_partial_fit", rows_in=len(chunk)):
+            imputer.partial_fit(chunk, impute_columns(schema))
+    return imputer
+
+
+def stream_sample(path, size=5000, strata=("payment",), columns=None, seed=42, chunksize=DEFAULT_CHUNKSIZE,
+                  fill_values=None, **read_csv_kwargs):
+    """One pass over `path` into a StratifiedReservoir of cleaned, feature-engineered rows."""
+    reservoir = StratifiedReservoir(size=size, strata=strata, columns=columns, seed=seed)
+    for chunk, schema in iter_chunks(path, chunksize=chunksize, **read_csv_kwargs):
+        df_clean, _ = process_chunk(chunk, schema, fill_values)
+        with stage("sample", rows_in=len(df_clean)):
+            reservoir.update(df_clean, schema)
+    return reservoir
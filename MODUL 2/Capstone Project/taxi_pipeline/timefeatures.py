@@ -0,0 +1,114 @@
+"""Fitur waktu pickup dalam satu lintasan: hari-epoch + detik-dalam-hari, lalu tabel kalender.
+
+Timestamp pickup diubah sekali ke detik sejak epoch (int64); dari situ hari-epoch (int32)
+dan detik-dalam-hari dihitung dengan pembagian bulat. Hari-dalam-minggu, weekend, hari libur
+federal AS (observed) dan bulan diambil dari CalendarTable — array kecil ber-indeks
+hari-epoch — dengan satu np.take, bukan beberapa lintasan aksesor .dt. pickup_date disimpan
+sebagai datetime64 tengah malam (bentuk datetime64[D] yang didukung pandas), jadi groupby per
+tanggal meng-hash int64, bukan objek datetime.date Python.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+SECONDS_PER_DAY = 86_400
+# rentang awal tabel kalender (data TLC mulai 2009); diperluas otomatis bila perlu
+CALENDAR_START = "2009-01-01"
+CALENDAR_END = "2030-12-31"
+# kolom fitur waktu yang ditambahkan add_time_features
+TIME_FEATURE_COLS = ("pickup_day", "pickup_hour", "pickup_date", "pickup_day_of_week", "is_weekend",
+                     "is_holiday", "pickup_month")
+
+
+def epoch_days(values):
+    """Epoch day (int64) of datetime64 values; NaT → INT64 min."""
+    return np.asarray(values).astype("datetime64[D]").astype(np.int64)
+
+
+class CalendarTable:
+    """Per-day lookup arrays (day of week, weekend, holiday, month, year) indexed by epoch day."""
+
+    def __init__(self, start=CALENDAR_START, end=CALENDAR_END):
+        days = pd.date_range(start, end, freq="D")
+        self.first = int(epoch_days(days.values[:1])[0])
+        self.dow = days.dayofweek.to_numpy(dtype=np.int8)              # 0=Monday, 6=Sunday
+        self.weekend = self.dow >= 5
+        holidays = USFederalHolidayCalendar().holidays(days[0], days[-1])
+        self.holiday = days.isin(holidays)
+        self.month = days.month.to_numpy(dtype=np.int8)
+        self.year = days.year.to_numpy(dtype=np.int16)
+
+    @property
+    def last(self):
+        return self.first + len(self.dow) - 1
+
+    def covers(self, day_min, day_max):
+        return self.first <= day_min and day_max <= self.last
+
+    def index(self, days):
+        """Row of each epoch day in the lookup arrays."""
+        return np.asarray(days, dtype=np.int64) - self.first
+
+    def to_frame(self):
+        dates = (np.arange(len(self.dow)) + self.first).astype("datetime64[D]")
+        return pd.DataFrame({"day_of_week": self.dow, "is_weekend": self.weekend, "is_holiday": self.holiday,
+                             "month": self.month, "year": self.year},
+                            index=pd.Index(dates.astype("datetime64[s]"), name="date"))
+
+
+_CALENDAR = None
+
+
+def calendar_table(day_min=None, day_max=None):
+    """Shared CalendarTable covering [day_min, day_max] (epoch days), rebuilt wider if needed."""
+    global _CALENDAR
+    if _CALENDAR is None:
+        _CALENDAR = CalendarTable()
+    if day_min is not None and not _CALENDAR.covers(day_min, day_max):
+        start = min(day_min, _CALENDAR.first)
+        end = max(day_max, _CALENDAR.last)
+        _CALENDAR = CalendarTable(np.datetime64(start, "D"), np.datetime64(end, "D"))
+    return _CALENDAR
+
+
+def calendar_rows(days, valid):
+    """(CalendarTable, row per day) for epoch days; rows of invalid days point at row 0."""
+    days = np.asarray(days, dtype=np.int64)
+    cal = calendar_table(int(days[valid].min()), int(days[valid].max())) if valid.any() else calendar_table()
+    return cal, np.where(valid, cal.index(days), 0)
+
+
+def _column(values, valid):
+    # kolom integer ringkas; nullable (Int) hanya kalau ada waktu pickup yang hilang
+    if valid.all():
+        return values
+    return pd.arrays.IntegerArray(values, ~valid)
+
+
+def time_features(pickup):
+    """{column: array} of pickup time features from a datetime64 Series/array (one pass)."""
+    ts = np.asarray(pickup).astype("datetime64[s]")
+    valid = ~np.isnat(ts)
+    secs = np.where(valid, ts.astype(np.int64), 0)
+    day = secs // SECONDS_PER_DAY
+    second_of_day = secs - day * SECONDS_PER_DAY
+    cal, row = calendar_rows(day, valid)
+    return {
+        "pickup_day": _column(day.astype(np.int32), valid),
+        "pickup_hour": _column((second_of_day // 3600).astype(np.int8), valid),
+        "pickup_date": np.where(valid, day, np.iinfo(np.int64).min).astype("datetime64[D]").astype("datetime64[s]"),
+        "pickup_day_of_week": _column(cal.dow[row], valid),
+        "is_weekend": cal.weekend[row] & valid,
+        "is_holiday": cal.holiday[row] & valid,
+        "pickup_month": _column(cal.month[row], valid),
+    }
+
+
+def add_time_features(df, schema):
+    """Add TIME_FEATURE_COLS from the pickup timestamp (no-op without a pickup column)."""
+    col_pickup = schema["pickup"]
+    if col_pickup is not None:
+        for name, values in time_features(df[col_pickup]).items():
+            df[name] = values
+    return df
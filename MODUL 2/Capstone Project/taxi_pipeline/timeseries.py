@@ -0,0 +1,297 @@
+"""Deret waktu demand per jam (trips, revenue), opsional per zona pickup, dari agregat.
+
+Penyimpanan = blok per bulan kalender: tiap blok array NumPy kontigu berbentuk (jam dalam
+bulan,) atau (jam dalam bulan, Z) ber-indeks jam-sejak-awal-bulan, dengan jam-sejak-epoch blok
+= hari-epoch awal bulan × 24. Blok per bulan membuat update()/merge() per file bulanan cukup
+menambah satu blok, dan satu trip nyasar bertahun-tahun di luar rentang hanya menambah satu blok
+kecil, bukan array raksasa yang nyaris kosong. Zona 0 menampung trip tanpa zona yang valid,
+jadi total per jam = jumlah semua kolom zona.
+
+Query bekerja di atas satu deret 1-D (total, satu zona, atau beberapa zona dijumlah) yang
+dirakit dari blok dan di-cache bersama prefix sum-nya (float64): jumlah jendela apa pun
+= P[akhir] − P[awal], O(1) per titik. Rolling mean, profil jam weekday/weekend, dan
+perbandingan year-over-year dijawab dari prefix sum itu tanpa menyentuh data trip.
+
+Cakupan: bulan dianggap tercakup kalau total trip-nya ≥ min_month_share × median total per
+bulan (blok berisi segelintir trip nyasar tidak dihitung sebagai bulan berisi data), atau,
+kalau expected_span = (awal, akhir) diberikan, tepat bulan-bulan di rentang itu. Deret dirakit
+dari bulan tercakup pertama sampai terakhir; bulan lain di dalamnya (tanpa blok atau di bawah
+ambang) bernilai NaN di hourly/daily dan tidak ikut rata-rata/YoY.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .timefeatures import calendar_rows
+
+DEMAND_MEASURES = ("trips", "revenue")
+HOURS_PER_DAY = 24
+# YoY dibandingkan dengan 52 minggu sebelumnya → hari-dalam-minggu sama
+YOY_LAG_DAYS = 364
+# bulan dengan trip < 5% median bulanan = sisa trip nyasar, bukan bulan yang tercakup
+MIN_MONTH_SHARE = 0.05
+# int32: trip per (jam, zona); float32: revenue per (jam, zona) — jumlah dihitung ulang float64
+_DTYPES = {"trips": np.int32, "revenue": np.float32}
+
+
+def _month_hours(month):
+    """(first hour since epoch, number of hours) of a month given as months since 1970-01."""
+    first = np.datetime64(int(month), "M")
+    start = first.astype("datetime64[h]").astype(np.int64)
+    end = (first + 1).astype("datetime64[h]").astype(np.int64)
+    return int(start), int(end - start)
+
+
+def _hour_index(hours):
+    return pd.DatetimeIndex(np.asarray(hours, dtype=np.int64).astype("datetime64[h]").astype("datetime64[s]"))
+
+
+def _float(df, col):
+    return df[col].to_numpy(dtype="float64", na_value=np.nan) if col is not None and col in df.columns else None
+
+
+class DemandSeries:
+    """Hourly trip/revenue counts in month blocks; `n_zones=None` keeps city-wide totals only.
+
+    `min_month_share` and `expected_span` decide which months count as covered (see the
+    module docstring); both can be changed after loading.
+    """
+
+    def __init__(self, n_zones=None, min_month_share=MIN_MONTH_SHARE, expected_span=None):
+        self.n_zones = None if n_zones is None else int(n_zones)
+        self.min_month_share = min_month_share
+        self.expected_span = expected_span
+        self.blocks = {}    # bulan sejak 1970-01 → {measure: array}
+        self.skipped = 0    # trip tanpa waktu pickup
+        self._cache = {}
+
+    # ---- akumulasi ---------------------------------------------------------
+
+    def _hours(self, df, schema):
+        """Hour since epoch (int64) and validity mask per row."""
+        if "pickup_day" in df.columns and "pickup_hour" in df.columns:
+            day, hour = _float(df, "pickup_day"), _float(df, "pickup_hour")
+            valid = ~np.isnan(day)
+            return np.where(valid, day * HOURS_PER_DAY + np.nan_to_num(hour), 0).astype(np.int64), valid
+        if schema["pickup"] is None:
+            return np.zeros(len(df), dtype=np.int64), np.zeros(len(df), dtype=bool)
+        ts = df[schema["pickup"]].to_numpy().astype("datetime64[h]")
+        valid = ~np.isnat(ts)
+        return np.where(valid, ts.astype(np.int64), 0), valid
+
+    def _block(self, month):
+        if month not in self.blocks:
+            _, n = _month_hours(month)
+            shape = (n,) if self.n_zones is None else (n, self.n_zones)
+            self.blocks[month] = {m: np.zeros(shape, dtype=_DTYPES[m]) for m in DEMAND_MEASURES}
+        return self.blocks[month]
+
+    def update(self, df_clean, schema):
+        hours, valid = self._hours(df_clean, schema)
+        self.skipped += int(len(valid) - valid.sum())
+        if not valid.any():
+            return self
+        hours = hours[valid]
+        total = _float(df_clean, schema["total"])
+        revenue = np.nan_to_num(total[valid]) if total is not None else np.zeros(len(hours))
+        if self.n_zones is not None:
+            pu = _float(df_clean, schema["pu"])
+            pu = pu[valid] if pu is not None else np.zeros(len(hours))
+            with np.errstate(invalid="ignore"):
+                zone = np.where((pu >= 0) & (pu < self.n_zones), pu, 0).astype(np.int64)
+        months = hours.astype("datetime64[h]").astype("datetime64[M]").astype(np.int64)
+        for month in pd.unique(months):
+            in_month = months == month
+            start, n = _month_hours(month)
+            key = hours[in_month] - start
+            size = n
+            if self.n_zones is not None:
+                key = key * self.n_zones + zone[in_month]
+                size = n * self.n_zones
+            block = self._block(int(month))
+            trips = np.bincount(key, minlength=size).reshape(block["trips"].shape)
+            rev = np.bincount(key, weights=revenue[in_month], minlength=size).reshape(block["revenue"].shape)
+            block["trips"] += trips.astype(np.int32)
+            block["revenue"] += rev.astype(np.float32)
+        self._cache.clear()
+        return self
+
+    def merge(self, other):
+        if other.n_zones != self.n_zones:
+            raise ValueError("cannot merge demand series with different zone counts")
+        for month, arrays in other.blocks.items():
+            block = self._block(month)
+            for m in DEMAND_MEASURES:
+                block[m] += arrays[m]
+        self.skipped += other.skipped
+        self._cache.clear()
+        return self
+
+    # ---- deret 1-D + prefix sum -------------------------------------------
+
+    def covered_months(self):
+        """Sorted months (since 1970-01) that count as covered."""
+        span = None if self.expected_span is None else tuple(pd.Timestamp(t) for t in self.expected_span)
+        key = ("covered", self.min_month_share, span)
+        if key not in self._cache:
+            months = np.asarray(sorted(self.blocks), dtype=np.int64)
+            if span is not None:
+                lo, hi = (t.to_datetime64().astype("datetime64[M]").astype(np.int64) for t in span)
+                months = months[(months >= lo) & (months <= hi)]
+            elif len(months):
+                totals = np.array([self.blocks[m]["trips"].sum(dtype=np.int64) for m in months])
+                months = months[(totals > 0) & (totals >= self.min_month_share * np.median(totals))]
+            self._cache[key] = months
+        return self._cache[key]
+
+    def _series(self, measure="trips", zones=None):
+        """(first hour, values float64, covered bool, prefix sums) from the first to the last covered month."""
+        if measure not in DEMAND_MEASURES:
+            raise ValueError(f"measure must be one of {DEMAND_MEASURES}, got {measure!r}")
+        if zones is not None and self.n_zones is None:
+            raise ValueError("this DemandSeries has no per-zone breakdown")
+        zones = None if zones is None else tuple(int(z) for z in np.atleast_1d(zones))
+        covered_months = self.covered_months()
+        key = (measure, zones, tuple(covered_months))
+        if key not in self._cache:
+            if not len(covered_months):
+                self._cache[key] = (0, np.zeros(0), np.zeros(0, dtype=bool), np.zeros(1))
+                return self._cache[key]
+            first, _ = _month_hours(covered_months[0])
+            last_start, last_n = _month_hours(covered_months[-1])
+            values = np.zeros(last_start + last_n - first)
+            covered = np.zeros(len(values), dtype=bool)
+            for month in sorted(self.blocks):
+                if not covered_months[0] <= month <= covered_months[-1]:
+                    continue
+                start, n = _month_hours(month)
+                a = self.blocks[month][measure]
+                if self.n_zones is not None:
+                    a = (a if zones is None else a[:, list(zones)]).sum(axis=1, dtype="float64")
+                values[start - first:start - first + n] = a
+            for month in covered_months:
+                start, n = _month_hours(month)
+                covered[start - first:start - first + n] = True
+            prefix = np.concatenate([[0.0], np.cumsum(values)])
+            self._cache[key] = (first, values, covered, prefix)
+        return self._cache[key]
+
+    @staticmethod
+    def _index(first, n, step=1):
+        return _hour_index(first + np.arange(n, dtype=np.int64) * step)
+
+    def span(self):
+        """(first, last) hour covered as Timestamps, or None when empty."""
+        first, values, _, _ = self._series()
+        if not len(values):
+            return None
+        idx = self._index(first, len(values))
+        return idx[0], idx[-1]
+
+    def window_sum(self, start, end, measure="trips", zones=None):
+        """Total of `measure` over [start, end) within the covered span (anything Timestamp-like), O(1)."""
+        first, values, _, prefix = self._series(measure, zones)
+        lo, hi = (int(pd.Timestamp(t).to_datetime64().astype("datetime64[h]").astype(np.int64)) - first
+                  for t in (start, end))
+        lo, hi = np.clip([lo, hi], 0, len(values))
+        return float(prefix[hi] - prefix[lo])
+
+    def hourly(self, measure="trips", zones=None):
+        """Hourly series over the covered span (gap months are NaN)."""
+        first, values, covered, _ = self._series(measure, zones)
+        return pd.Series(np.where(covered, values, np.nan), index=self._index(first, len(values)), name=measure)
+
+    def daily(self, measure="trips", zones=None):
+        """Per-day totals (blocks are month-aligned, so days are whole); gap months are NaN."""
+        first, values, covered, prefix = self._series(measure, zones)
+        bounds = prefix[::HOURS_PER_DAY]
+        days = np.diff(bounds)
+        covered_days = covered[::HOURS_PER_DAY]
+        return pd.Series(np.where(covered_days, days, np.nan), index=self._index(first, len(days), HOURS_PER_DAY),
+                         name=measure)
+
+    def rolling_mean(self, window=24, measure="trips", zones=None, per="hour"):
+        """Trailing mean over `window` hours (per="hour") or days (per="day") from prefix sums.
+
+        Windows that touch an uncovered month are NaN.
+        """
+        if per not in ("hour", "day"):
+            raise ValueError(f"per must be 'hour' or 'day', got {per!r}")
+        first, values, covered, prefix = self._series(measure, zones)
+        step = 1 if per == "hour" else HOURS_PER_DAY
+        bounds = prefix[::step]
+        gaps = np.concatenate([[0], np.cumsum(~covered[::step])])
+        n = len(bounds) - 1
+        out = np.full(n, np.nan)
+        w = int(window)
+        if 0 < w <= n:
+            sums = bounds[w:] - bounds[:-w]
+            ok = gaps[w:] == gaps[:-w]
+            out[w - 1:] = np.where(ok, sums / w, np.nan)
+        return pd.Series(out, index=self._index(first, n, step), name=f"{measure}_mean_{w}{per[0]}")
+
+    def profile(self, measure="trips", zones=None, start=None, end=None):
+        """Mean `measure` per hour of day on weekdays vs weekends (and holidays), per covered day."""
+        first, values, covered, _ = self._series(measure, zones)
+        n_days = len(values) // HOURS_PER_DAY
+        grid = values[:n_days * HOURS_PER_DAY].reshape(n_days, HOURS_PER_DAY)
+        day = first // HOURS_PER_DAY + np.arange(n_days)
+        keep = covered[::HOURS_PER_DAY][:n_days].copy()
+        if start is not None:
+            keep &= day >= pd.Timestamp(start).to_datetime64().astype("datetime64[D]").astype(np.int64)
+        if end is not None:
+            keep &= day < pd.Timestamp(end).to_datetime64().astype("datetime64[D]").astype(np.int64)
+        cal, row = calendar_rows(day, keep)
+        weekend, holiday = cal.weekend[row], cal.holiday[row]
+        out = {}
+        for label, mask in (("Weekday", keep & ~weekend & ~holiday), ("Weekend", keep & weekend),
+                            ("Holiday", keep & holiday)):
+            out[label] = grid[mask].mean(axis=0) if mask.any() else np.full(HOURS_PER_DAY, np.nan)
+        return pd.DataFrame(out, index=pd.RangeIndex(HOURS_PER_DAY, name="pickup_hour")).round(2)
+
+    def year_over_year(self, window_days=7, measure="trips", zones=None, lag_days=YOY_LAG_DAYS):
+        """Trailing `window_days` totals per day vs the same window `lag_days` earlier.
+
+        Only days whose current and previous windows are both fully covered are returned.
+        """
+        first, values, covered, prefix = self._series(measure, zones)
+        bounds = prefix[::HOURS_PER_DAY]
+        gaps = np.concatenate([[0], np.cumsum(~covered[::HOURS_PER_DAY])])
+        w, lag = int(window_days), int(lag_days)
+        end = np.arange(w + lag, len(bounds))    # batas akhir (eksklusif) jendela sekarang
+        current = bounds[end] - bounds[end - w]
+        previous = bounds[end - lag] - bounds[end - lag - w]
+        ok = (gaps[end] == gaps[end - w]) & (gaps[end - lag] == gaps[end - lag - w])
+        index = _hour_index(first + (end[ok] - 1) * HOURS_PER_DAY)   # hari terakhir jendela
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = np.where(previous[ok] > 0, (current[ok] / previous[ok] - 1) * 100, np.nan)
+        return pd.DataFrame({"current": current[ok], "previous_year": previous[ok], "change_%": change.round(2)},
+                            index=index.rename("date"))
+
+    # ---- persistensi -------------------------------------------------------
+
+    def state(self):
+        arrays = {"n_zones": np.int64(-1 if self.n_zones is None else self.n_zones),
+                  "skipped": np.int64(self.skipped), "months": np.asarray(sorted(self.blocks), dtype=np.int64)}
+        for month, block in self.blocks.items():
+            arrays.update({f"{month}/{m}": block[m] for m in DEMAND_MEASURES})
+        return arrays
+
+    @classmethod
+    def from_state(cls, state):
+        n_zones = int(state["n_zones"])
+        series = cls(None if n_zones < 0 else n_zones)
+        series.skipped = int(state["skipped"])
+        for month in state["months"]:
+            series.blocks[int(month)] = {m: np.array(state[f"{month}/{m}"], dtype=_DTYPES[m])
+                                         for m in DEMAND_MEASURES}
+        return series
+
+    def save(self, path):
+        np.savez_compressed(path, **self.state())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls.from_state({k: f[k] for k in f.files})
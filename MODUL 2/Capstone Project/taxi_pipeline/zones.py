@@ -0,0 +1,191 @@
+"""Zona taksi NYC (Data/rows.rdf): parser streaming, penyimpanan biner ringkas, dan indeks grid.
+
+- rows.rdf (RDF/XML, geometri MULTIPOLYGON WKT) dibaca dengan iterparse: tiap elemen baris
+  dibuang setelah diproses, jadi DOM penuh tidak pernah dibangun.
+- Semua verteks disimpan sebagai satu array float64 + offset ring (gaya CSR), nama/borough
+  sebagai kode kategori; hasilnya di-cache sebagai .npz (kunci = hash file sumber).
+- Indeks grid: bbox kota dibagi sel seragam, tiap sel menyimpan zona yang bbox-nya beririsan.
+- lookup(): id lokasi (pulocationid/dolocationid) → nama zona & borough lewat array
+  ber-indeks id (vektor), bukan merge per baris.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR, file_digest
+
+ZONES_RDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "rows.rdf")
+# Naikkan kalau format .npz berubah
+ZONES_VERSION = "1"
+DEFAULT_GRID = 64
+
+_DS = "{https://data.cityofnewyork.us/resource/_8meu-9t5y/}"
+_FIELDS = {"locationid": _DS + "locationid", "zone": _DS + "zone",
+           "borough": _DS + "borough", "the_geom": _DS + "the_geom"}
+_RING_SPLIT = re.compile(r"\)\s*,\s*\(")
+
+
+def iter_zone_records(path=ZONES_RDF):
+    """Yield {'locationid', 'zone', 'borough', 'the_geom'} per RDF row without building the DOM."""
+    record = {}
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if elem.tag.endswith("}_8meu-9t5y"):
+                record = {}
+            continue
+        for key, tag in _FIELDS.items():
+            if elem.tag == tag:
+                record[key] = (elem.text or "").strip()
+                break
+        else:
+            if elem.tag.endswith("}_8meu-9t5y"):
+                if "locationid" in record:
+                    yield record
+                elem.clear()
+
+
+def parse_multipolygon_wkt(wkt):
+    """WKT MULTIPOLYGON/POLYGON → list of rings as (n, 2) float64 arrays of (lon, lat)."""
+    body = wkt[wkt.index("("):].strip()
+    rings = []
+    for part in _RING_SPLIT.split(body):
+        coords = np.array(part.strip("() ").replace(",", " ").split(), dtype="float64")
+        if len(coords):
+            rings.append(coords.reshape(-1, 2))
+    return rings
+
+
+class ZoneTable:
+    """Compact zone geometry + attributes with a uniform bounding-box grid index."""
+
+    def __init__(self, ids, names, boroughs, coords, ring_offsets, ring_zone, grid_size=DEFAULT_GRID):
+        self.ids = np.asarray(ids, dtype=np.int16)
+        self.names = pd.Categorical(names)
+        self.boroughs = pd.Categorical(boroughs)
+        self.coords = np.asarray(coords, dtype="float64")
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.ring_zone = np.asarray(ring_zone, dtype=np.int32)
+        self._build_bbox()
+        self._build_grid(grid_size)
+        self._build_id_index()
+
+    # ---- konstruksi ------------------------------------------------------
+
+    @classmethod
+    def from_records(cls, records, grid_size=DEFAULT_GRID):
+        ids, names, boroughs, rings, ring_zone = [], [], [], [], []
+        for z, rec in enumerate(records):
+            ids.append(int(float(rec["locationid"])))
+            names.append(rec.get("zone") or None)
+            boroughs.append(rec.get("borough") or None)
+            for ring in parse_multipolygon_wkt(rec["the_geom"]):
+                rings.append(ring)
+                ring_zone.append(z)
+        offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(r) for r in rings])
+        coords = np.concatenate(rings) if rings else np.empty((0, 2))
+        return cls(ids, names, boroughs, coords, offsets, ring_zone, grid_size)
+
+    def _build_bbox(self):
+        n = len(self.ids)
+        ring_len = np.diff(self.ring_offsets)
+        vertex_zone = np.repeat(self.ring_zone, ring_len)
+        self.bbox = np.empty((n, 4))  # minx, miny, maxx, maxy per zona
+        self.bbox[:, :2], self.bbox[:, 2:] = np.inf, -np.inf
+        np.minimum.at(self.bbox[:, 0], vertex_zone, self.coords[:, 0])
+        np.minimum.at(self.bbox[:, 1], vertex_zone, self.coords[:, 1])
+        np.maximum.at(self.bbox[:, 2], vertex_zone, self.coords[:, 0])
+        np.maximum.at(self.bbox[:, 3], vertex_zone, self.coords[:, 1])
+        self.extent = np.array([self.bbox[:, 0].min(), self.bbox[:, 1].min(),
+                                self.bbox[:, 2].max(), self.bbox[:, 3].max()])
+
+    def _build_grid(self, grid_size):
+        self.grid_size = grid_size
+        cells_of = [[] for _ in range(grid_size * grid_size)]
+        lo = self.cell_xy(self.bbox[:, 0], self.bbox[:, 1])
+        hi = self.cell_xy(self.bbox[:, 2], self.bbox[:, 3])
+        for z in range(len(self.ids)):
+            for cy in range(lo[1][z], hi[1][z] + 1):
+                for cx in range(lo[0][z], hi[0][z] + 1):
+                    cells_of[cy * grid_size + cx].append(z)
+        # CSR: zona kandidat sel c = grid_zones[grid_offsets[c]:grid_offsets[c+1]]
+        self.grid_offsets = np.zeros(len(cells_of) + 1, dtype=np.int64)
+        self.grid_offsets[1:] = np.cumsum([len(c) for c in cells_of])
+        self.grid_zones = np.array([z for c in cells_of for z in c], dtype=np.int32)
+
+    def _build_id_index(self):
+        # id lokasi → baris zona pertama (id 56 & 103 muncul dua kali di file TLC)
+        self.row_by_id = np.full(int(self.ids.max()) + 1 if len(self.ids) else 1, -1, dtype=np.int32)
+        for row in range(len(self.ids) - 1, -1, -1):
+            self.row_by_id[self.ids[row]] = row
+
+    # ---- indeks grid -----------------------------------------------------
+
+    def cell_xy(self, lon, lat):
+        """Grid column/row per point (clipped to the grid; check `in_extent` for outside points)."""
+        minx, miny, maxx, maxy = self.extent
+        g = self.grid_size
+        cx = np.clip(((np.asarray(lon) - minx) / (maxx - minx) * g).astype(np.int64), 0, g - 1)
+        cy = np.clip(((np.asarray(lat) - miny) / (maxy - miny) * g).astype(np.int64), 0, g - 1)
+        return cx, cy
+
+    def in_extent(self, lon, lat):
+        minx, miny, maxx, maxy = self.extent
+        return (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+
+    def cell_candidates(self, cell):
+        return self.grid_zones[self.grid_offsets[cell]:self.grid_offsets[cell + 1]]
+
+    # ---- atribut ---------------------------------------------------------
+
+    def lookup(self, location_ids):
+        """Vectorized id → (zone name, borough) as categorical Series; unknown ids → NaN."""
+        index = location_ids.index if isinstance(location_ids, pd.Series) else None
+        ids = pd.Series(location_ids).to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(ids) & (ids >= 0) & (ids < len(self.row_by_id))
+        rows = np.full(len(ids), -1, dtype=np.int32)
+        rows[valid] = self.row_by_id[ids[valid].astype(np.int64)]
+        name_codes = np.where(rows >= 0, self.names.codes[rows], -1)
+        borough_codes = np.where(rows >= 0, self.boroughs.codes[rows], -1)
+        return pd.DataFrame({
+            "zone": pd.Categorical.from_codes(name_codes, self.names.categories),
+            "borough": pd.Categorical.from_codes(borough_codes, self.boroughs.categories),
+        }, index=index)
+
+    def to_frame(self):
+        return pd.DataFrame({"locationid": self.ids, "zone": self.names, "borough": self.boroughs})
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---- simpan/muat biner -------------------------------------------------
+
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, ids=self.ids, names=np.asarray(self.names, dtype=str),
+                            boroughs=np.asarray(self.boroughs, dtype=str), coords=self.coords,
+                            ring_offsets=self.ring_offsets, ring_zone=self.ring_zone,
+                            grid_size=np.int64(self.grid_size))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f["ids"], f["names"], f["boroughs"], f["coords"], f["ring_offsets"],
+                       f["ring_zone"], int(f["grid_size"]))
+
+
+def load_zones(path=ZONES_RDF, cache_dir=DEFAULT_CACHE_DIR, grid_size=DEFAULT_GRID):
+    """ZoneTable for the RDF file, parsed once and then read from the .npz cache."""
+    key = f"zones-{file_digest(path)[:16]}-v{ZONES_VERSION}-g{grid_size}.npz"
+    cached = os.path.join(cache_dir, key)
+    if os.path.exists(cached):
+        return ZoneTable.load(cached)
+    zones = ZoneTable.from_records(iter_zone_records(path), grid_size)
+    os.makedirs(cache_dir, exist_ok=True)
+    zones.save(cached)
+    return zones
@@ -0,0 +1,46 @@
+"""Fixture bersama: file trip sintetis kecil (benchmarks/synth.py) dan frame hasil pipeline."""
+
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "benchmarks"))
+
+from synth import write_trips  # noqa: E402
+from taxi_pipeline.ingest import fill_missing, read_trips  # noqa: E402
+from taxi_pipeline.stream import process_chunk  # noqa: E402
+
+N_ROWS = 20_000
+
+
+@pytest.fixture(scope="session")
+def trips_csv(tmp_path_factory):
+    """Path of a seeded synthetic LPEP file (dirty rows and NaNs included)."""
+    return write_trips(str(tmp_path_factory.mktemp("synth") / "trips.csv"), N_ROWS, seed=7)
+
+
+@pytest.fixture(scope="session")
+def raw_trips(trips_csv):
+    """(prepared frame before cleaning, schema)."""
+    return read_trips(trips_csv)
+
+
+@pytest.fixture
+def prepared(raw_trips):
+    """Fresh copy of the prepared frame, imputed, plus its schema."""
+    df, schema = raw_trips
+    df = df.copy()
+    fill_missing(df, schema)
+    return df, dict(schema)
+
+
+@pytest.fixture(scope="session")
+def clean_trips(raw_trips):
+    """(cleaned, feature-engineered frame, schema) — treat as read-only."""
+    df, schema = raw_trips
+    df_clean, _ = process_chunk(df.copy(), dict(schema))
+    return df_clean, schema
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline.cleaning import (CLEANING_RULES, MAX_DISTANCE_MI, MAX_DURATION_MIN, MAX_SPEED_MPH,
+                                    clean_frame, evaluate_rules, rule_combinations, rule_report)
+
+
+def baseline_masks(df, schema):
+    """The notebook's original per-rule boolean masks (pandas, one pass per condition)."""
+    s = schema
+    time_bad = df[s["pickup"]].isna() | df[s["dropoff"]].isna() \
+        | (df["trip_duration_minutes"] <= 0) | (df["trip_duration_minutes"] > MAX_DURATION_MIN)
+    dist_bad = (df[s["dist"]] <= 0) | (df[s["dist"]] > MAX_DISTANCE_MI)
+    speed_bad = df["avg_speed_mph"] > MAX_SPEED_MPH
+    neg_bad = pd.Series(False, index=df.index)
+    for role in ("fare", "mta", "impr", "tolls", "tip", "total"):
+        neg_bad = neg_bad | (df[s[role]] < 0)
+    return {"time_bad": time_bad.fillna(False).to_numpy(bool), "dist_bad": dist_bad.fillna(False).to_numpy(bool),
+            "speed_bad": speed_bad.fillna(False).to_numpy(bool), "neg_bad": neg_bad.fillna(False).to_numpy(bool)}
+
+
+def test_flags_match_baseline_masks(prepared):
+    df, schema = prepared
+    result = evaluate_rules(df, schema)
+    masks = baseline_masks(df, schema)
+    for i, name in enumerate(CLEANING_RULES):
+        np.testing.assert_array_equal((result.flags >> i) & 1 == 1, masks[name], err_msg=name)
+    drop = np.logical_or.reduce(list(masks.values()))
+    np.testing.assert_array_equal(result.drop_mask, drop)
+    assert drop.any() and not drop.all()
+
+
+def test_clean_frame_keeps_unflagged_rows(prepared):
+    df, schema = prepared
+    df_clean, stats = clean_frame(df, schema)
+    drop = np.logical_or.reduce(list(baseline_masks(df, schema).values()))
+    pd.testing.assert_frame_equal(df_clean, df.loc[~drop])
+    assert stats["rows_in"] == len(df) and stats["dropped"] == drop.sum()
+    positions, _ = clean_frame(df, schema, copy=False)
+    np.testing.assert_array_equal(positions, np.flatnonzero(~drop))
+
+
+def test_report_counts(prepared):
+    df, schema = prepared
+    report = evaluate_rules(df, schema).report()
+    masks = baseline_masks(df, schema)
+    for name, mask in masks.items():
+        others = np.logical_or.reduce([m for n, m in masks.items() if n != name])
+        assert report.loc[name, "flagged"] == mask.sum()
+        assert report.loc[name, "only_this_rule"] == (mask & ~others).sum()
+    assert report.loc["any", "flagged"] == np.logical_or.reduce(list(masks.values())).sum()
+    assert pd.isna(report.loc["any", "only_this_rule"])
+
+
+def test_report_and_combinations_from_bins():
+    names = ["a", "b"]
+    bins = np.array([10, 3, 2, 1])   # none, a only, b only, a+b
+    report = rule_report(names, bins)
+    assert report["flagged"].tolist() == [4, 3, 6]
+    assert report.loc[["a", "b"], "only_this_rule"].tolist() == [3, 2]
+    assert rule_combinations(names, bins).to_dict() == {"a": 3, "b": 2, "a+b": 1}
+
+
+def test_missing_rule_columns_are_skipped(prepared):
+    df, schema = prepared
+    schema = {**schema, "dist": None}
+    result = evaluate_rules(df.drop(columns=["avg_speed_mph"]), schema)
+    assert not ((result.flags >> 1) & 1).any() and not ((result.flags >> 2) & 1).any()
+
+
+def test_too_many_rules():
+    rules = {f"r{i}": {"requires": (), "conditions": []} for i in range(9)}
+    with pytest.raises(ValueError):
+        evaluate_rules(pd.DataFrame({"x": [1.0]}), {}, rules)
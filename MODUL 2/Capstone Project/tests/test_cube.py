@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from taxi_pipeline.cube import _COMPACT_EVERY, TripCube
+from taxi_pipeline.features import AIRPORT_CODES, add_labels
+
+
+def reference(df, schema, by):
+    """groupby over the trip rows: trips, count/sum/min/max/std of total_amount."""
+    total = df[schema["total"]].astype("float64")   # kubus menjumlah di float64
+    g = total.groupby([df[c] for c in ([by] if isinstance(by, str) else by)], observed=True)
+    return pd.DataFrame({"trips": g.size(), "count": g.count(), "sum": g.sum(), "min": g.min(),
+                         "max": g.max(), "std": g.std()})
+
+
+def check(r, ref):
+    ref = ref.reindex(r.index)
+    np.testing.assert_array_equal(r["trips"], ref["trips"])
+    np.testing.assert_array_equal(r["total__count"], ref["count"])
+    np.testing.assert_allclose(r["total__sum"], ref["sum"], rtol=1e-9)
+    np.testing.assert_allclose(r["total__min"], ref["min"], rtol=1e-6)
+    np.testing.assert_allclose(r["total__max"], ref["max"], rtol=1e-6)
+    np.testing.assert_allclose(TripCube.std(r, "total"), ref["std"], rtol=1e-6)
+
+
+def test_rollup_matches_groupby(clean_trips):
+    df, schema = clean_trips
+    cube = TripCube().add(df, schema)
+    r = cube.rollup("hour")
+    r.index = r.index.astype(int)
+    check(r, reference(df, schema, "pickup_hour"))
+    r = cube.rollup("pu")
+    r.index = r.index.astype(int)
+    check(r, reference(df, schema, schema["pu"]))
+    assert cube.rollup("hour")["trips"].sum() == len(df)
+
+
+def test_derived_dims_match_row_features(clean_trips):
+    df, schema = clean_trips
+    cube = TripCube().add(df, schema)
+    check(cube.rollup(["date", "is_weekend"]), reference(df, schema, ["pickup_date", "is_weekend"]))
+    check(cube.rollup("day_of_week"), reference(df, schema, "pickup_day_of_week"))
+    check(cube.rollup("payment_type_label"), reference(df, schema, "payment_type_label"))
+    check(cube.rollup("is_airport"), reference(df, schema, "is_airport"))
+
+
+def test_compaction_and_merge_are_exact(clean_trips):
+    df, schema = clean_trips
+    whole = TripCube().add(df, schema).rollup(["hour", "payment"])
+    chunked, other = TripCube(), TripCube()
+    parts = np.array_split(np.arange(len(df)), 2 * _COMPACT_EVERY + 3)   # add() compacts twice on the way
+    for i, rows in enumerate(parts):
+        (chunked if i % 2 else other).add(df.iloc[rows], schema)
+    r = chunked.merge(other).rollup(["hour", "payment"])
+    pd.testing.assert_frame_equal(r.sort_index(), whole.sort_index(), check_exact=False, rtol=1e-9)
+    assert len(chunked.cells) == len(TripCube().add(df, schema).cells)
+
+
+def test_add_labels_builds_is_airport(raw_trips):
+    df, schema = raw_trips
+    df = add_labels(df.head(2000).copy(), schema)
+    np.testing.assert_array_equal(df["is_airport"], df["rate_code_label"].isin(AIRPORT_CODES))
+    assert df["is_airport"].any()
@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import os
+
+import pytest
+
+from taxi_pipeline.datasets import DatasetStore, dataset_digest, object_suffix, resolve_dataset
+
+PAYLOAD = b"VendorID,total_amount\n1,10.5\n2,7.25\n" * 100
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "trips.csv"
+    path.write_bytes(PAYLOAD)
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(str(tmp_path / "store"))
+
+
+def writer(payload, calls):
+    def fetch(entry, dest):
+        calls.append(entry["source"])
+        with open(dest, "wb") as f:
+            f.write(payload)
+    return fetch
+
+
+def test_add_then_resolve_offline(store, source):
+    stored = store.add(source, name="trips", source="https://example.invalid/trips.csv")
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    assert stored == store.object_path(sha, "trips.csv") and stored.endswith(sha[:2] + os.sep + sha + ".csv")
+    assert store.resolve("trips", fetcher=None) == stored
+    assert open(stored, "rb").read() == PAYLOAD
+    assert dataset_digest(stored) == sha and dataset_digest(source) is None
+    assert store.catalog()["trips"] == {"sha256": sha, "filename": "trips.csv",
+                                        "source": "https://example.invalid/trips.csv"}
+    assert resolve_dataset("trips", store_dir=store.root, fetcher=None) == stored
+
+
+def test_missing_dataset_offline_and_unknown_name(store):
+    store._record("later", {"sha256": None, "filename": "later.csv", "source": "https://example.invalid/x"})
+    with pytest.raises(FileNotFoundError, match="later"):
+        store.resolve("later", fetcher=None)
+    with pytest.raises(KeyError):
+        store.entry("no_such_dataset")
+
+
+def test_fetch_once_then_cached(store):
+    calls = []
+    store._record("remote", {"sha256": None, "filename": "remote.csv", "source": "https://example.invalid/r"})
+    first = store.resolve("remote", fetcher=writer(PAYLOAD, calls))
+    second = store.resolve("remote", fetcher=writer(PAYLOAD, calls))
+    assert first == second and calls == ["https://example.invalid/r"]
+    assert store.entry("remote")["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+    assert not [n for n in os.listdir(store.root) if n.startswith(".incoming-")]
+
+
+def test_corrupt_object_is_refetched(store, source):
+    stored = store.add(source, name="trips", source="https://example.invalid/trips.csv")
+    with open(stored, "r+b") as f:
+        f.write(b"X")                          # ukuran sama, isi & mtime berubah
+    os.utime(stored, ns=(0, 0))
+    calls = []
+    assert store.resolve("trips", fetcher=writer(PAYLOAD, calls)) == stored
+    assert calls and os.path.exists(stored + ".corrupt") and open(stored, "rb").read() == PAYLOAD
+
+
+def test_fetched_bytes_must_match_known_hash(store, source):
+    stored = store.add(source, name="trips", source="https://example.invalid/trips.csv")
+    os.remove(stored)
+    with pytest.raises(ValueError, match="does not match"):
+        store.resolve("trips", fetcher=writer(b"something else", []))
+    assert not os.path.exists(stored)
+    assert not [n for n in os.listdir(store.root) if n.startswith(".incoming-")]
+    # add() file lain dengan nama yang sama juga ditolak
+    other = os.path.join(os.path.dirname(source), "other.csv")
+    with open(other, "wb") as f:
+        f.write(b"different")
+    with pytest.raises(ValueError):
+        store.add(other, name="trips")
+
+
+def test_recheck_hashes_again(store, source):
+    stored = store.add(source, name="trips")
+    st = os.stat(stored)
+    with open(stored, "r+b") as f:
+        f.write(b"X")
+    os.utime(stored, ns=(st.st_atime_ns, st.st_mtime_ns))   # ukuran & mtime sama → stempel tetap cocok
+    assert store.verify(stored, dataset_digest(stored))
+    assert not store.verify(stored, dataset_digest(stored), recheck=True)
+    assert os.path.exists(stored + ".corrupt")
+
+
+def test_compressed_objects_keep_suffix(store, tmp_path):
+    path = tmp_path / "trips.csv.gz"
+    path.write_bytes(gzip.compress(PAYLOAD))
+    stored = store.add(str(path))
+    assert stored.endswith(".csv.gz") and object_suffix("a/b/x.csv.zst") == ".csv.zst"
+    assert gzip.decompress(open(store.resolve("trips.csv.gz", fetcher=None), "rb").read()) == PAYLOAD
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline.datetimes import (FIXED_LAYOUTS, TLC_FORMATS, DatetimeParser, detect_format, parse_datetimes,
+                                     parse_fixed_width)
+
+
+def timestamps(n=2000, seed=0):
+    """Random second-resolution timestamps 2009–2030, including leap days and midnight/noon."""
+    rng = np.random.default_rng(seed)
+    lo, hi = pd.Timestamp("2009-01-01").value // 10**9, pd.Timestamp("2030-12-31").value // 10**9
+    ts = pd.to_datetime(rng.integers(lo, hi, n), unit="s")
+    extra = pd.to_datetime(["2012-02-29 00:00:00", "2016-02-29 12:00:00", "2020-12-31 23:59:59",
+                            "2023-01-01 00:00:00", "2023-06-15 12:30:00"])
+    return pd.Series(ts.append(extra), name="ts")
+
+
+def reference(values, **kwargs):
+    """pd.to_datetime(errors="coerce") as datetime64[ns], NaT where it falls outside that range."""
+    out = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce", **kwargs)
+    inside = ((out >= pd.Timestamp.min) & (out <= pd.Timestamp.max)).to_numpy()
+    expected = np.full(len(out), np.datetime64("NaT"), dtype="datetime64[ns]")
+    expected[inside] = out[inside].to_numpy().astype("datetime64[ns]")
+    return expected
+
+
+def assert_same(got, expected):
+    np.testing.assert_array_equal(np.asarray(got, dtype="datetime64[ns]"),
+                                  np.asarray(expected, dtype="datetime64[ns]"))
+
+
+@pytest.mark.parametrize("fmt", TLC_FORMATS)
+def test_each_format_matches_to_datetime(fmt):
+    ts = timestamps()
+    if "%S" not in fmt:
+        ts = ts.dt.floor("min")
+    text = pd.Series(ts.dt.strftime(fmt), name="ts")
+    assert detect_format(text.to_numpy(dtype=object)) == fmt
+    parser = DatetimeParser()
+    got = parser.parse(text)
+    assert parser.formats == {"ts": fmt} and got.name == "ts"
+    assert_same(got, reference(text, format=fmt))
+    assert_same(got, ts)
+
+
+def test_iso_t_separator_and_fixed_width_mask():
+    values = np.array(["2023-01-05T07:08:09", "2023-01-05 07:08:09", "2023-1-05 07:08:09", "2023-02-30 00:00:00",
+                       "2023-01-05 24:00:00", "2023-01-05 07:08:0x"], dtype=object)
+    out, ok = parse_fixed_width(values, "%Y-%m-%d %H:%M:%S")
+    assert ok.tolist() == [True, True, False, False, False, False]
+    assert_same(out[ok], reference(values[ok], format="ISO8601"))
+    assert np.isnat(out[~ok]).all()
+
+
+def test_blanks_nan_and_malformed():
+    values = pd.Series(["2023-01-05 07:08:09", None, np.nan, "", "   ", "not a date", "2023-13-01 00:00:00",
+                        "2023-01-05 07:08:10"] * 30, name="ts")
+    got = parse_datetimes(values)
+    assert_same(got, reference(values, format="mixed"))
+    assert got.isna().sum() == 6 * 30
+
+
+def test_fractional_seconds_fall_back():
+    values = pd.Series(["2023-01-05 07:08:09"] * 50 + ["2023-01-05 07:08:09.250", "2023-01-05 07:08:09.5"])
+    got = parse_datetimes(values)
+    assert_same(got, reference(values, format="mixed"))
+    assert got.iloc[-1] == pd.Timestamp("2023-01-05 07:08:09.5")
+
+
+def test_mixed_format_column_uses_fallback():
+    ts = timestamps(300, seed=1)
+    iso = ts.dt.strftime("%Y-%m-%d %H:%M:%S")
+    us = ts.dt.strftime("%m/%d/%Y %I:%M:%S %p")
+    # mayoritas ISO (terdeteksi), sisanya format AM/PM → per-nilai lewat format="mixed"
+    values = pd.Series(np.where(np.arange(len(ts)) % 10 == 0, us, iso), name="ts")
+    got = parse_datetimes(values)
+    assert_same(got, reference(values, format="mixed"))
+    assert_same(got, ts)
+
+
+def test_no_detectable_format():
+    values = pd.Series(["Jan 5 2023 7:08AM", "5 January 2023 07:08", None])
+    assert detect_format(values.to_numpy(dtype=object)) is None
+    assert_same(parse_datetimes(values), reference(values, format="mixed"))
+
+
+@pytest.mark.parametrize("fmt", [None, "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f"])
+def test_years_outside_ns_range_are_nat(fmt):
+    values = pd.Series(["2023-01-05 07:08:09", "1600-01-01 00:00:00", "2300-06-01 12:00:00", "9999-12-31 23:59:59",
+                        "1677-09-22 00:00:00", "2262-04-11 00:00:00"])
+    got = parse_datetimes(values, fmt)
+    assert_same(got, reference(values, format="mixed"))
+    assert got.isna().tolist() == [False, True, True, True, False, False]
+
+
+def test_datetime_input_passes_through():
+    ts = timestamps(10)
+    assert DatetimeParser().parse(ts) is ts and parse_datetimes(ts) is ts
+
+
+def test_layouts_cover_tlc_formats():
+    assert set(TLC_FORMATS) == set(FIXED_LAYOUTS)
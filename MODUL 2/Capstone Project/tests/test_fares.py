@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline.fares import (FARE_TOLERANCE, TOLERANCE_PROFILES, FareMismatchStats, add_fare_check, reconcile,
+                                 tolerance_table)
+from taxi_pipeline.schema import resolve_schema
+
+COMPONENTS = ["fare_amount", "extra", "mta_tax", "tip_amount", "tolls_amount", "improvement_surcharge",
+              "congestion_surcharge"]
+
+
+def frame(n=6000, seed=0):
+    """Trips with NaN components/totals/pickups/vendors and rate codes outside the profile."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({c: np.round(rng.gamma(2.0, 3.0, n), 2) for c in COMPONENTS})
+    for c in COMPONENTS:
+        df.loc[rng.random(n) < 0.05, c] = np.nan
+    noise = np.where(rng.random(n) < 0.2, rng.normal(0, 2.0, n), rng.normal(0, 0.1, n))
+    # selisih kontinu (tidak dibulatkan ke sen) → tidak ada seri tepat di ambang toleransi
+    df["total_amount"] = df[COMPONENTS].sum(axis=1) + noise
+    df.loc[rng.random(n) < 0.05, "total_amount"] = np.nan
+    ts = pd.Timestamp("2022-11-01") + pd.to_timedelta(rng.integers(0, 120 * 86400, n), unit="s")
+    df["lpep_pickup_datetime"] = pd.Series(ts).where(rng.random(n) > 0.03)
+    df["vendorid"] = pd.array(rng.choice([1, 2, 6], n), dtype="UInt8")
+    df.loc[rng.random(n) < 0.03, "vendorid"] = pd.NA
+    df["ratecodeid"] = pd.array(rng.choice([1, 2, 3, 4, 5, 6, 99], n), dtype="UInt8")
+    df.loc[rng.random(n) < 0.03, "ratecodeid"] = pd.NA
+    return df, resolve_schema(df.columns)
+
+
+def reference(df, profile):
+    """Report of FareMismatchStats recomputed with a pandas groupby(vendor, month)."""
+    diff = df[COMPONENTS].astype("float64").sum(axis=1) - df["total_amount"]
+    spec = TOLERANCE_PROFILES[profile]
+    tol = df["ratecodeid"].astype("float64").map(lambda c: spec.get(int(c), spec["default"]) if c == c
+                                                 else spec["default"])
+    month = df["lpep_pickup_datetime"].dt.strftime("%Y-%m")
+    g = pd.DataFrame({"vendor": df["vendorid"].astype("Int64"), "month": month, "diff": diff,
+                      "abs": diff.abs().fillna(0.0), "checked": diff.notna(),
+                      "mismatch": diff.abs() > tol}).groupby(["vendor", "month"], dropna=False)
+    checked = g["checked"].sum()
+    out = pd.DataFrame({"trips": g.size(), "checked": checked, "mismatches": g["mismatch"].sum(),
+                        "mismatch_%": (g["mismatch"].sum() / checked.where(checked > 0) * 100).round(2),
+                        "mean_diff": (g["diff"].sum() / checked.where(checked > 0)).round(3),
+                        "mean_abs_diff": (g["abs"].sum() / checked.where(checked > 0)).round(3),
+                        "max_abs_diff": g["abs"].max().round(2)})
+    return normalized(out)
+
+
+def normalized(report):
+    """Report with a plain (vendor or -1, month or '') index so NA keys compare equal."""
+    out = report.reset_index()
+    out["vendor"] = out["vendor"].astype("float64").fillna(-1).astype(int)
+    out["month"] = out["month"].fillna("").astype(str)
+    out = out.set_index(["vendor", "month"]).sort_index()
+    return out.astype({"trips": "int64", "checked": "int64", "mismatches": "int64"})
+
+
+@pytest.mark.parametrize("profile", ["ratecode", "flat", "strict"])
+def test_report_matches_groupby(profile):
+    df, schema = frame()
+    got = normalized(FareMismatchStats(profile).update(df, schema).report())
+    expected = reference(df, profile)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    # vendor kosong dan waktu pickup kosong masing-masing jadi grup sendiri (kunci packed month*256+vendor+1)
+    assert (-1, "") in got.index and (-1, "2023-01") in got.index and (1, "") in got.index
+
+
+def test_precomputed_flags_and_merge_equal_one_pass():
+    df, schema = frame(seed=1)
+    one = FareMismatchStats().update(df, schema).report()
+    flagged = add_fare_check(df.copy(), schema)
+    assert {"fare_components_sum", "total_components_diff", "fare_mismatch_flag"} <= set(flagged.columns)
+    pd.testing.assert_frame_equal(FareMismatchStats().update(flagged, schema).report(), one)
+    half = len(df) // 2
+    left = FareMismatchStats().update(df.iloc[:half], schema)
+    merged = left.merge(FareMismatchStats().update(df.iloc[half:], schema)).report()
+    pd.testing.assert_frame_equal(normalized(merged), normalized(one), check_exact=False, rtol=1e-12)
+    assert FareMismatchStats().report().empty
+
+
+def test_tolerance_per_rate_code():
+    df = pd.DataFrame({"fare_amount": [10.0] * 7, "tip_amount": [np.nan] * 7,
+                       "total_amount": [9.0, 9.0, 9.0, 9.0, 8.0, 9.5, np.nan],
+                       "ratecodeid": pd.array([1, 2, 99, None, 5, 6, 1], dtype="UInt8")})
+    schema = resolve_schema(df.columns)
+    acc, diff, flag = reconcile(df, schema)
+    np.testing.assert_array_equal(acc, 10.0)
+    assert flag.tolist() == [True, False, True, True, False, False, False]
+    _, _, flat = reconcile(df, schema, "flat")
+    assert flat.tolist() == [True, True, True, True, True, False, False]
+    _, _, custom = reconcile(df, schema, {"default": 5.0, 1: 0.5})
+    assert custom.tolist() == [True, False, False, False, False, False, False]
+    assert tolerance_table()[[1, 5, 99, -1]].tolist() == [FARE_TOLERANCE, 2.5, FARE_TOLERANCE, FARE_TOLERANCE]
+    assert reconcile(df.drop(columns="total_amount"), resolve_schema(["fare_amount"])) is None
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from taxi_pipeline.impute import BatchImputer, normaltest_columns
+
+
+def columns(seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.normal(5, 2, n), rng.lognormal(1, 0.8, n), rng.exponential(3, n),
+                         rng.uniform(0, 1, n), rng.standard_t(3, n)])
+    # tiap kolom punya pola NaN sendiri → n berbeda per kolom
+    X[rng.random(X.shape) < np.array([0.0, 0.1, 0.3, 0.5, 0.05])] = np.nan
+    return X
+
+
+def test_matches_scipy_normaltest():
+    X = columns()
+    stat, p, n = normaltest_columns(X)
+    for j in range(X.shape[1]):
+        x = X[~np.isnan(X[:, j]), j]
+        ref = stats.normaltest(x)
+        assert n[j] == len(x)
+        assert stat[j] == pytest.approx(ref.statistic, rel=1e-9)
+        assert p[j] == pytest.approx(ref.pvalue, rel=1e-6, abs=1e-300)
+
+
+@pytest.mark.parametrize("n", [20, 50, 300])
+def test_small_samples_match_scipy(n):
+    x = np.random.default_rng(n).gamma(2.0, 1.0, n)
+    stat, p, _ = normaltest_columns(x[:, None])
+    ref = stats.normaltest(x)
+    assert stat[0] == pytest.approx(ref.statistic, rel=1e-9) and p[0] == pytest.approx(ref.pvalue, rel=1e-6)
+
+
+def test_imputer_decision_and_fill_values():
+    X = columns(seed=1)
+    df = pd.DataFrame(X, columns=list("abcde"))
+    imputer = BatchImputer(alpha=0.05, n_jobs=1).fit(df, list("abcde") + ["missing"])
+    report = imputer.report()
+    _, p, _ = normaltest_columns(X)
+    expected = np.where(p >= 0.05, "mean", "median")
+    assert list(report["method"]) == list(expected)
+    for c, method in zip("abcde", expected):
+        x = df[c].dropna()
+        assert imputer.fill_values_[c] == pytest.approx(x.mean() if method == "mean" else x.median())
+    out = imputer.transform(df.copy())
+    assert not out.isna().any().any()
+
+
+def test_constant_and_tiny_columns_use_median():
+    df = pd.DataFrame({"const": [1.0] * 50, "tiny": [1.0, 2.0, np.nan] + [np.nan] * 47})
+    report = BatchImputer().fit(df, ["const", "tiny"]).report()
+    assert (report["method"] == "median").all() and report["p_value"].isna().all()
+
+
+def test_partial_fit_merge_and_round_trip():
+    df = pd.DataFrame(columns(seed=2, n=6000), columns=list("abcde"))
+    left = BatchImputer(seed=0).partial_fit(df.iloc[:3000], list("abcde"))
+    right = BatchImputer(seed=1).partial_fit(df.iloc[3000:], list("abcde"))
+    merged = left.merge(right)
+    for c in "abcde":
+        x = df[c].dropna()
+        if merged.impute_report[c]["method"] == "mean":
+            assert merged.fill_values_[c] == pytest.approx(x.mean())
+        else:
+            # median dari sketch: galat rank ≤ eps
+            assert abs((x < merged.fill_values_[c]).mean() - 0.5) <= left.sketches_[c].eps
+    restored = BatchImputer.from_dict(merged.to_dict())
+    assert restored.fill_values_ == merged.fill_values_ and restored.impute_report == merged.impute_report
@@ -0,0 +1,72 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from synth import write_trips
+
+from taxi_pipeline import incremental
+from taxi_pipeline.driver import run_months
+from taxi_pipeline.incremental import MANIFEST, append_months, latest_source, load_state
+
+
+@pytest.fixture(scope="module")
+def months(tmp_path_factory):
+    """Three small monthly files: {'YYYY-MM': path}."""
+    root = tmp_path_factory.mktemp("months")
+    starts = {"2023-01": 31, "2023-02": 28, "2023-03": 31}
+    return {m: write_trips(str(root / f"trips_{m}.csv"), 3000, seed=i, start=np.datetime64(f"{m}-01"), days=days)
+            for i, (m, days) in enumerate(starts.items())}
+
+
+def test_append_equals_run_months(months, tmp_path):
+    state = str(tmp_path / "state")
+    paths = list(months.values())
+    append_months(paths[:2], state, n_jobs=1)
+    run = append_months(paths, state, n_jobs=1)
+    whole = run_months(paths, n_jobs=1)
+    assert run.sources == whole.sources
+    pd.testing.assert_frame_equal(run.aggregates.demand_pivot(), whole.aggregates.demand_pivot())
+    assert run.aggregates.drop_stats() == whole.aggregates.drop_stats()
+    assert list(run.ingest_report()["period"]) == list(months)
+
+
+def test_known_digests_are_skipped(months, tmp_path, monkeypatch):
+    state = str(tmp_path / "state")
+    append_months(months["2023-01"], state, n_jobs=1)
+    with open(os.path.join(state, MANIFEST)) as f:
+        generation = json.load(f)["generation"]
+    calls = []
+    monkeypatch.setattr(incremental, "run_months", lambda *a, **k: calls.append(a))
+    run = append_months(months["2023-01"], state, n_jobs=1)
+    manifest, _ = load_state(state)
+    assert not calls and manifest["generation"] == generation and run.sources == [months["2023-01"]]
+    assert set(os.listdir(state)) == {MANIFEST, f"aggregates-{generation}"}
+
+
+def test_reuse_fill_values_takes_latest_month(months, tmp_path, monkeypatch):
+    state = str(tmp_path / "state")
+    # Maret masuk dulu, lalu Januari: sumber terakhir ≠ bulan terbaru
+    append_months(months["2023-03"], state, n_jobs=1)
+    append_months(months["2023-01"], state, n_jobs=1)
+    manifest, _ = load_state(state)
+    assert [s["ingest"]["period"] for s in manifest["sources"]] == ["2023-03", "2023-01"]
+    assert latest_source(manifest["sources"])["source"] == months["2023-03"]
+
+    seen = {}
+
+    def spy(paths, **kwargs):
+        seen.update(kwargs)
+        return run_months(paths, **kwargs)
+
+    monkeypatch.setattr(incremental, "run_months", spy)
+    append_months(months["2023-02"], state, n_jobs=1, reuse_fill_values=True)
+    assert seen["fill_values"] == manifest["sources"][0]["fill_values"]
+
+
+def test_latest_source_falls_back_to_append_order():
+    sources = [{"source": "a", "ingest": {}}, {"source": "b", "ingest": {"period": None}}]
+    assert latest_source(sources)["source"] == "b"
+    sources.append({"source": "c", "ingest": {"period": "2022-12"}})
+    assert latest_source(sources)["source"] == "c"
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline import ingest
+from taxi_pipeline.dtypes import downcast
+from taxi_pipeline.ingest import iter_chunks, plan_read, read_header, read_trips
+from taxi_pipeline.schema import COLUMN_CANDIDATES
+
+DIRTY = {0: ("fare_amount", "abc"), 1: ("passenger_count", "x"), 2: ("VendorID", 1.5),
+         3: ("RatecodeID", 300), 4: ("RatecodeID", -1), 5: ("PULocationID", "zz"), 6: ("total_amount", "")}
+
+
+@pytest.fixture(scope="module")
+def dirty_csv(trips_csv, tmp_path_factory):
+    """First 500 synthetic rows with one bad cell per row in DIRTY."""
+    df = pd.read_csv(trips_csv, nrows=500).astype(object)
+    for row, (col, value) in DIRTY.items():
+        df.loc[row, col] = value
+    path = tmp_path_factory.mktemp("dirty") / "dirty.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def check_dirty(df):
+    for row, (col, _) in DIRTY.items():
+        assert pd.isna(df[col.lower()].iloc[row]), (row, col)
+    # sel lain di baris yang sama tetap terbaca
+    assert df["fare_amount"].iloc[1:].notna().all() and df["ratecodeid"].iloc[:3].notna().all()
+
+
+def test_dirty_cells_read_as_missing(dirty_csv):
+    df, _ = read_trips(dirty_csv)
+    check_dirty(df)
+    assert df["ratecodeid"].dtype == "UInt8" and df["fare_amount"].dtype == "float32"
+    assert isinstance(df["pulocationid"].dtype, pd.CategoricalDtype)
+    assert df["pulocationid"].cat.categories.dtype.kind == "i"
+
+
+def test_dirty_cells_in_chunks(dirty_csv):
+    chunks = [chunk for chunk, _ in iter_chunks(dirty_csv, chunksize=4)]
+    assert chunks[0]["vendorid"].dtype == "UInt8"
+    check_dirty(pd.concat(chunks, ignore_index=True))
+
+
+def test_clean_file_dtypes_unchanged(raw_trips):
+    df, schema = raw_trips
+    assert df[schema["vendor"]].dtype == "UInt8" and df[schema["pass"]].dtype == "float32"
+    assert df[schema["dist"]].dtype == "float64"
+
+
+def test_downcast_bounds():
+    s = pd.Series([0, 255, 256, -1, 2.5, np.nan, 7])
+    assert downcast(s, "UInt8").tolist() == [0, 255, pd.NA, pd.NA, pd.NA, pd.NA, 7]
+    assert downcast(pd.Series(["1.25", "n/a"]), "float32").dtype == "float32"
+
+
+# varian layout TLC: (kolom dibuang, rename) terhadap header LPEP 2019+ dari synth.py
+LAYOUTS = {
+    "lpep_2019": ((), {}),
+    "lpep_2015": (("congestion_surcharge",), {}),
+    "lpep_2020": (("ehail_fee",), {}),
+    "tpep": (("ehail_fee", "trip_type"), {"lpep_pickup_datetime": "tpep_pickup_datetime",
+                                          "lpep_dropoff_datetime": "tpep_dropoff_datetime"}),
+}
+
+
+def write_layout(trips_csv, directory, layout, name=None):
+    drop, rename = LAYOUTS[layout]
+    df = pd.read_csv(trips_csv, nrows=2000, dtype=str).drop(columns=list(drop)).rename(columns=rename)
+    path = directory / f"{name or layout}.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_plan_read_per_layout(trips_csv, tmp_path, layout):
+    header = read_header(write_layout(trips_csv, tmp_path, layout))
+    schema, usecols, dtype = plan_read(header)
+    drop, rename = LAYOUTS[layout]
+    prefix = "tpep" if rename else "lpep"
+    assert schema["pickup"] == f"{prefix}_pickup_datetime" and schema["dropoff"] == f"{prefix}_dropoff_datetime"
+    assert (schema["ehail"] is None) == ("ehail_fee" in drop)
+    assert (schema["congestion"] is None) == ("congestion_surcharge" in drop)
+    assert schema["vendor"] == "vendorid" and schema["pu"] == "pulocationid" and schema["pu_lon"] is None
+    # hanya kolom ber-peran (nama mentah); kolom tanpa peran tidak dibaca
+    expected = [c for c in header if c.lower() in {schema[r] for r in COLUMN_CANDIDATES if schema[r]}]
+    assert sorted(usecols) == sorted(expected) and len(usecols) == len(set(usecols))
+    assert "store_and_fwd_flag" not in usecols and "trip_type" not in usecols
+    assert dtype == {"PULocationID": "category", "DOLocationID": "category"}
+    assert plan_read(header, project=False)[1] is None
+
+
+def test_plans_are_cached_per_layout(trips_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "_READ_PLANS", {})
+    a = read_header(write_layout(trips_csv, tmp_path, "lpep_2015", "jan"))
+    b = read_header(write_layout(trips_csv, tmp_path, "lpep_2015", "feb"))
+    c = read_header(write_layout(trips_csv, tmp_path, "lpep_2019", "mar"))
+    first, second = plan_read(a), plan_read(b)
+    assert len(ingest._READ_PLANS) == 1 and first[1] is second[1] and first[2] is second[2]
+    # schema dikembalikan sebagai kopi: mengubahnya tidak merusak cache
+    first[0]["pu"] = "changed"
+    assert plan_read(a)[0]["pu"] == "pulocationid"
+    plan_read(c)
+    plan_read(c, project=False)
+    assert len(ingest._READ_PLANS) == 3
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_projected_read_equals_full_read(trips_csv, tmp_path, layout):
+    path = write_layout(trips_csv, tmp_path, layout)
+    projected, schema = read_trips(path)
+    full, full_schema = read_trips(path, project=False)
+    assert schema == full_schema
+    assert set(full.columns) - set(projected.columns) <= {"store_and_fwd_flag", "trip_type"}
+    pd.testing.assert_frame_equal(projected, full[projected.columns])
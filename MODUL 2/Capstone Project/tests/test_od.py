@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline import od as od_module
+from taxi_pipeline.od import HOURS_OF_WEEK, ODMatrix, hour_of_week_buckets
+
+
+def reference(df, schema, buckets=None):
+    """groupby(pu, do) of trips / Σ total / mean duration over the selected hour-of-week buckets."""
+    frame = pd.DataFrame({"pu": df[schema["pu"]].astype("float64"), "do": df[schema["do"]].astype("float64"),
+                          "bucket": df["pickup_day_of_week"].astype(int) * 24 + df["pickup_hour"].astype(int),
+                          "total": df[schema["total"]].astype("float64"),
+                          "duration": df["trip_duration_minutes"].astype("float64")}).dropna(subset=["pu", "do"])
+    if buckets is not None:
+        frame = frame[frame["bucket"].isin(buckets)]
+    g = frame.groupby(["pu", "do"])
+    out = pd.DataFrame({"trips": g.size(), "revenue": g["total"].sum(), "mean_duration": g["duration"].mean()})
+    out.index = out.index.set_levels([lvl.astype(int) for lvl in out.index.levels])
+    return out
+
+
+@pytest.fixture(scope="module")
+def matrix(clean_trips):
+    df, schema = clean_trips
+    od = ODMatrix()
+    for rows in np.array_split(np.arange(len(df)), 3):
+        od.update(df.iloc[rows], schema)
+    return od
+
+
+def test_matrix_matches_groupby(clean_trips, matrix):
+    df, schema = clean_trips
+    ref = reference(df, schema)
+    trips = matrix.matrix("trips").tocoo()
+    got = pd.Series(trips.data, index=pd.MultiIndex.from_arrays([trips.row, trips.col], names=["pu", "do"]))
+    pd.testing.assert_series_equal(got.sort_index(), ref["trips"].astype("float64"), check_names=False)
+    revenue = matrix.matrix("revenue").toarray()
+    np.testing.assert_allclose(revenue[ref.index.get_level_values(0), ref.index.get_level_values(1)],
+                               ref["revenue"], rtol=1e-6)
+    missing = df[[schema["pu"], schema["do"]]].isna().any(axis=1).sum()
+    assert matrix.skipped == missing == len(df) - ref["trips"].sum()
+
+
+def test_buckets_and_top_corridors(clean_trips, matrix):
+    df, schema = clean_trips
+    buckets = hour_of_week_buckets(days=[5, 6], hours=range(7, 20))
+    ref = reference(df, schema, buckets)
+    top = matrix.top_corridors(k=5, buckets=buckets)
+    expected = ref.sort_values("trips", ascending=False, kind="stable").head(5)
+    assert list(top["trips"]) == list(expected["trips"])
+    for _, row in top.iterrows():
+        r = ref.loc[(row["pu"], row["do"])]
+        assert row["trips"] == r["trips"] and row["revenue"] == pytest.approx(round(r["revenue"], 2))
+        assert row["mean_duration"] == pytest.approx(round(r["mean_duration"], 2))
+    profile = matrix.hourly_profile(top["pu"][0], top["do"][0])
+    assert len(profile) == HOURS_OF_WEEK and profile.iloc[buckets].sum() == top["trips"][0]
+
+
+def test_merge_and_round_trip(clean_trips, matrix, tmp_path):
+    df, schema = clean_trips
+    half = len(df) // 2
+    merged = ODMatrix().update(df.iloc[:half], schema).merge(ODMatrix().update(df.iloc[half:], schema))
+    for m in ("trips", "revenue", "mean_duration"):
+        np.testing.assert_allclose(merged.matrix(m).toarray(), matrix.matrix(m).toarray())
+    loaded = ODMatrix.load(matrix.save(str(tmp_path / "od.npz")))
+    assert loaded.skipped == matrix.skipped
+    assert (loaded.matrix("revenue") != matrix.matrix("revenue")).nnz == 0
+    with pytest.raises(ValueError):
+        matrix.merge(ODMatrix(n_zones=10))
+
+
+def test_empty_matrix(tmp_path):
+    od = ODMatrix()
+    assert od.top_corridors().empty and od.hourly_profile(1, 2).sum() == 0
+    loaded = ODMatrix.load(od.save(str(tmp_path / "empty.npz")))
+    assert loaded.data == {} and loaded.matrix().nnz == 0
+
+
+def test_scipy_not_imported_until_needed():
+    code = ("import sys; import taxi_pipeline.cli; from taxi_pipeline.aggregate import TripAggregates; "
+            "TripAggregates(); print('scipy' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(od_module.__file__)))
+    assert out.stdout.strip() == "False"
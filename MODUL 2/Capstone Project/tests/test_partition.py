@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from taxi_pipeline.aggregate import TripAggregates
+from taxi_pipeline.partition import HashPartitionedGroupBy, aggregate_partition, partition_of, spill_revenue
+
+
+def reference(df, schema):
+    """groupby(pu) sum/count of each revenue measure in float64."""
+    key = df[schema["pu"]].astype("float64")
+    out = {}
+    for m in ("total", "tolls", "tip"):
+        g = df[schema[m]].astype("float64").groupby(key)
+        out[f"{m}__sum"], out[f"{m}__count"] = g.sum(), g.count()
+    return pd.DataFrame(out)
+
+
+def test_partitions_are_disjoint_and_stable():
+    keys = np.arange(1, 5000, dtype=np.int64)
+    part = partition_of(keys, 16)
+    assert part.min() >= 0 and part.max() < 16
+    np.testing.assert_array_equal(part, partition_of(keys.copy(), 16))
+    assert np.bincount(part, minlength=16).min() > 0     # ID berurutan tersebar ke semua partisi
+
+
+def test_aggregate_matches_groupby(clean_trips, tmp_path):
+    df, schema = clean_trips
+    with HashPartitionedGroupBy(n_partitions=5, spill_dir=str(tmp_path)) as groupby:
+        for rows in np.array_split(np.arange(len(df)), 4):
+            groupby.add(df.iloc[rows], schema)
+        assert groupby.rows == df[schema["pu"]].notna().sum()
+        assert groupby.spill_bytes() == groupby.rows * groupby.dtype.itemsize
+        got = groupby.aggregate(n_jobs=1)
+        pooled = groupby.aggregate(n_jobs=2)
+        directory = groupby.directory
+    assert not os.path.exists(directory)
+    ref = reference(df, schema)
+    got.index = got.index.astype("float64")
+    pd.testing.assert_frame_equal(got, ref[got.columns], check_dtype=False, check_names=False, rtol=1e-9)
+    np.testing.assert_allclose(pooled.to_numpy(), got.to_numpy())
+
+
+def test_block_reads_match_single_block(clean_trips, tmp_path):
+    df, schema = clean_trips
+    with HashPartitionedGroupBy(n_partitions=1, spill_dir=str(tmp_path)) as groupby:
+        groupby.add(df, schema)
+        whole = aggregate_partition(groupby.paths[0], groupby.measures)
+        blocked = aggregate_partition(groupby.paths[0], groupby.measures, block_rows=1000)
+    pd.testing.assert_frame_equal(blocked, whole, check_dtype=False, rtol=1e-9)
+
+
+def test_spill_revenue_matches_cube_table(trips_csv, clean_trips, tmp_path):
+    df, schema = clean_trips
+    expected = TripAggregates().update(df, schema).revenue_by_pickup(top=10)
+    with spill_revenue(trips_csv, spill_dir=str(tmp_path), n_partitions=4, chunksize=7_000) as groupby:
+        got = groupby.revenue_by_pickup(top=10, n_jobs=1)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_empty_groupby(tmp_path):
+    with HashPartitionedGroupBy(spill_dir=str(tmp_path)) as groupby:
+        out = groupby.aggregate(n_jobs=1)
+    assert out.empty and list(out.columns)[:2] == ["total__sum", "total__count"]
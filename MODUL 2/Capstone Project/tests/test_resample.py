@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from taxi_pipeline.resample import (_bootstrap_batch, _permutation_batch, airport_inference, bootstrap_ci,
+                                    compare_groups, payment_inference, permutation_test, run_replicates)
+
+
+@pytest.fixture(scope="module")
+def xy():
+    rng = np.random.default_rng(0)
+    return rng.lognormal(2.0, 0.6, 301), rng.lognormal(2.1, 0.6, 240)
+
+
+@pytest.mark.parametrize("stat", ["mean", "median"])
+def test_bootstrap_batch_matches_loop(xy, stat):
+    x, _ = xy
+    got = _bootstrap_batch(np.random.default_rng(5), stat, x, 64)
+    idx = np.random.default_rng(5).integers(0, len(x), (64, len(x)), dtype=np.int32)
+    fn = np.mean if stat == "mean" else np.median
+    np.testing.assert_allclose(got, [fn(x[row]) for row in idx])
+
+
+@pytest.mark.parametrize("stat", ["mean", "median"])
+@pytest.mark.parametrize("swap", [False, True])
+def test_permutation_batch_matches_loop(xy, stat, swap):
+    x, y = xy if not swap else xy[::-1]
+    pooled = np.concatenate([x, y])
+    got = _permutation_batch(np.random.default_rng(9), stat, pooled, len(x), 32)
+    keys = np.random.default_rng(9).random((32, len(pooled)), dtype=np.float32)
+    m = min(len(x), len(y))
+    fn = np.mean if stat == "mean" else np.median
+    expected = []
+    for row in keys:
+        small = np.zeros(len(pooled), dtype=bool)
+        small[np.argpartition(row, m)[:m]] = True
+        gx, gy = (small, ~small) if m == len(x) else (~small, small)
+        expected.append(fn(pooled[gx]) - fn(pooled[gy]))
+    np.testing.assert_allclose(got, expected)
+
+
+def test_results_do_not_depend_on_n_jobs(xy):
+    x, y = xy
+    specs = [("bootstrap", "median", x, None), ("permutation", "mean", x, y)]
+    serial = run_replicates(specs, n_resamples=2500, seed=3, n_jobs=1)
+    pooled = run_replicates(specs, n_resamples=2500, seed=3, n_jobs=2)
+    for a, b in zip(serial, pooled):
+        assert len(a) == 2500
+        np.testing.assert_array_equal(a, b)
+
+
+def test_bootstrap_ci_agrees_with_scipy(xy):
+    x, _ = xy
+    est, lo, hi = bootstrap_ci(x, "mean", n_resamples=4000, seed=1)
+    ref = stats.bootstrap((x,), np.mean, n_resamples=4000, method="percentile",
+                          random_state=np.random.default_rng(1)).confidence_interval
+    width = ref.high - ref.low
+    assert est == pytest.approx(x.mean())
+    assert lo == pytest.approx(ref.low, abs=0.1 * width) and hi == pytest.approx(ref.high, abs=0.1 * width)
+
+
+def test_permutation_p_values(xy):
+    x, y = xy
+    diff, p = permutation_test(x, y, "mean", n_resamples=3000, seed=2)
+    ref = stats.permutation_test((x, y), lambda a, b: np.mean(a) - np.mean(b), n_resamples=3000,
+                                 random_state=np.random.default_rng(2)).pvalue
+    assert diff == pytest.approx(x.mean() - y.mean())
+    assert p == pytest.approx(ref, abs=0.03)
+    _, p = permutation_test(x[:150], x[150:], "median", n_resamples=3000, seed=4)
+    ref = stats.permutation_test((x[:150], x[150:]), lambda a, b: np.median(a) - np.median(b), n_resamples=3000,
+                                 random_state=np.random.default_rng(4)).pvalue
+    assert p == pytest.approx(ref, abs=0.03)
+    # grup bergeser jauh → p minimum 1/(B+1)
+    _, p_far = permutation_test(x, x + 10, "median", n_resamples=999, seed=4)
+    assert p_far == pytest.approx(1 / 1000)
+
+
+def test_compare_groups_table(xy):
+    x, y = xy
+    groups = {"big": pd.DataFrame({"v": x}), "small": pd.DataFrame({"v": y[:40]}), "tiny": pd.DataFrame({"v": [1.0]}),
+              None: pd.DataFrame({"v": y})}
+    table = compare_groups(groups, {"Avg": ("v", "mean")}, n_resamples=500, n_jobs=1)
+    assert table.attrs["reference"] == "big"
+    assert list(table.index.get_level_values("group")) == ["big", "small", "tiny"]
+    assert np.isnan(table.loc[("Avg", "big"), "p_value"]) and np.isnan(table.loc[("Avg", "tiny"), "ci_low"])
+    row = table.loc[("Avg", "small")]
+    assert row["ci_low"] < row["estimate"] < row["ci_high"] and 0 < row["p_value"] <= 1
+
+
+def test_inference_on_pipeline_frame(clean_trips):
+    df, schema = clean_trips
+    sample = df.sample(3000, random_state=0)
+    payment = payment_inference(sample, schema, n_resamples=300, n_jobs=1)
+    assert payment.attrs["reference"] == "Credit Card"
+    airport = airport_inference(sample, schema, n_resamples=300, n_jobs=1)
+    assert set(airport.index.get_level_values("group")) <= {"Airport", "Non-Airport"}
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline.sampling import StratifiedReservoir
+
+
+def frame(n=30_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"group": rng.choice(["a", "b", "c"], n, p=[0.90, 0.095, 0.005]),
+                         "flag": rng.random(n) < 0.3, "x": np.arange(n, dtype="float64")})
+
+
+def test_strata_sizes_and_seen_counts():
+    df = frame()
+    res = StratifiedReservoir(size=500, strata="group", seed=1)
+    for rows in np.array_split(np.arange(len(df)), 6):
+        res.update(df.iloc[rows])
+    summary = res.summary()
+    counts = df["group"].value_counts()
+    for g in ("a", "b", "c"):
+        assert summary.loc[g, "seen"] == counts[g]
+        assert summary.loc[g, "sampled"] == min(500, counts[g])
+        sample = res.sample(g)
+        assert (sample["group"] == g).all() and sample["x"].is_unique
+    # strata kecil tetap terwakili penuh
+    assert set(res.sample("c")["x"]) == set(df.loc[df["group"] == "c", "x"])
+
+
+def test_sample_is_uniform_within_stratum():
+    # frekuensi inklusi tiap baris ≈ size / populasi (A-Res dengan bobot seragam)
+    df = pd.DataFrame({"group": np.zeros(200, dtype=int), "x": np.arange(200.0)})
+    hits = np.zeros(200)
+    for seed in range(400):
+        hits[StratifiedReservoir(size=50, strata="group", seed=seed).update(df).sample()["x"].astype(int)] += 1
+    freq = hits / 400
+    assert abs(freq.mean() - 0.25) < 1e-9
+    assert np.abs(freq - 0.25).max() < 0.12
+    # baris awal vs akhir tidak dibedakan
+    assert abs(freq[:100].mean() - freq[100:].mean()) < 0.03
+
+
+def test_seeded_and_chunking_invariant_counts():
+    df = frame()
+    a = StratifiedReservoir(size=300, strata=("group", "flag"), seed=7).update(df)
+    b = StratifiedReservoir(size=300, strata=("group", "flag"), seed=7).update(df)
+    pd.testing.assert_frame_equal(a.sample(), b.sample())
+    assert ("a", True) in a.summary().index
+    c = StratifiedReservoir(size=300, strata=("group", "flag"), seed=7)
+    for rows in np.array_split(np.arange(len(df)), 5):
+        c.update(df.iloc[rows])
+    pd.testing.assert_frame_equal(c.summary().sort_index(), a.summary().sort_index())
+
+
+def test_merge_equals_one_pass_counts():
+    df = frame()
+    left = StratifiedReservoir(size=400, strata="group", seed=1).update(df.iloc[:12_000])
+    right = StratifiedReservoir(size=400, strata="group", seed=2).update(df.iloc[12_000:])
+    merged = left.merge(right)
+    whole = StratifiedReservoir(size=400, strata="group", seed=3).update(df)
+    pd.testing.assert_frame_equal(merged.summary().sort_index(), whole.summary().sort_index())
+    with pytest.raises(ValueError):
+        merged.merge(StratifiedReservoir(size=10, strata="group"))
+
+
+def test_missing_values_form_a_stratum():
+    df = pd.DataFrame({"group": [1.0, np.nan, 1.0, np.nan], "x": [1.0, 2.0, 3.0, 4.0]})
+    res = StratifiedReservoir(size=10, strata="group").update(df)
+    assert sorted(res.sample(1.0)["x"]) == [1.0, 3.0]
+    assert res.summary()["seen"].sum() == 4 and None in res.groups()
+
+
+def test_missing_strata_column_raises(clean_trips):
+    df, schema = clean_trips
+    res = StratifiedReservoir(size=10, strata="no_such_column")
+    with pytest.raises(ValueError, match="no_such_column"):
+        res.update(df, schema)
+    with pytest.raises(ValueError):
+        StratifiedReservoir(strata=())
+
+
+def test_schema_roles_and_pipeline_labels(clean_trips):
+    df, schema = clean_trips
+    res = StratifiedReservoir(size=100, strata="is_airport", columns=("total", "tip"), seed=0).update(df, schema)
+    assert set(res.summary().index) == {True, False}
+    assert list(res.sample().columns) == ["is_airport", schema["total"], schema["tip"]]
+    by_role = StratifiedReservoir(size=100, strata="payment").update(df, schema)
+    assert by_role.summary()["seen"].sum() == len(df)
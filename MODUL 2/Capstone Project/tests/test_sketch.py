@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from taxi_pipeline.sketch import QuantileSketch, k_for_eps, rank_error
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def max_rank_error(sketch, x):
+    """Largest |rank(estimate) − q| over QS, ranks taken in the sorted data."""
+    est = sketch.quantile(QS)
+    x = np.sort(x)
+    lo = np.searchsorted(x, est, side="left") / len(x)
+    hi = np.searchsorted(x, est, side="right") / len(x)
+    return np.max(np.where(QS < lo, lo - QS, np.where(QS > hi, QS - hi, 0.0)))
+
+
+@pytest.fixture(scope="module")
+def data():
+    return np.random.default_rng(0).lognormal(2.0, 1.0, 400_000)
+
+
+def test_exact_before_compaction():
+    x = np.random.default_rng(1).normal(size=500)
+    s = QuantileSketch(seed=0).update(x)
+    assert s.exact
+    np.testing.assert_allclose(s.quantile(QS), np.quantile(x, QS))
+    assert s.median() == np.median(x)
+
+
+def test_rank_error_within_eps(data):
+    s = QuantileSketch(eps=0.01, seed=3)
+    for chunk in np.array_split(data, 40):
+        s.update(chunk)
+    assert not s.exact
+    assert max_rank_error(s, data) <= 2 * s.eps
+    assert s.count == len(data)
+    assert s.min == data.min() and s.max == data.max()
+    assert s.mean() == pytest.approx(data.mean()) and s.std() == pytest.approx(data.std(ddof=1))
+
+
+def test_levels_stay_within_capacity(data):
+    s = QuantileSketch(eps=0.01, seed=4)
+    for chunk in np.array_split(data, 400):
+        s.update(chunk)
+        assert all(len(level) <= s._capacity(h) for h, level in enumerate(s.levels))
+    assert len(s) <= s.capacity() < 3 * s.k + 8 * len(s.levels)
+
+
+def test_merge_matches_reference(data):
+    parts = np.array_split(data, 7)
+    sketches = [QuantileSketch(eps=0.01, seed=i).update(p) for i, p in enumerate(parts)]
+    merged = sketches[0]
+    for other in sketches[1:]:
+        merged.merge(other)
+    assert merged.count == len(data)
+    assert max_rank_error(merged, data) <= 2 * merged.eps
+    assert all(len(level) <= merged._capacity(h) for h, level in enumerate(merged.levels))
+
+
+def test_nan_ignored_and_round_trip():
+    x = np.array([3.0, np.nan, 1.0, 2.0])
+    s = QuantileSketch(seed=0).update(x)
+    assert s.count == 3 and s.median() == 2.0
+    t = QuantileSketch.from_dict(s.to_dict())
+    assert t.quantile(0.25) == s.quantile(0.25) and t.k == s.k
+    assert np.isnan(QuantileSketch().median())
+
+
+def test_k_for_eps_inverts_rank_error():
+    for eps in (0.05, 0.01, 0.005):
+        k = k_for_eps(eps)
+        assert rank_error(k) <= eps < rank_error(k - 1)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline import spatial
+from taxi_pipeline.schema import resolve_schema
+from taxi_pipeline.spatial import ZoneAssigner, assign_zone_columns
+from taxi_pipeline.zones import load_zones
+
+
+@pytest.fixture(scope="module")
+def zones(tmp_path_factory):
+    return load_zones(cache_dir=str(tmp_path_factory.mktemp("zones")))
+
+
+@pytest.fixture(scope="module")
+def assigner(zones):
+    return ZoneAssigner(zones)
+
+
+def brute_force_rows(zones, lon, lat, block=64):
+    """Even-odd ray casting of every point against every ring edge; set of zone rows per point."""
+    coords, offsets = zones.coords, zones.ring_offsets
+    start = np.concatenate([np.arange(a, b - 1) for a, b in zip(offsets[:-1], offsets[1:])])
+    ring = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets) - 1)
+    ax, ay = coords[start, 0], coords[start, 1]
+    bx, by = coords[start + 1, 0], coords[start + 1, 1]
+    edge_zone = zones.ring_zone[ring]
+    n_rows = len(zones.ids)
+    out = []
+    for i in range(0, len(lon), block):
+        px, py = lon[i:i + block, None], lat[i:i + block, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross = ((ay > py) != (by > py)) & (px < ax + (py - ay) * (bx - ax) / (by - ay))
+        for row in cross:
+            parity = np.bincount(edge_zone[row], minlength=n_rows) % 2
+            out.append(set(np.flatnonzero(parity).tolist()))
+    return out
+
+
+def sample_points(zones, n, seed=0):
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = zones.extent
+    # separuh acak seragam di bbox kota, separuh dekat verteks poligon (sekitar batas zona)
+    lon = rng.uniform(minx, maxx, n // 2)
+    lat = rng.uniform(miny, maxy, n // 2)
+    near = zones.coords[rng.integers(0, len(zones.coords), n - n // 2)]
+    lon = np.concatenate([lon, near[:, 0] + rng.normal(0, 2e-4, len(near))])
+    lat = np.concatenate([lat, near[:, 1] + rng.normal(0, 2e-4, len(near))])
+    return lon, lat
+
+
+def test_assign_matches_brute_force(zones, assigner):
+    lon, lat = sample_points(zones, 1200)
+    got = np.asarray(assigner.assign(lon, lat).astype("float64"))
+    expected = brute_force_rows(zones, lon, lat)
+    for i, rows in enumerate(expected):
+        ids = {int(zones.ids[r]) for r in rows}
+        if ids:
+            assert got[i] in ids, (lon[i], lat[i], got[i], ids)
+        else:
+            assert np.isnan(got[i]), (lon[i], lat[i], got[i])
+    assert np.isnan(got).any() and (~np.isnan(got)).sum() > 600
+
+
+def test_outside_extent_and_nan_are_missing(assigner):
+    got = assigner.assign(np.array([0.0, np.nan, -80.0]), np.array([0.0, 40.7, np.nan]))
+    assert pd.isna(np.asarray(got)).all()
+
+
+def test_process_pool_matches_serial(zones, assigner, monkeypatch):
+    monkeypatch.setattr(spatial, "_MIN_POINTS_PER_JOB", 500)
+    lon, lat = sample_points(zones, 3000, seed=1)
+    serial = assigner.assign(lon, lat)
+    pooled = assigner.assign(lon, lat, n_jobs=2)
+    np.testing.assert_array_equal(np.asarray(serial.codes), np.asarray(pooled.codes))
+
+
+def test_assign_zone_columns_updates_schema(zones, assigner):
+    lon, lat = sample_points(zones, 200, seed=2)
+    df = pd.DataFrame({"pickup_longitude": lon, "pickup_latitude": lat,
+                       "dropoff_longitude": lon[::-1], "dropoff_latitude": lat[::-1]})
+    schema = resolve_schema(df.columns)
+    assert schema["pu"] is None and schema["pu_lon"] == "pickup_longitude"
+    assign_zone_columns(df, schema, assigner)
+    assert schema["pu"] == "pulocationid" and schema["do"] == "dolocationid"
+    np.testing.assert_array_equal(np.asarray(df["pulocationid"].astype("float64")),
+                                  np.asarray(assigner.assign(lon, lat).astype("float64")))
+
+
+def test_fingerprint_identifies_grid(zones, assigner):
+    assert assigner.fingerprint() == ZoneAssigner(zones).fingerprint()
+    assert assigner.fingerprint() != ZoneAssigner(zones, grid_size=64).fingerprint()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+from taxi_pipeline import timefeatures
+from taxi_pipeline.timefeatures import TIME_FEATURE_COLS, CalendarTable, add_time_features, time_features
+
+
+@pytest.fixture(autouse=True)
+def fresh_calendar(monkeypatch):
+    # tiap tes mulai dari tabel kalender default 2009–2030
+    monkeypatch.setattr(timefeatures, "_CALENDAR", None)
+
+
+def pickups(start, end, n=5000, seed=0, nat=0.05):
+    rng = np.random.default_rng(seed)
+    lo, hi = (pd.Timestamp(t).value // 10**9 for t in (start, end))
+    ts = pd.Series(pd.to_datetime(rng.integers(lo, hi, n), unit="s"))
+    return ts.where(rng.random(n) >= nat)
+
+
+def check_against_dt(ts):
+    got = time_features(ts)
+    valid = ts.notna().to_numpy()
+    expected = {"pickup_hour": ts.dt.hour, "pickup_day_of_week": ts.dt.dayofweek, "pickup_month": ts.dt.month,
+                "pickup_day": (ts - pd.Timestamp("1970-01-01")).dt.days}
+    for name, ref in expected.items():
+        values = pd.Series(got[name])
+        np.testing.assert_array_equal(values[valid].astype("int64"), ref[valid].astype("int64"), err_msg=name)
+        assert values[~valid].isna().all(), name
+    date = pd.Series(got["pickup_date"])
+    pd.testing.assert_series_equal(date, ts.dt.normalize().astype(date.dtype), check_names=False)
+    holidays = USFederalHolidayCalendar().holidays(ts.min().normalize(), ts.max())
+    np.testing.assert_array_equal(got["is_holiday"], ts.dt.normalize().isin(holidays).to_numpy() & valid)
+    np.testing.assert_array_equal(got["is_weekend"], (ts.dt.dayofweek >= 5).to_numpy() & valid)
+    return got
+
+
+def test_matches_dt_accessors():
+    got = check_against_dt(pickups("2015-01-01", "2024-12-31"))
+    assert got["pickup_hour"].dtype == "Int8" and got["pickup_day"].dtype == "Int32"
+
+
+def test_no_missing_pickups_keeps_numpy_dtypes():
+    got = check_against_dt(pickups("2020-01-01", "2021-01-01", nat=0))
+    assert got["pickup_hour"].dtype == np.int8 and got["pickup_month"].dtype == np.int8
+
+
+def test_dates_outside_default_calendar_rebuild_it():
+    ts = pickups("1995-06-01", "2045-06-01", seed=1)
+    check_against_dt(ts)
+    cal = timefeatures.calendar_table()
+    first, last = (int(ts.min().value // 10**9 // 86_400), int(ts.max().value // 10**9 // 86_400))
+    assert cal.covers(first, last) and not CalendarTable().covers(first, last)
+    # tabel yang sudah diperluas dipakai ulang untuk rentang di dalamnya
+    check_against_dt(pickups("2010-01-01", "2011-01-01", seed=2))
+    assert timefeatures.calendar_table() is cal
+
+
+def test_all_missing_and_add_time_features():
+    got = time_features(pd.Series(pd.to_datetime([None, None])))
+    assert pd.Series(got["pickup_hour"]).isna().all() and not got["is_weekend"].any()
+    df = pd.DataFrame({"pickup": pickups("2023-01-01", "2023-02-01", n=50, seed=3)})
+    add_time_features(df, {"pickup": "pickup"})
+    assert set(TIME_FEATURE_COLS) <= set(df.columns)
+    untouched = pd.DataFrame({"x": [1]})
+    assert list(add_time_features(untouched, {"pickup": None}).columns) == ["x"]
+
+
+def test_calendar_frame_matches_pandas():
+    cal = CalendarTable("2023-12-20", "2024-01-20").to_frame()
+    assert cal.loc["2023-12-25", "is_holiday"] and cal.loc["2024-01-15", "is_holiday"]
+    np.testing.assert_array_equal(cal["day_of_week"], cal.index.dayofweek)
+    np.testing.assert_array_equal(cal["month"], cal.index.month)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxi_pipeline.timeseries import DemandSeries
+
+SCHEMA = {"pickup": "ts", "total": "amount", "pu": "zone"}
+
+
+def trips(start, end, n, seed=0, zones=5):
+    """n trips uniformly spread over [start, end) with a random amount and zone."""
+    rng = np.random.default_rng(seed)
+    lo, hi = (pd.Timestamp(t).value // 10**9 for t in (start, end))
+    ts = pd.to_datetime(rng.integers(lo, hi, n), unit="s")
+    return pd.DataFrame({"ts": ts, "amount": rng.gamma(2.0, 8.0, n), "zone": rng.integers(0, zones, n).astype(float)})
+
+
+def resampled(df, rule, column=None):
+    s = df.set_index("ts")["amount"] if column else pd.Series(1.0, index=pd.DatetimeIndex(df["ts"]))
+    return s.resample(rule).sum()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return trips("2023-01-01", "2023-03-01", 30_000)
+
+
+@pytest.fixture(scope="module")
+def series(frame):
+    s = DemandSeries(n_zones=5)
+    for rows in np.array_split(np.arange(len(frame)), 4):
+        s.update(frame.iloc[rows], SCHEMA)
+    return s
+
+
+def test_hourly_and_daily_match_resample(frame, series):
+    hourly = series.hourly()
+    ref = resampled(frame, "h").reindex(hourly.index, fill_value=0.0)
+    np.testing.assert_array_equal(hourly.to_numpy(), ref.to_numpy())
+    assert series.span() == (pd.Timestamp("2023-01-01"), pd.Timestamp("2023-02-28 23:00"))
+    daily = series.daily("revenue")
+    ref = resampled(frame, "D", "amount").reindex(daily.index, fill_value=0.0)
+    np.testing.assert_allclose(daily.to_numpy(), ref.to_numpy(), rtol=1e-5)
+
+
+def test_zone_selection(frame, series):
+    sub = frame[frame["zone"].isin([1, 3])]
+    hourly = series.hourly(zones=[1, 3])
+    ref = resampled(sub, "h").reindex(hourly.index, fill_value=0.0)
+    np.testing.assert_array_equal(hourly.to_numpy(), ref.to_numpy())
+    with pytest.raises(ValueError):
+        DemandSeries().hourly(zones=[1])
+
+
+def test_window_sum_and_rolling_match_pandas(frame, series):
+    start, end = pd.Timestamp("2023-01-10 05:00"), pd.Timestamp("2023-02-02 17:00")
+    expected = frame.loc[(frame["ts"] >= start) & (frame["ts"] < end), "amount"].sum()
+    assert series.window_sum(start, end, "revenue") == pytest.approx(expected, rel=1e-5)
+    hourly = series.hourly()
+    pd.testing.assert_series_equal(series.rolling_mean(24), hourly.rolling(24).mean(), check_names=False)
+    daily = series.daily()
+    pd.testing.assert_series_equal(series.rolling_mean(7, per="day"), daily.rolling(7).mean(), check_names=False)
+
+
+def test_stray_trips_do_not_count_as_coverage():
+    s = DemandSeries()
+    s.update(trips("2023-01-01", "2023-02-01", 20_000, seed=1), SCHEMA)
+    s.update(trips("2023-03-01", "2023-04-01", 20_000, seed=2), SCHEMA)
+    # trip nyasar: jauh sebelum data, dan beberapa di bulan Februari yang sebenarnya kosong
+    s.update(trips("2015-06-01", "2015-06-02", 1, seed=3), SCHEMA)
+    s.update(trips("2023-02-10", "2023-02-11", 3, seed=4), SCHEMA)
+    assert list(s.covered_months()) == [np.datetime64(m, "M").astype(int) for m in ("2023-01", "2023-03")]
+    assert s.span()[0] == pd.Timestamp("2023-01-01")
+    daily = s.daily()
+    february = daily["2023-02-01":"2023-02-28"]
+    assert len(february) == 28 and february.isna().all() and daily["2023-01"].notna().all()
+    rolling = s.rolling_mean(3, per="day")
+    assert rolling["2023-03-02":"2023-03-02"].isna().all() and rolling["2023-03-03":"2023-03-03"].notna().all()
+    # rentang yang diharapkan dari pemanggil menggantikan ambang
+    s.expected_span = ("2023-01-01", "2023-02-28")
+    assert s.daily()["2023-02"].notna().all() and s.span()[1] == pd.Timestamp("2023-02-28 23:00")
+
+
+def test_year_over_year_matches_shifted_windows():
+    s = DemandSeries()
+    s.update(trips("2022-01-01", "2022-03-01", 20_000, seed=5), SCHEMA)
+    s.update(trips("2023-01-01", "2023-03-01", 26_000, seed=6), SCHEMA)
+    yoy = s.year_over_year(window_days=7)
+    daily = s.daily().fillna(0)
+    current = daily.rolling(7).sum()
+    previous = current.shift(364)
+    assert len(yoy) and (yoy.index >= pd.Timestamp("2023-01-07")).all()
+    np.testing.assert_allclose(yoy["current"], current[yoy.index])
+    np.testing.assert_allclose(yoy["previous_year"], previous[yoy.index])
+
+
+def test_merge_and_round_trip(frame, series, tmp_path):
+    half = len(frame) // 2
+    merged = DemandSeries(5).update(frame.iloc[:half], SCHEMA)
+    merged.merge(DemandSeries(5).update(frame.iloc[half:], SCHEMA))
+    pd.testing.assert_series_equal(merged.hourly("revenue"), series.hourly("revenue"))
+    loaded = DemandSeries.load(series.save(str(tmp_path / "demand.npz")))
+    pd.testing.assert_series_equal(loaded.daily(zones=[2]), series.daily(zones=[2]))
+    with pytest.raises(ValueError):
+        series.merge(DemandSeries())